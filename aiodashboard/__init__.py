@@ -1,12 +1,27 @@
+import asyncio
+import threading
+
 import aiohttp.web as web
+import aiohttp_session
 
 from .dashboard import Dashboard
+from .dashboard_api import DashboardAPI
+from .dashboard_metrics import DashboardMetrics
+from .loop_monitor import LoopMonitor
+from .task_exec import TaskExec
+from .task_history import TaskHistory
+from .task_metrics import TaskMetrics
+from .task_profiler import TaskProfiler
+from .task_event_stream import TaskEventStream
+from .worker_aggregator import WorkerAggregator
+from .worker_dashboard import WorkerDashboard
+from .worker_export import WorkerExport
 from .render import setup_jinja2
 from .render.dashboard_style import DashboardStyle, BLUE_THEME
 from .login import *
 from .util import *
 
-from typing import Any
+from typing import Any, Optional
 
 def start_dashboard(
         loop: Loop, 
@@ -15,30 +30,250 @@ def start_dashboard(
         dashboard_name: str = 'Asyncio Task Dashboard',
         style: DashboardStyle = BLUE_THEME,
         use_plain_html: bool = False,
+        dedicated_thread: bool = False,
+        history_size: int = 10000,
+        history_path: Optional[str] = None,
+        metrics_by_target: bool = False,
+        public_metrics: bool = False,
+        monitor_loop: bool = False,
+        slow_callback_threshold: Optional[float] = 0.1,
+        profile_interval: float = 0.01,
+        max_profile_duration: float = 60.,
+        template_cache_path: Optional[str] = None,
+        stream_chunk_size: Optional[int] = None,
+        static_path: Optional[str] = None,
+        bootstrap_cdn: bool = False,
+        compression_min_size: Optional[int] = 1024,
+        session_ttl: float = 86400.,
+        session_path: Optional[str] = None,
+        session_key: Optional[bytes] = None,
     ) -> None:
     """
     Start the dashboard.
+    By default, the dashboard's web server runs on the event loop of the monitored tasks (`loop`).
+    Alternatively, it runs on its own event loop in a separate (daemon) thread (`dedicated_thread`),
+    such that serving the dashboard does not add latency to the monitored tasks. Tasks are then still
+    started and cancelled from their own event loop, but target functions are called from the
+    dashboard's thread.
+    The dashboard keeps the history of the last `history_size` task executions in memory and optionally
+    appends it to a file (`history_path`).
+    Runtime metrics of the coroutines are collected per coroutine and optionally per target (`metrics_by_target`).
+    For scraping by Prometheus without login, the metrics endpoint may be made public (`public_metrics`).
+    Optionally, the health of the event loop is monitored (`monitor_loop`, see `LoopMonitor`), including
+    callbacks running longer than `slow_callback_threshold` seconds (unless `None`).
+    Running tasks can be profiled on demand (see `TaskProfiler`), sampling their stacks at most every
+    `profile_interval` seconds for at most `max_profile_duration` seconds.
+    Templates are compiled at startup, optionally cached in a directory (`template_cache_path`) across restarts.
+    For large lists of running tasks, the main page may be streamed in chunks (`stream_chunk_size`, see `Dashboard`).
+    Static assets are served from the package (including Bootstrap) and optionally from a directory (`static_path`).
+    Bootstrap is only loaded from its CDN if requested (`bootstrap_cdn`, see `setup_jinja2`).
+    Responses of at least `compression_min_size` bytes are compressed (unless `None`, see `compress_responses`).
+    Login sessions are kept on the server for `session_ttl` seconds (see `SessionStorage`), optionally in an
+    SQLite database (`session_path`), such that they survive restarts and can be shared between processes.
+    Alternatively, sessions are stored in cookies encrypted with a given Fernet key (`session_key`).
+    """
+    TaskHistory.configure(max_records=history_size, spill_path=history_path)
+    TaskMetrics.configure(by_target=metrics_by_target)
+    loop_monitor = LoopMonitor(slow_callback_threshold=slow_callback_threshold) if monitor_loop else None
+    profiler = TaskProfiler(interval=profile_interval, max_duration=max_profile_duration)
+
+    if not dedicated_thread:
+        loop.run_until_complete(
+            _start_server(
+                pwd_hash, process, dashboard_name, style, use_plain_html,
+                public_metrics=public_metrics, loop_monitor=loop_monitor, profiler=profiler,
+                template_cache_path=template_cache_path, stream_chunk_size=stream_chunk_size, static_path=static_path,
+                bootstrap_cdn=bootstrap_cdn, compression_min_size=compression_min_size, session_ttl=session_ttl,
+                session_path=session_path, session_key=session_key
+            )
+        )
+        return
+
+    TaskExec.set_loop(loop)
+
+    dashboard_loop = asyncio.new_event_loop()
+    threading.Thread(target=dashboard_loop.run_forever, name='aiodashboard', daemon=True).start()
+
+    # Wait for the web server to be started (errors are raised here).
+    asyncio.run_coroutine_threadsafe(
+        _start_server(
+            pwd_hash, process, dashboard_name, style, use_plain_html, loop, public_metrics, loop_monitor, profiler,
+            template_cache_path, stream_chunk_size, static_path, bootstrap_cdn, compression_min_size, session_ttl,
+            session_path, session_key
+        ),
+        dashboard_loop
+    ).result()
+
+def start_worker_export(
+        loop: Loop,
+        path: str,
+        process: Any = None,
+        name: Optional[str] = None,
+    ) -> WorkerExport:
+    """
+    Export the running tasks of this (worker) process via a Unix socket, such that they are shown
+    on the dashboard of an aggregator process (see `start_aggregator`).
+    """
+    worker_export = WorkerExport(path, process=process, name=name)
+    loop.run_until_complete(worker_export.start())
+    return worker_export
+
+def start_aggregator(
+        loop: Loop,
+        pwd_hash: bytes,
+        worker_paths: list[str],
+        dashboard_name: str = 'Asyncio Task Dashboard',
+        style: DashboardStyle = BLUE_THEME,
+        use_plain_html: bool = False,
+        static_path: Optional[str] = None,
+        bootstrap_cdn: bool = False,
+    ) -> None:
+    """
+    Start a dashboard showing the running tasks of multiple worker processes, which export
+    them via Unix sockets (see `start_worker_export`).
+    Static assets may be provided and Bootstrap may be loaded from its CDN like for `start_dashboard`
+    (`static_path`, `bootstrap_cdn`).
     """
-    dashboard = Dashboard(pwd_hash=pwd_hash, process=process)
+    loop.run_until_complete(
+        _start_aggregator_server(pwd_hash, worker_paths, dashboard_name, style, use_plain_html, static_path, bootstrap_cdn)
+    )
+
+async def _start_server(
+        pwd_hash: bytes,
+        process: Any,
+        dashboard_name: str,
+        style: DashboardStyle,
+        use_plain_html: bool,
+        app_loop: Optional[Loop] = None,
+        public_metrics: bool = False,
+        loop_monitor: Optional[LoopMonitor] = None,
+        profiler: Optional[TaskProfiler] = None,
+        template_cache_path: Optional[str] = None,
+        stream_chunk_size: Optional[int] = None,
+        static_path: Optional[str] = None,
+        bootstrap_cdn: bool = False,
+        compression_min_size: Optional[int] = 1024,
+        session_ttl: float = 86400.,
+        session_path: Optional[str] = None,
+        session_key: Optional[bytes] = None,
+    ) -> web.AppRunner:
+    """
+    Set up the dashboard's web application and start the web server on the running event loop.
+    """
+    dashboard = Dashboard(
+        pwd_hash=pwd_hash, process=process, loop=app_loop, loop_monitor=loop_monitor, stream_chunk_size=stream_chunk_size
+    )
+    dashboard_api = DashboardAPI(dashboard, profiler)
+    task_event_stream = TaskEventStream(dashboard)
+    dashboard_metrics = DashboardMetrics()
 
     app = web.Application()
     app.router.add_get('/', dashboard.index)
     app.router.add_get('/cancel-task', dashboard.cancel_task)
     app.router.add_post('/cancel-task', dashboard.cancel_task_apply)
+    app.router.add_post('/cancel-tasks', dashboard.cancel_tasks_apply)
     app.router.add_get('/start-task', dashboard.start_task)
     app.router.add_post('/start-task', dashboard.start_task_apply)
+    app.router.add_get('/start-tasks', dashboard.start_tasks)
+    app.router.add_post('/start-tasks', dashboard.start_tasks_apply)
+    app.router.add_get('/task-stack', dashboard.task_stack)
     app.router.add_get('/login', dashboard.login)
     app.router.add_post('/login', dashboard.login_apply)
     app.router.add_get('/logout', dashboard.logout)
+    app.router.add_get('/events', task_event_stream.events)
+    app.router.add_get('/metrics', dashboard_metrics.metrics)
+    app.router.add_get(
+        '/metrics/prometheus',
+        dashboard_metrics.prometheus_public if public_metrics else dashboard_metrics.prometheus
+    )
+    app.router.add_get('/api/tasks', dashboard_api.get_tasks)
+    app.router.add_post('/api/tasks', dashboard_api.start_task)
+    app.router.add_delete('/api/tasks/{task_id}', dashboard_api.cancel_task)
+    app.router.add_get('/api/tasks/{task_id}/await-chain', dashboard_api.get_await_chain)
+    app.router.add_get('/api/targets', dashboard_api.get_targets)
+    app.router.add_get('/api/coroutines', dashboard_api.get_coroutines)
+    app.router.add_get('/api/history', dashboard_api.get_history)
+    app.router.add_get('/api/loop', dashboard_api.get_loop)
+    app.router.add_get('/api/profile', dashboard_api.get_profile)
+    app.on_cleanup.append(lambda _: dashboard.close())
+    app.on_cleanup.append(lambda _: dashboard_api.close())
+
+    # The event loop executing the monitored tasks is monitored (started on that loop).
+    if loop_monitor:
+        call_in_loop(app_loop or asyncio.get_running_loop(), loop_monitor.start)
+        app.on_cleanup.append(lambda _: loop_monitor.close())
+
+    return await _run_app(
+        app, dashboard_name, style, use_plain_html, template_cache_path, static_path, bootstrap_cdn,
+        compression_min_size, session_ttl, session_path, session_key
+    )
 
-    setup_cookie_storage(app)
-    setup_jinja2(app, dashboard_name, style, use_plain_html)
+async def _start_aggregator_server(
+        pwd_hash: bytes,
+        worker_paths: list[str],
+        dashboard_name: str,
+        style: DashboardStyle,
+        use_plain_html: bool,
+        static_path: Optional[str] = None,
+        bootstrap_cdn: bool = False,
+    ) -> web.AppRunner:
+    """
+    Set up the aggregator's web application and start the web server on the running event loop.
+    """
+    aggregator = WorkerAggregator(worker_paths)
+    await aggregator.start()
+    dashboard = WorkerDashboard(pwd_hash=pwd_hash, aggregator=aggregator)
 
+    app = web.Application()
+    app.router.add_get('/', dashboard.index)
+    app.router.add_post('/cancel-task', dashboard.cancel_task_apply)
+    app.router.add_get('/login', dashboard.login)
+    app.router.add_post('/login', dashboard.login_apply)
+    app.router.add_get('/logout', dashboard.logout)
+    app.router.add_get('/api/workers', dashboard.get_workers)
+    app.router.add_get('/api/workers/tasks', dashboard.get_tasks)
+    app.router.add_post('/api/workers/{worker}/tasks', dashboard.start_task)
+    app.router.add_delete('/api/workers/{worker}/tasks/{task_id}', dashboard.cancel_task)
+    app.on_cleanup.append(lambda _: aggregator.close())
+
+    return await _run_app(app, dashboard_name, style, use_plain_html, static_path=static_path, bootstrap_cdn=bootstrap_cdn)
+
+async def _run_app(
+        app: web.Application,
+        dashboard_name: str,
+        style: DashboardStyle,
+        use_plain_html: bool,
+        template_cache_path: Optional[str] = None,
+        static_path: Optional[str] = None,
+        bootstrap_cdn: bool = False,
+        compression_min_size: Optional[int] = 1024,
+        session_ttl: float = 86400.,
+        session_path: Optional[str] = None,
+        session_key: Optional[bytes] = None,
+    ) -> web.AppRunner:
+    """
+    Add sessions, templates and middlewares to a web application and start the web server.
+    """
+    if session_key:
+        setup_cookie_storage(app, session_key)
+    else:
+        session_storage = SessionStorage(ttl=session_ttl, path=session_path)
+        aiohttp_session.setup(app, session_storage)
+        app.on_cleanup.append(lambda _: session_storage.close())
+
+    setup_jinja2(
+        app, dashboard_name, style, use_plain_html, bytecode_cache_path=template_cache_path, static_path=static_path,
+        bootstrap_cdn=bootstrap_cdn
+    )
+
+    if compression_min_size is not None: app.middlewares.append(compress_responses(min_size=compression_min_size))
     app.middlewares.append(error_handler)
     app.middlewares.append(check_login)
 
     runner = web.AppRunner(app)
-    loop.run_until_complete(runner.setup())
+    await runner.setup()
 
     site = web.TCPSite(runner)    
-    loop.run_until_complete(site.start())
+    await site.start()
+
+    return runner
@@ -1,10 +1,16 @@
 import functools
 import importlib
+import time
+from asyncio import CancelledError, current_task
 from inspect import Parameter
-from typing import Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 from types import MappingProxyType
 
 from .coroutine_def_info import CoroutineDefInfo
+from .task_history import TaskHistory
+from .task_metrics import TaskMetrics
+from .task_outcome import TaskOutcome
+from .task_registry import TaskRegistry
 from .util import check_callable, coroutine_id as str_coroutine_id
 
 class CoroutineDef:
@@ -26,17 +32,42 @@ class CoroutineDef:
         # Get coroutuine ID.
         coroutine_id = str_coroutine_id(func.__qualname__, func.__module__)
 
+        # Check for collisions with the ID of another coroutine (redefining the same coroutine is fine).
+        other_info = CoroutineDef.__coroutine_def_infos.get(coroutine_id)
+        if other_info and (other_info.func_name, other_info.module) != (func.__qualname__, func.__module__):
+            raise RuntimeError(
+                f'Coroutine ID of "{func.__qualname__}" ({func.__module__}) collides with ' +
+                    f'"{other_info.func_name}" ({other_info.module})'
+            )
+
+        target_param = self._target_param
+
         # Define wrapper function for coroutine.
         @functools.wraps(func)
         async def coroutine_def_wrapper(*args, **kwargs):
 
-            # Handle special case of class method.
-            if type(func) == classmethod:
-                context = CoroutineDef.get_coroutine_def_info(coroutine_id).context
-                return await func.__get__(None, context.containing_class)(*args, **kwargs)
-
-            # Default case.
-            return await func(*args, **kwargs)
+            # Register the task executing this coroutine, such that the dashboard can find it.
+            # Tasks started by the dashboard have been registered already, the outermost coroutine claims them.
+            task = current_task()
+            registered = (TaskRegistry.register(task, func, args, kwargs) or TaskRegistry.claim(task)) if task else False
+            if not task or not registered: return await CoroutineDef.__call(coroutine_id, func, args, kwargs)
+
+            # Record the execution in the task history and the metrics.
+            outcome, value, started = TaskOutcome.RESULT, None, time.time()
+            try:
+                value = await CoroutineDef.__call(coroutine_id, func, args, kwargs)
+                return value
+            except CancelledError:
+                outcome = TaskOutcome.CANCELLED
+                raise
+            except BaseException as e:
+                outcome, value = TaskOutcome.EXCEPTION, e
+                raise
+            finally:
+                TaskRegistry.unregister(task)
+                finished = time.time()
+                TaskMetrics.observe(coroutine_id, func, target_param, args, kwargs, finished - started, outcome)
+                TaskHistory.add(task, coroutine_id, func, target_param, args, kwargs, started, finished, outcome, value)
 
         # Add info about this coroutine.
         info = CoroutineDefInfo(coroutine_def_wrapper, self._target_param)
@@ -45,6 +76,19 @@ class CoroutineDef:
         # Return wrapper function.
         return coroutine_def_wrapper
 
+    @staticmethod
+    def __call(coroutine_id: str, func: Callable, args: tuple, kwargs: dict[str, Any]) -> Awaitable:
+        """
+        Call a decorated coroutine function.
+        """
+        # Handle special case of class method.
+        if type(func) == classmethod:
+            context = CoroutineDef.get_coroutine_def_info(coroutine_id).context
+            return func.__get__(None, context.containing_class)(*args, **kwargs)
+
+        # Default case.
+        return func(*args, **kwargs)
+
     @staticmethod
     def get_coroutine_ids() -> list[str]:
         """
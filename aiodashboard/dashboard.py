@@ -1,7 +1,15 @@
 import asyncio
+import hashlib
+import math
+import os
+import time
+from warnings import warn
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from itertools import islice
+from inspect import Parameter
 
 import aiohttp.web as web
-import aiohttp_session
 import aiohttp_jinja2
 
 from .login import *
@@ -9,28 +17,69 @@ from .util import *
 
 from .coroutine_def import CoroutineDef
 from .coroutine_def_info import CoroutineDefInfo
+from .loop_monitor import LoopMonitor
+from .task_await_chain import TaskAwaitChain
 from .task_exec import TaskExec
 from .task_exec_info import TaskExecInfo
+from .task_fragment_cache import TaskFragmentCache
+from .task_registry import TaskRegistry
 from .task_target_def import TaskTargetDef
+from .task_target_index import TaskTargetIndex
 
-from typing import Any
+from typing import Any, Callable, Mapping, Optional, TypeAlias
 
 list_all_tasks : set[asyncio.Task] = set()
 
-class Dashboard:
+# Information about a running task for display: target, target position, coroutine name,
+# module, task ID, coroutine ID, parameters and type info of the coroutine.
+TaskDisplayInfo: TypeAlias = tuple[Any, int, str, str, str, str, OrderedDict[str, Any], Optional[str]]
+
+class Dashboard(LoginPages):
 
     def __init__(
             self,
             pwd_hash: bytes,
             process: Any = None,
-            static_targets: bool = False
+            static_targets: bool = False,
+            page_size: int = 100,
+            max_target_options: int = 1000,
+            loop: Optional[Loop] = None,
+            max_login_attempts: int = 5,
+            login_attempt_interval: float = 60.,
+            target_ttl: float = 0.,
+            loop_monitor: Optional[LoopMonitor] = None,
+            stream_chunk_size: Optional[int] = None
         ) -> None:
         """
         Contructor.
+        The event loop executing the monitored tasks only has to be specified in case the dashboard
+        runs on another event loop (in a separate thread). Tasks are then started and cancelled
+        thread-safely from the tasks' event loop.
+        Login attempts are limited per client IP address (see `LoginPages`).
+        Unless static, the list of targets is retrieved again once it is older than `target_ttl` seconds
+        or a change has been reported (see `TaskTargetDef.notify_changed`). Lists provided by coroutine
+        functions are retrieved in the background, while requests are served from the previous list.
+        The health of the tasks' event loop is shown in case it is monitored (`loop_monitor`).
+        Unless `stream_chunk_size` is `None`, the main page is streamed in chunks of about this many
+        characters (see `stream_template`), such that large pages neither take up memory as a whole
+        nor block the event loop while being rendered.
         """
-        self._pwd_hash = PasswordHash(pwd_hash)
+        super().__init__(pwd_hash, max_login_attempts, login_attempt_interval)
         self._process = process
         self._static_targets = static_targets
+        self._page_size = page_size
+        self._max_target_options = max_target_options
+        self._loop = loop
+        self._target_ttl = target_ttl
+        self._target_index = TaskTargetIndex()
+        self._targets_generation: Optional[int] = None
+        self._targets_retrieved = -math.inf
+        self._target_refresh: Optional[asyncio.Task] = None
+        self._target_keeper: Optional[asyncio.Task] = None
+        self._loop_monitor = loop_monitor
+        self._stream_chunk_size = stream_chunk_size
+        self._etag_salt = os.urandom(8).hex()
+        self._task_fragments = TaskFragmentCache()
 
         # Sanity checks for task targets and task definitions.
         TaskTargetDef.check()
@@ -38,63 +87,116 @@ class Dashboard:
 
         # In case the list of targets will not change during
         # runtime, it can be retrieved now and remain constant.
-        if True == self._static_targets: self._retrieve_target_list()
+        if True == self._static_targets and not TaskTargetDef.is_async(): self._retrieve_target_list()
+
+    async def _get_index_etag(
+            self,
+            request: web.Request
+        ) -> Optional[str]:
+        """
+        Entity tag of the main page. For a given query, the page only changes along with the generation
+        of the task registry (tasks started or finished) and the version of the list of targets.
+        The entity tag is specific to this dashboard (i.e., it changes with restarts). The page has none
+        while the event loop is monitored, since the loop's statistics change continuously.
+        """
+        if self._loop_monitor: return None
+
+        await self._update_target_list()
+        key = f'{self._etag_salt}:{TaskRegistry.get_generation()}:{self._target_index.version}:{request.query_string}'
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
 
     @require_login
+    @conditional_get(_get_index_etag)
     @aiohttp_jinja2.template('index.html')
     async def index(
             self,
             request: web.Request
-        ) -> dict[str, Any]:
+        ) -> dict[str, Any] | web.StreamResponse:
         """
         Main content page.
+        The list of running tasks can be filtered by coroutine, module, target and parameter values
+        (given as 'name=value') and is split into pages. The targets offered for selection can be
+        searched for by (a part of) their string representation.
+        Clients having the current version of the page are told so without rendering it (see `conditional_get`).
         """
-        # In case the list of targets may change during
-        # runtime, it needs to be retrieved every time.
-        if False == self._static_targets: self._retrieve_target_list()
-
-        # Get info about executing tasks and order them by target ID.
-        all_exec_infos = TaskExec.get_all()
-        all_exec_infos.sort(key=lambda ei: ei.target)
+        query = request.query
 
-        task_display_info = []
+        # Registry generation this page is based on (see `TaskEventStream`).
+        registry_generation = TaskRegistry.get_generation()
 
-        prev_target_pos = 0
+        # Update list of targets (if necessary).
+        await self._update_target_list()
 
-        for exec_info in all_exec_infos:
+        # Retrieve filters for running tasks. Empty values match any task.
+        filters = {
+            'coroutine-id': str(query.get('coroutine-id', '')),
+            'module': str(query.get('module', '')),
+            'target-pos': str(query.get('target-pos', '')),
+            'param': str(query.get('param', '')),
+        }
 
-            target = exec_info.target
-            target_pos = self._task_targets.index(target, prev_target_pos)
+        filter_targets = None
+        if filters['target-pos']:
+            filter_targets = [self._get_target(filters['target-pos'], str(query.get('target-version', '')))]
+            # The position may refer to a previous version of the list of targets.
+            filters['target-pos'] = str(self._target_index.get_pos(filter_targets[0]))
+
+        filter_params = None
+        if filters['param']:
+            if not '=' in filters['param']: raise RuntimeError('Parameter filter must be given as "name=value"')
+            name, value = filters['param'].split('=', 1)
+            filter_params = {name.strip(): value.strip()}
+
+        # Select the requested page of running tasks (ordered by target) using the index.
+        page_size = max(1, int(query.get('page-size', self._page_size)))
+        page = max(1, int(query.get('page', 1)))
+        filter_args: dict[str, Any] = {
+            'coroutine_id': filters['coroutine-id'] or None,
+            'module': filters['module'] or None,
+            'targets': filter_targets,
+            'params': filter_params,
+        }
+        n_tasks, selected = TaskExec.select_page((page - 1) * page_size, page_size, **filter_args)
 
-            # Note: List of targets and list of tasks are sorted, hence the next task's
-            # target must correspond to the current or a later entry in the list of targets.
-            # Therefore, the position of the previous task's target is a good hint for finding
-            # the position of the current task's target.
-            prev_target_pos = target_pos
+        # Requested page is beyond the last page: show the last page.
+        n_pages = max(1, -(-n_tasks // page_size))
+        if page > n_pages:
+            page = n_pages
+            n_tasks, selected = TaskExec.select_page((page - 1) * page_size, page_size, **filter_args)
 
-            # Get parameters of executing task. Remove 'self' from methods and 'cls' from class methods.
-            params = exec_info.params.copy()
-            if exec_info.coroutine_def.context.is_method: params.pop('self')
-            if exec_info.coroutine_def.context.is_class_method: params.pop('cls')
+        # Get info about executing tasks for display (only for the requested page).
+        task_display_info = self._get_task_display_info([exec_info for _, exec_info in selected])
 
-            # Collect information about running task for display.
-            task_display_info.append((
-                target,
-                target_pos,
-                exec_info.coroutine_name,
-                exec_info.module,
-                exec_info.task_id,
-                exec_info.coroutine_id,
-                params,
-                exec_info.coroutine_def.context.typeInfo()
-            ))
+        # Retrieve the targets offered for selection.
+        target_search = str(query.get('target-search', ''))
+        target_options = self._get_target_options(target_search)
+        if filter_targets and not any(pos == int(filters['target-pos']) for pos, _ in target_options):
+            target_options.insert(0, (int(filters['target-pos']), filter_targets[0]))
 
         # Return info for rendering Jinja template.
-        return {
+        context = {
             'coroutine_defs': CoroutineDef.get_coroutine_defs(),
+            'modules': sorted({def_info.module for def_info in CoroutineDef.get_coroutine_defs().values()}),
             'task_display_info': task_display_info,
-            'task_targets': self._task_targets,
+            'task_item_html': self._task_fragments.render,
+            'task_targets': self._target_index.targets,
+            'target_version': self._target_index.version,
+            'target_options': target_options,
+            'target_search': target_search,
+            'max_target_options': self._max_target_options,
+            'loop_windows': self._loop_monitor.get_windows() if self._loop_monitor else None,
+            'loop_slow_callbacks': self._loop_monitor.get_slow_callbacks(limit=10) if self._loop_monitor else None,
+            'filters': filters,
+            'n_tasks': n_tasks,
+            'page': page,
+            'n_pages': n_pages,
+            'page_size': page_size,
+            'registry_generation': registry_generation,
+            'page_url': lambda p: str(request.rel_url.update_query(page=p)),
         }
+        if self._stream_chunk_size is None: return context
+
+        return await stream_template('index.html', request, context, self._stream_chunk_size)
 
     @require_login
     @aiohttp_jinja2.template('cancel-task.html')
@@ -108,9 +210,8 @@ class Dashboard:
         form = request.query
 
         # Retrieve target of executing task.
-        target_pos = int(form['target-pos'])
-        if target_pos >= len(self._task_targets): raise RuntimeError('Invalid target position')
-        target = self._task_targets[target_pos]
+        await self._update_target_list()
+        target = self._get_target(str(form['target-pos']), str(form.get('target-version', '')))
 
         # Get info about executing task. Ignore type warnings, execution info is guaranteed to be available.
         exec_info : TaskExecInfo = TaskExec.get_by_id(str(form['task-id']), from_cache=True) # type: ignore[assignment]
@@ -123,7 +224,8 @@ class Dashboard:
         # Return info for rendering Jinja template.
         return {
             'target': target,
-            'target_pos': target_pos,
+            'target_pos': self._target_index.get_pos(target),
+            'target_version': self._target_index.version,
             'func_name': exec_info.coroutine_name,
             'module': exec_info.module,
             'params': params,
@@ -142,9 +244,8 @@ class Dashboard:
         form = await request.post()
 
         # Retrieve target of executing task.
-        target_pos = int(form['target-pos']) # type: ignore[arg-type]
-        if target_pos >= len(self._task_targets): raise RuntimeError('Invalid target position')
-        target = self._task_targets[target_pos]
+        await self._update_target_list()
+        target = self._get_target(str(form['target-pos']), str(form.get('target-version', '')))
 
         # Cancel running task.
         TaskExec.cancel(
@@ -156,6 +257,103 @@ class Dashboard:
         # Go bask to index page.
         raise web.HTTPSeeOther(location='/')
 
+    @require_login
+    @aiohttp_jinja2.template('cancel-tasks.html')
+    async def cancel_tasks_apply(
+            self,
+            request: web.Request
+        ) -> dict[str, Any]:
+        """
+        Handle cancellation of multiple tasks at once.
+        Tasks are selected by task IDs, coroutine ID (or '*' for any coroutine) and/or target.
+        Without timeout, the cancellations are only requested and the client is redirected to the
+        index page. Otherwise, wait (with timeout) for the cancellations to complete and report the
+        outcome per task.
+        """
+        form = await request.post()
+
+        # Retrieve selection criteria. Empty values match any task.
+        task_ids = [str(task_id) for task_id in form.getall('task-id', [])] or None
+        str_coroutine_id = str(form.get('coroutine-id', ''))
+        coroutine_id = str_coroutine_id if str_coroutine_id != '*' else None
+        str_target_pos = str(form.get('target-pos', ''))
+        str_timeout = str(form.get('timeout', ''))
+
+        if not task_ids and not str_coroutine_id and not str_target_pos:
+            raise RuntimeError('No tasks selected for cancellation')
+
+        targets = None
+        if str_target_pos:
+            await self._update_target_list()
+            targets = [self._get_target(str_target_pos, str(form.get('target-version', '')))]
+
+        # Cancel all selected tasks in one pass.
+        cancelled = TaskExec.cancel_many(task_ids=task_ids, coroutine_id=coroutine_id, targets=targets)
+
+        # Go back to index page, unless waiting for the cancellations to complete has been requested.
+        if not str_timeout: raise web.HTTPSeeOther(location='/')
+
+        if cancelled:
+            await run_in_loop(
+                self._app_loop(), asyncio.wait, [task for task, _ in cancelled.values()], timeout=float(str_timeout)
+            )
+
+        # Collect the outcome per task.
+        cancel_info: list[tuple[Any, Optional[str], Optional[str], str, str]] = []
+        for task_id, (task, exec_info) in cancelled.items():
+            if not task.done():
+                outcome = 'pending'
+            elif task.cancelled():
+                outcome = 'cancelled'
+            else:
+                outcome = 'finished'
+            cancel_info.append((exec_info.target, exec_info.coroutine_name, exec_info.module, task_id, outcome))
+
+        for task_id in task_ids or []:
+            if task_id not in cancelled: cancel_info.append((None, None, None, task_id, 'not found'))
+
+        # Return info for rendering Jinja template.
+        return {
+            'cancel_info': cancel_info,
+        }
+
+    @require_login
+    @aiohttp_jinja2.template('task-stack.html')
+    async def task_stack(
+            self,
+            request: web.Request
+        ) -> dict[str, Any]:
+        """
+        Await chain of a running task, i.e., where it is suspended (see `TaskAwaitChain`).
+        The chain is retrieved only for this page, with at most 'depth' nodes along each path.
+        """
+        query = request.query
+
+        str_task_id = str(query['task-id'])
+        depth = int(query.get('depth', TaskAwaitChain.DEFAULT_DEPTH))
+
+        selected = TaskExec.select(task_ids=[str_task_id])
+        if not selected: raise RuntimeError(f'No task with ID "{str_task_id}" has been found.')
+        task, exec_info = selected[str_task_id]
+        chain = await TaskAwaitChain.get_async(task, depth)
+
+        # Get parameters of executing task. Remove 'self' from methods and 'cls' from class methods.
+        params = exec_info.params.copy()
+        if exec_info.coroutine_def.context.is_method: params.pop('self')
+        if exec_info.coroutine_def.context.is_class_method: params.pop('cls')
+
+        # Return info for rendering Jinja template.
+        return {
+            'target': exec_info.target,
+            'func_name': exec_info.coroutine_name,
+            'module': exec_info.module,
+            'type_info': exec_info.coroutine_def.context.typeInfo(),
+            'params': params,
+            'task_id': str_task_id,
+            'depth': depth,
+            'chain': chain,
+        }
+
     @require_login
     @aiohttp_jinja2.template('start-task.html')
     async def start_task(
@@ -166,41 +364,22 @@ class Dashboard:
         Task start-up page.
         """
         form = request.query
-        target_pos = int(form['target-pos'])
         coroutine_id = str(form['coroutine-id'])
 
         # Retrieve target for new task.
-        if target_pos >= len(self._task_targets): raise RuntimeError('Invalid target position')
-        target = self._task_targets[target_pos]
-
-        # Retrieve coroutine info for new task.
-        def_info = CoroutineDef.get_coroutine_def_info(coroutine_id)
-        if not def_info: raise RuntimeError('Unknown function ID')
-
-        # Get code context of coroutine.
-        context = def_info.context
-
-        # Sanity check: Does the class containing the coroutine (if any)
-        # match the process the dashboard is attached to?
-        containing_class = context.containing_class
-        if containing_class and not isinstance(self._process, containing_class):
-            raise RuntimeError(
-                f'Function "{def_info.func_name}" is not a method of class "{self._process.__class__.__name__}"'
-            )
-
-        # Retrieve params for new task. Remove target ID parameter (has already been selected before).
-        params = context.parameters.copy()
-        params.pop(def_info.target_param)
+        await self._update_target_list()
+        target = self._get_target(str(form['target-pos']), str(form.get('target-version', '')))
 
-        if context.is_method or context.is_class_method:
-            params.popitem(last=False) # Remove first parameter of method (self / cls).
+        # Retrieve coroutine info and params for new task.
+        def_info, params = self._get_start_params(coroutine_id)
 
         # Return info for rendering Jinja template.
         return {
             'coroutine_id': coroutine_id,
             'target_param': def_info.target_param,
             'target': target,
-            'target_pos': target_pos,
+            'target_pos': self._target_index.get_pos(target),
+            'target_version': self._target_index.version,
             'params': params.values(),
             'get_type': get_html_input_type
         }
@@ -216,98 +395,367 @@ class Dashboard:
         form = (await request.post()).copy()
         coroutine_id = str(form.pop('coroutine-id'))
         target_param = str(form.pop('target-param'))
-        target_pos = int(form.pop('target-pos')) # type: ignore[arg-type]
+        str_target_pos = str(form.pop('target-pos'))
+        str_target_version = str(form.pop('target-version', ''))
 
         # Retrieve coroutine info. Ignore type warnings, coroutine info is guaranteed to be available.
         func_info: CoroutineDefInfo = CoroutineDef.get_coroutine_def_info(coroutine_id) # type: ignore[assignment]
 
         # Extract parameter names and their values for calling the coroutine.
-        param_list = func_info.context.parameters
-        param_apply = {
-            k: param_list[k].default if not v else get_type_from_str(param_list[k],str(v)) for k, v in form.items()
-        }
+        param_apply = self._get_param_values(func_info, form)
 
         # Retrieve target ID param value and add it to the parameters.
-        if target_pos >= len(self._task_targets): raise RuntimeError('Invalid target position')
-        target = self._task_targets[target_pos]
-        param_apply[target_param] = target
+        await self._update_target_list()
+        param_apply[target_param] = self._get_target(str_target_pos, str_target_version)
 
         # Start new task.
-        loop = asyncio.get_event_loop()
-        if func_info.context.is_method:
-            task = loop.create_task(func_info.func(self._process, **param_apply))
-        else:
-            task = loop.create_task(func_info.func(**param_apply))
-
-        # Add to list of tasks, creating a strong reference to avoid the task disappearing mid-execution.
-        list_all_tasks.add(task)
-        # To prevent keeping references to finished tasks forever, make each task remove its own reference
-        # from the set after completion.
-        task.add_done_callback(list_all_tasks.discard)
+        await run_in_loop(self._app_loop(), self._create_task, func_info, param_apply)
 
         # Go bask to index page.
         raise web.HTTPSeeOther(location='/')
 
-    @aiohttp_jinja2.template('login.html')
-    async def login(
+    @require_login
+    @aiohttp_jinja2.template('start-tasks.html')
+    async def start_tasks(
             self,
             request: web.Request
         ) -> dict[str, Any]:
         """
-        Login page.
+        Page for starting tasks for multiple targets at once.
+        The targets offered for selection can be searched for (see `index`).
         """
-        # Retrieve session.
-        session = await aiohttp_session.get_session(request)
+        form = request.query
+        coroutine_id = str(form['coroutine-id'])
+        target_search = str(form.get('target-search', ''))
 
-        # Get login status.
-        login_status = session.get('login_status', LoginStatus.LOGGED_OUT)
+        # Retrieve coroutine info and params for new tasks.
+        def_info, params = self._get_start_params(coroutine_id)
+        await self._update_target_list()
 
-        # Display login page.
-        if login_status == LoginStatus.FAILED:
-            return {'info': 'Login failed.'}
-        else:
-            return {}
+        # Return info for rendering Jinja template.
+        return {
+            'coroutine_id': coroutine_id,
+            'func_name': def_info.func_name,
+            'task_targets': self._target_index.targets,
+            'target_version': self._target_index.version,
+            'target_options': self._get_target_options(target_search),
+            'target_search': target_search,
+            'max_target_options': self._max_target_options,
+            'params': params.values(),
+            'get_type': get_html_input_type
+        }
 
-    async def login_apply(
+    @require_login
+    async def start_tasks_apply(
             self,
             request: web.Request
         ) -> web.Response:
         """
-        Handle login attempts.
+        Handle start-up of tasks for multiple targets at once.
+        The targets are selected either all at once ('all'), by their positions ('list') or by matching
+        their string representation against a Unix shell-style wildcard pattern ('pattern').
+        Optionally, the tasks are started in batches of limited size with a pause in between (pacing),
+        and the number of these tasks running at the same time is limited (concurrency cap).
         """
-        # Retrieve session.
-        session = await aiohttp_session.get_session(request)
-
-        # Get entered password.
         form = await request.post()
-        password = str(form['password'])
-
-        # Check entered password.
-        if self._pwd_hash.check(password):
-            # Correct password: redirect to main content page.
-            session['login_status'] = LoginStatus.LOGGED_IN
-            raise web.HTTPSeeOther(location='/')
+        coroutine_id = str(form['coroutine-id'])
+        target_selection = str(form.get('target-selection', 'all'))
+        str_batch_size = str(form.get('batch-size', ''))
+        str_batch_interval = str(form.get('batch-interval', ''))
+        str_max_concurrency = str(form.get('max-concurrency', ''))
+
+        # Retrieve coroutine info.
+        func_info = CoroutineDef.get_coroutine_def_info(coroutine_id)
+        if not func_info: raise RuntimeError('Unknown function ID')
+
+        # Select targets.
+        await self._update_target_list()
+        if target_selection == 'all':
+            targets = list(self._target_index.targets)
+        elif target_selection == 'list':
+            str_target_version = str(form.get('target-version', ''))
+            targets = [self._get_target(str(pos), str_target_version) for pos in form.getall('target-pos', [])]
+        elif target_selection == 'pattern':
+            target_pattern = str(form['target-pattern'])
+            targets = [t for t in self._target_index.targets if fnmatchcase(str(t), target_pattern)]
         else:
-            # Incorrect password: redirect to login page.
-            session['login_status'] = LoginStatus.FAILED
-            raise web.HTTPSeeOther(location='/login')
+            raise RuntimeError(f'Unknown target selection: {target_selection}')
+
+        # Extract parameter names and their values for calling the coroutine (identical for all tasks).
+        param_apply = self._get_param_values(func_info, form)
+
+        batch_size = int(str_batch_size) if str_batch_size else len(targets)
+        if batch_size < 1: raise RuntimeError('Invalid batch size')
+        batch_interval = float(str_batch_interval) if str_batch_interval else 0.
+        max_concurrency = int(str_max_concurrency) if str_max_concurrency else None
+        if max_concurrency is not None and max_concurrency < 1: raise RuntimeError('Invalid concurrency cap')
+
+        # Start new tasks.
+        await run_in_loop(
+            self._app_loop(), self._start_tasks, func_info, param_apply, targets, batch_size, batch_interval, max_concurrency
+        )
+
+        # Go bask to index page.
+        raise web.HTTPSeeOther(location='/')
+
+    def _get_task_display_info(self, exec_infos: Optional[list[TaskExecInfo]] = None) -> list[TaskDisplayInfo]:
+        """
+        Collect information about running tasks for display, ordered by target.
+        If no list of execution infos is provided, information about all running tasks is collected.
+        """
+        # Get info about executing tasks and order them by target ID (and task ID, like `TaskExec.select_page`).
+        all_exec_infos = TaskExec.get_all() if exec_infos is None else list(exec_infos)
+        all_exec_infos.sort(key=lambda ei: (ei.target, ei.task_id))
+
+        # Collect information about running tasks for display.
+        return [
+            self._get_display_info(exec_info, self._get_target_pos(exec_info.target)) for exec_info in all_exec_infos
+        ]
+
+    def _get_target_options(self, search: str = '', limit: Optional[int] = None) -> list[tuple[int, Any]]:
+        """
+        Retrieve the targets (and their positions) offered for selection. Only targets whose
+        string representation contains the search string (case-insensitive) are returned.
+        The number of returned targets is limited.
+        """
+        limit = self._max_target_options if limit is None else limit
+        task_targets = self._target_index.targets
+        if not search: return list(enumerate(task_targets[:limit]))
+
+        search = search.casefold()
+        matches = ((pos, target) for pos, target in enumerate(task_targets) if search in str(target).casefold())
+        return list(islice(matches, limit))
+
+    def _get_target_pos(self, target: Any) -> int:
+        """
+        Retrieve the position of a target in the (sorted) list of targets.
+        Raise a `ValueError` if the target is not listed.
+        """
+        return self._target_index.get_pos(target)
+
+    def _get_target(self, str_target_pos: str, str_target_version: str = '') -> Any:
+        """
+        Retrieve a target by its position (as submitted by a form). In case the version of the list of
+        targets the position refers to is given, the position may also refer to a previous version.
+        """
+        return self._target_index.resolve(int(str_target_pos), int(str_target_version) if str_target_version else None)
+
+    @staticmethod
+    def _get_display_info(exec_info: TaskExecInfo, target_pos: int) -> TaskDisplayInfo:
+        """
+        Collect information about a running task for display.
+        """
+        # Get parameters of executing task. Remove 'self' from methods and 'cls' from class methods.
+        params = exec_info.params.copy()
+        if exec_info.coroutine_def.context.is_method: params.pop('self')
+        if exec_info.coroutine_def.context.is_class_method: params.pop('cls')
+
+        return (
+            exec_info.target,
+            target_pos,
+            exec_info.coroutine_name,
+            exec_info.module,
+            exec_info.task_id,
+            exec_info.coroutine_id,
+            params,
+            exec_info.coroutine_def.context.typeInfo()
+        )
+
+    def _get_start_params(self, coroutine_id: str) -> tuple[CoroutineDefInfo, OrderedDict[str, Parameter]]:
+        """
+        Retrieve coroutine info and the parameters that have to be specified for starting a new task.
+        """
+        def_info = CoroutineDef.get_coroutine_def_info(coroutine_id)
+        if not def_info: raise RuntimeError('Unknown function ID')
+
+        # Get code context of coroutine.
+        context = def_info.context
+
+        # Sanity check: Does the class containing the coroutine (if any)
+        # match the process the dashboard is attached to?
+        containing_class = context.containing_class
+        if containing_class and not isinstance(self._process, containing_class):
+            raise RuntimeError(
+                f'Function "{def_info.func_name}" is not a method of class "{self._process.__class__.__name__}"'
+            )
+
+        # Retrieve params for new task. Remove target ID parameter (is selected separately).
+        params = context.parameters.copy()
+        params.pop(def_info.target_param)
+
+        # Remove first parameter of method (self / cls). Note: The parameters are sorted by
+        # name, hence the first parameter of the method has to be removed by its name.
+        if context.is_method: params.pop('self')
+        if context.is_class_method: params.pop('cls')
 
-    async def logout(
+        return def_info, params
+
+    @staticmethod
+    def _get_param_values(func_info: CoroutineDefInfo, form: Mapping[str, Any]) -> dict[str, Any]:
+        """
+        Extract parameter names and their values from a submitted form.
+        Form fields that do not correspond to a parameter of the coroutine are ignored.
+        """
+        param_list = func_info.context.parameters
+        return {
+            k: param_list[k].default if not v else get_type_from_str(param_list[k],str(v))
+                for k, v in form.items() if k in param_list
+        }
+
+    def _create_task(self, func_info: CoroutineDefInfo, param_apply: dict[str, Any]) -> asyncio.Task:
+        """
+        Start a new task executing a coroutine.
+        """
+        return TaskExec.start(func_info, param_apply, self._process)
+
+    def _start_tasks(
             self,
-            request: web.Request
-        ) -> web.Response:
+            func_info: CoroutineDefInfo,
+            param_apply: dict[str, Any],
+            targets: list[Any],
+            batch_size: int,
+            batch_interval: float,
+            max_concurrency: Optional[int] = None
+        ) -> None:
+        """
+        Start new tasks for a list of targets. Without concurrency cap, the first batch is started
+        right away. All other tasks are started in the background (see `_ramp_up`).
+        """
+        if max_concurrency is None:
+            for target in targets[:batch_size]:
+                self._create_task(func_info, {**param_apply, func_info.target_param: target})
+            targets = targets[batch_size:]
+
+        if targets:
+            launcher = asyncio.get_event_loop().create_task(
+                self._ramp_up(func_info, param_apply, targets, batch_size, batch_interval, max_concurrency)
+            )
+            list_all_tasks.add(launcher)
+            launcher.add_done_callback(list_all_tasks.discard)
+
+    async def _ramp_up(
+            self,
+            func_info: CoroutineDefInfo,
+            param_apply: dict[str, Any],
+            targets: list[Any],
+            batch_size: int,
+            batch_interval: float,
+            max_concurrency: Optional[int] = None
+        ) -> None:
         """
-        Handle logout.
+        Start new tasks for a list of targets in batches, pausing between consecutive batches.
+        With concurrency cap, a new task is only started once the number of these tasks that are
+        still running is below the cap (gated by a semaphore, released when a task is done).
         """
-        # Retrieve session.
-        session = await aiohttp_session.get_session(request)
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        for pos in range(0, len(targets), batch_size):
+            if pos or max_concurrency is None: await asyncio.sleep(batch_interval)
+            for target in targets[pos:pos + batch_size]:
+                if semaphore: await semaphore.acquire()
+                task = self._create_task(func_info, {**param_apply, func_info.target_param: target})
+                if semaphore: task.add_done_callback(self._release_on_done(semaphore))
 
-        # Reset login status.
-        session['login_status'] = LoginStatus.LOGGED_OUT
+    @staticmethod
+    def _release_on_done(semaphore: asyncio.Semaphore) -> Callable[[asyncio.Task], None]:
+        """
+        Create a done-callback for a task that releases a semaphore.
+        """
+        return lambda _: semaphore.release()
 
-        # Redirect to login page.
-        raise web.HTTPSeeOther(location="/login")
+    def _app_loop(self) -> Loop:
+        """
+        Retrieve the event loop executing the monitored tasks.
+        """
+        return self._loop or asyncio.get_running_loop()
+
+    async def _update_target_list(self) -> None:
+        """
+        In case the list of targets may change during runtime, it needs to be retrieved again
+        once a change has been reported or the previously retrieved list has expired.
+        Only the first retrieval from a coroutine function is awaited (see `_update_target_list_nowait`).
+        """
+        if self._targets_generation is None and TaskTargetDef.is_async():
+            await asyncio.shield(self._refresh_target_list())
+        else:
+            self._update_target_list_nowait()
+
+    def _update_target_list_nowait(self) -> None:
+        """
+        Like `_update_target_list`, but lists provided by coroutine functions are retrieved in the background.
+        Until then, the previously retrieved list is used (stale-while-revalidate).
+        """
+        if self._targets_generation is not None:
+            if True == self._static_targets: return
+            if (
+                self._targets_generation == TaskTargetDef.get_generation() and
+                time.monotonic() - self._targets_retrieved < self._target_ttl
+            ): return
+
+        if TaskTargetDef.is_async():
+            self._refresh_target_list()
+        else:
+            self._retrieve_target_list()
 
     def _retrieve_target_list(self) -> None:
-        self._task_targets = TaskTargetDef.get_targets(process=self._process)
-        self._task_targets.sort()
+        """
+        Retrieve the list of targets. It is only sorted and indexed again in case it has changed.
+        """
+        self._targets_generation = TaskTargetDef.get_generation()
+        self._targets_retrieved = time.monotonic()
+        self._target_index.update(TaskTargetDef.get_targets(process=self._process))
+
+    def _refresh_target_list(self) -> asyncio.Task:
+        """
+        Retrieve the list of targets from a coroutine function in the background (unless already in progress).
+        """
+        if not self._target_refresh or self._target_refresh.done():
+            self._target_refresh = asyncio.get_running_loop().create_task(self._retrieve_target_list_async())
+            self._target_refresh.add_done_callback(self._on_target_refresh_done)
+        return self._target_refresh
+
+    async def _retrieve_target_list_async(self) -> None:
+        """
+        Retrieve the list of targets from a coroutine function (on the event loop executing the monitored tasks).
+        Once the list expires after some time, it is kept up to date in the background (see `_keep_target_list`).
+        """
+        generation = TaskTargetDef.get_generation()
+        retrieved = time.monotonic()
+        targets = await run_in_loop(self._app_loop(), TaskTargetDef.get_targets_async, self._process)
+
+        self._targets_generation = generation
+        self._targets_retrieved = retrieved
+        self._target_index.update(targets)
+
+        if not self._target_keeper and not self._static_targets and 0. < self._target_ttl < math.inf:
+            self._target_keeper = asyncio.get_running_loop().create_task(self._keep_target_list())
+
+    async def _keep_target_list(self) -> None:
+        """
+        Retrieve the list of targets from a coroutine function again whenever it expires,
+        such that requests are not served from an expired list.
+        """
+        while True:
+            await asyncio.sleep(max(0., self._targets_retrieved + self._target_ttl - time.monotonic()))
+            try:
+                await asyncio.shield(self._refresh_target_list())
+            except Exception:
+                await asyncio.sleep(self._target_ttl) # Reported by `_on_target_refresh_done`, retry later.
+
+    @staticmethod
+    def _on_target_refresh_done(task: asyncio.Task) -> None:
+        """
+        Report failed retrievals of the list of targets (the previously retrieved list remains in use).
+        """
+        if not task.cancelled() and task.exception():
+            warn(f'Retrieving the list of targets failed: {task.exception()!r}', RuntimeWarning)
+
+    async def close(self) -> None:
+        """
+        Stop retrieving the list of targets in the background and drop the rendered entries of running tasks.
+        """
+        self._task_fragments.close()
+        tasks = [task for task in (self._target_keeper, self._target_refresh) if task]
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._target_keeper = self._target_refresh = None
@@ -0,0 +1,370 @@
+import asyncio
+import hashlib
+import sys
+from dataclasses import asdict
+
+import aiohttp.web as web
+
+from .login import *
+from .util import *
+
+from .coroutine_def import CoroutineDef
+from .dashboard import Dashboard
+from .task_exec import TaskExec
+from .task_await_chain import TaskAwaitChain
+from .task_history import TaskHistory
+from .task_profiler import TaskProfiler
+from .task_registry import TaskRegistry
+
+from typing import Any, Optional
+
+class DashboardAPI:
+    """
+    JSON API of the dashboard.
+    Provides the same information as the HTML pages (running tasks, targets, coroutine definitions)
+    and allows to start and cancel tasks. All responses carry an entity tag, such that polling clients
+    can send conditional requests (header 'If-None-Match') and receive a reply with status 304 (not
+    modified) in case nothing has changed.
+    """
+
+    def __init__(
+            self,
+            dashboard: Dashboard,
+            profiler: Optional[TaskProfiler] = None
+        ) -> None:
+        """
+        Contructor.
+        """
+        self._dashboard = dashboard
+        self._profiler = profiler or TaskProfiler()
+
+    async def close(self) -> None:
+        """
+        Stop profiling.
+        """
+        self._profiler.close()
+
+    async def _get_tasks_etag(
+            self,
+            request: web.Request
+        ) -> Optional[str]:
+        """
+        Entity tag of the list of running tasks. For a given query, the list only changes along with the
+        generation of the task registry and the version of the list of targets (see `Dashboard._get_index_etag`).
+        """
+        await self._dashboard._update_target_list()
+        key = f'{self._dashboard._etag_salt}:tasks:{TaskRegistry.get_generation()}:' + \
+            f'{self._dashboard._target_index.version}:{request.query_string}'
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    @require_login
+    @json_api
+    @conditional_get(_get_tasks_etag)
+    async def get_tasks(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        List running tasks, ordered by target. Optionally, only list the tasks starting at position
+        'offset' and limit their number ('limit'), the total number of tasks is given as 'n_tasks'.
+        Target positions refer to the list of targets of the given version ('target_version').
+        Clients having the current version of the list are told so without collecting it (see `conditional_get`).
+        """
+        offset = max(0, int(request.query.get('offset', 0)))
+        limit = max(0, int(request.query.get('limit', sys.maxsize)))
+
+        n_tasks, selected = TaskExec.select_page(offset, limit)
+
+        tasks = [
+            {
+                'task_id': task_id,
+                'coroutine_id': coroutine_id,
+                'coroutine_name': func_name,
+                'module': module,
+                'target': target,
+                'target_pos': target_pos,
+                'params': params,
+                'type_info': type_info,
+            }
+            for (target, target_pos, func_name, module, task_id, coroutine_id, params, type_info)
+                in self._dashboard._get_task_display_info([exec_info for _, exec_info in selected])
+        ]
+
+        return json_response(
+            request, {'tasks': tasks, 'n_tasks': n_tasks, 'target_version': self._dashboard._target_index.version}
+        )
+
+    @require_login
+    @json_api
+    async def get_targets(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        List all targets. Optionally, only list targets whose string representation
+        contains a search string (query parameter 'q') and limit their number ('limit').
+        Target positions refer to the list of targets of the given version ('target_version').
+        """
+        await self._dashboard._update_target_list()
+
+        search = request.query.get('q', '')
+        limit = int(request.query.get('limit', len(self._dashboard._target_index.targets)))
+
+        targets = [
+            {'target': target, 'target_pos': pos} for pos, target in self._dashboard._get_target_options(search, limit)
+        ]
+
+        return json_response(request, {'targets': targets, 'target_version': self._dashboard._target_index.version})
+
+    @require_login
+    @json_api
+    async def get_coroutines(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        List all coroutine definitions, including their parameters.
+        """
+        coroutines = []
+
+        for coroutine_id, def_info in CoroutineDef.get_coroutine_defs().items():
+            context = def_info.context
+
+            params = [
+                {
+                    'name': param.name,
+                    'type': getattr(param.annotation, '__name__', str(param.annotation)),
+                    'required': param.default is param.empty,
+                    'default': None if param.default is param.empty else param.default,
+                    'input_type': get_html_input_type(param),
+                }
+                for param in context.parameters.values() if not param.name in ['self', 'cls']
+            ]
+
+            coroutines.append({
+                'coroutine_id': coroutine_id,
+                'coroutine_name': def_info.func_name,
+                'module': def_info.module,
+                'target_param': def_info.target_param,
+                'type_info': context.typeInfo(),
+                'params': params,
+            })
+
+        return json_response(request, {'coroutines': coroutines})
+
+    @require_login
+    @json_api
+    async def get_await_chain(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Await chain of a running task, i.e., where it is suspended (see `TaskAwaitChain`), with at most
+        'depth' nodes along each path. Nodes are coroutines (with file and line), awaited tasks (with their
+        own chain as child), gathered awaitables (with one child chain each) and other futures.
+        """
+        str_task_id = request.match_info['task_id']
+        depth = int(request.query.get('depth', TaskAwaitChain.DEFAULT_DEPTH))
+
+        selected = TaskExec.select(task_ids=[str_task_id])
+        if not selected: raise web.HTTPNotFound(text=f'No task with ID "{str_task_id}" found')
+        task, exec_info = selected[str_task_id]
+        chain = await TaskAwaitChain.get_async(task, depth)
+
+        return json_response(request, {
+            'task_id': str_task_id,
+            'coroutine_id': exec_info.coroutine_id,
+            'chain': [asdict(node) for node in chain],
+        })
+
+    @require_login
+    @json_api
+    async def get_history(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        List finished task executions, most recently finished first. Optionally, only list executions within
+        a time range (query parameters 'since' and 'until', in seconds since the epoch), for some targets
+        (by their string representation, parameter 'target' may be repeated) and/or a coroutine ('coroutine_id').
+        At most 'limit' executions are listed. With 'source=file', executions are read from the history file,
+        which also includes executions no longer kept in memory.
+        """
+        query = request.query
+
+        since = float(query['since']) if 'since' in query else None
+        until = float(query['until']) if 'until' in query else None
+        targets = query.getall('target') if 'target' in query else None
+        coroutine_id = query.get('coroutine_id')
+        limit = int(query.get('limit', 100))
+
+        if query.get('source') == 'file':
+            records = await asyncio.get_running_loop().run_in_executor(
+                None, TaskHistory.query_file, since, until, targets, coroutine_id, limit
+            )
+        else:
+            records = TaskHistory.query(since, until, targets, coroutine_id, limit)
+
+        history = [
+            {
+                'task_id': record.task_id,
+                'coroutine_id': record.coroutine_id,
+                'coroutine_name': record.coroutine_name,
+                'module': record.module,
+                'target': record.target,
+                'params': record.params,
+                'started': record.started,
+                'finished': record.finished,
+                'duration': record.duration,
+                'outcome': record.outcome,
+                'detail': record.detail,
+            }
+            for record in records
+        ]
+
+        return json_response(request, {'history': history})
+
+    @require_login
+    @json_api
+    async def get_loop(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Health of the tasks' event loop: lag percentiles over sliding windows, the series of lags (optionally
+        only since a point in time, query parameter 'since' in seconds since the epoch) and captured slow callbacks.
+        Lags and durations are given in seconds.
+        """
+        loop_monitor = self._dashboard._loop_monitor
+        if not loop_monitor: raise web.HTTPNotFound(text='Event loop is not monitored')
+
+        since = float(request.query['since']) if 'since' in request.query else None
+
+        slow_callbacks = [
+            {
+                'time': slow_callback.time,
+                'duration': slow_callback.duration,
+                'callback': slow_callback.callback,
+                'task_id': slow_callback.task_id,
+                'coroutine_id': slow_callback.coroutine_id,
+                'coroutine_name': slow_callback.coroutine_name,
+                'module': slow_callback.module,
+                'target': slow_callback.target,
+            }
+            for slow_callback in loop_monitor.get_slow_callbacks()
+        ]
+
+        return json_response(request, {
+            'interval': loop_monitor.interval,
+            'slow_callback_threshold': loop_monitor.slow_callback_threshold,
+            'windows': loop_monitor.get_windows(),
+            'series': loop_monitor.get_series(since),
+            'slow_callbacks': slow_callbacks,
+        })
+
+    @require_login
+    @json_api
+    async def get_profile(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Profile a running task (query parameter 'task_id') or all running tasks executing a coroutine ('coroutine_id')
+        for 'duration' seconds (default 5), sampling their stacks every 'interval' seconds (see `TaskProfiler`).
+        The stacks are returned in the collapsed format (plain text), or merged into a flame graph ('format=json').
+        """
+        query = request.query
+
+        if 'task_id' in query:
+            selected = TaskExec.select(task_ids=[query['task_id']])
+        elif 'coroutine_id' in query:
+            selected = TaskExec.select(coroutine_id=query['coroutine_id'])
+        else:
+            raise RuntimeError('Either task_id or coroutine_id must be given')
+        if not selected: raise web.HTTPNotFound(text='No running tasks found')
+
+        profile = await self._profiler.profile(
+            [task for task, _ in selected.values()],
+            float(query.get('duration', 5)),
+            float(query['interval']) if 'interval' in query else None
+        )
+
+        if query.get('format') != 'json': return web.Response(text=profile.collapsed(), content_type='text/plain')
+
+        return json_response(request, {
+            'started': profile.started,
+            'duration': profile.duration,
+            'interval': profile.interval,
+            'n_samples': profile.n_samples,
+            'n_tasks': profile.n_tasks,
+            'flamegraph': profile.flamegraph(),
+        })
+
+    @require_login
+    @json_api
+    async def start_task(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Start a new task.
+        The request body is a JSON object with the coroutine ID ('coroutine_id'), the target (either by
+        position 'target_pos' or by its string representation 'target') and the parameters ('params').
+        Optionally, the version of the list of targets the position refers to is given ('target_version').
+        Parameters that are not specified take their default values. Parameter values given as strings
+        are converted to the parameter types.
+        """
+        data = await request.json()
+        if not isinstance(data, dict): raise RuntimeError('Request body must be a JSON object')
+        if not 'coroutine_id' in data: raise RuntimeError('Coroutine ID ("coroutine_id") is missing')
+        if not 'target_pos' in data and not 'target' in data:
+            raise RuntimeError('Target (either "target_pos" or "target") is missing')
+
+        coroutine_id = str(data['coroutine_id'])
+        def_info, params = self._dashboard._get_start_params(coroutine_id)
+
+        # Retrieve target.
+        await self._dashboard._update_target_list()
+        target_index = self._dashboard._target_index
+        if 'target_pos' in data:
+            target_version = data.get('target_version')
+            target = target_index.resolve(int(data['target_pos']), None if target_version is None else int(target_version))
+        else:
+            matches = [t for t in target_index.targets if str(t) == str(data['target'])]
+            if not matches: raise RuntimeError(f'Unknown target: {data["target"]}')
+            target = matches[0]
+
+        # Retrieve parameter values.
+        param_values = data.get('params', {})
+        if not isinstance(param_values, dict): raise RuntimeError('Parameters ("params") must be a JSON object')
+        unknown = [name for name in param_values if not name in params]
+        if unknown: raise RuntimeError(f'Unknown parameters: {", ".join(unknown)}')
+        missing = [name for name, param in params.items() if param.default is param.empty and not name in param_values]
+        if missing: raise RuntimeError(f'Missing parameters: {", ".join(missing)}')
+
+        param_apply = {
+            name: get_type_from_str(params[name], value) if isinstance(value, str) else value
+                for name, value in param_values.items()
+        }
+        param_apply[def_info.target_param] = target
+
+        # Start new task.
+        task = await run_in_loop(self._dashboard._app_loop(), self._dashboard._create_task, def_info, param_apply)
+
+        return json_response(request, {'task_id': task_id(task)}, status=201)
+
+    @require_login
+    @json_api
+    async def cancel_task(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Cancel a running task.
+        """
+        str_task_id = request.match_info['task_id']
+
+        cancelled = TaskExec.cancel_many(task_ids=[str_task_id])
+        if not cancelled: raise web.HTTPNotFound(text=f'No task with ID "{str_task_id}" found')
+
+        return json_response(request, {'task_id': str_task_id, 'outcome': 'cancellation requested'}, status=202)
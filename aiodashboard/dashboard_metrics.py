@@ -0,0 +1,170 @@
+import time
+
+import aiohttp.web as web
+import aiohttp_jinja2
+
+from .login import *
+from .util import *
+
+from .coroutine_def import CoroutineDef
+from .latency_histogram import LatencyHistogram
+from .task_metrics import TaskMetrics
+
+from typing import Any, Optional
+
+class DashboardMetrics:
+    """
+    Runtime metrics of the coroutines (see `TaskMetrics`): an HTML page with latency quantiles,
+    throughput and error rates, and the latency histograms in the Prometheus text exposition format.
+    """
+
+    # Bucket boundaries of the histograms in the Prometheus format (powers of four, about 1 µs to 68 min).
+    PROMETHEUS_EXPONENTS: list[int] = list(range(LatencyHistogram.MIN_EXPONENT, LatencyHistogram.MAX_EXPONENT + 1, 2))
+
+    @require_login
+    @aiohttp_jinja2.template('metrics.html')
+    async def metrics(
+            self,
+            request: web.Request
+        ) -> dict[str, Any]:
+        """
+        Metrics page: one row per coroutine (and target, if metrics are broken down by target).
+        """
+        elapsed = max(time.time() - TaskMetrics.get_since(), 1e-9)
+
+        coroutine_metrics = [
+            self._get_metrics(coroutine_id, None, histogram, elapsed)
+                for coroutine_id, histogram in TaskMetrics.get_histograms().items()
+        ]
+        target_metrics = [
+            self._get_metrics(coroutine_id, target, histogram, elapsed)
+                for (coroutine_id, target), histogram in sorted(TaskMetrics.get_target_histograms().items())
+        ]
+
+        return {
+            'coroutine_metrics': sorted(coroutine_metrics, key=lambda m: (m['module'], m['coroutine_name'])),
+            'target_metrics': target_metrics,
+            'elapsed': elapsed,
+        }
+
+    @require_login
+    async def prometheus(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Latency histograms and execution counts in the Prometheus text exposition format.
+        """
+        return self._get_prometheus_response()
+
+    async def prometheus_public(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Like `DashboardMetrics.prometheus`, but without login (for scraping by Prometheus).
+        """
+        return self._get_prometheus_response()
+
+    def _get_prometheus_response(self) -> web.Response:
+        """
+        Latency histograms and execution counts in the Prometheus text exposition format.
+        """
+        lines: list[str] = []
+
+        self._add_prometheus_metrics(
+            lines, 'aiodashboard_task', 'task executions',
+            [(coroutine_id, {}, histogram) for coroutine_id, histogram in TaskMetrics.get_histograms().items()]
+        )
+        self._add_prometheus_metrics(
+            lines, 'aiodashboard_target_task', 'task executions by target',
+            [
+                (coroutine_id, {'target': target}, histogram)
+                    for (coroutine_id, target), histogram in TaskMetrics.get_target_histograms().items()
+            ]
+        )
+
+        return web.Response(
+            body='\n'.join(lines + ['']).encode('utf-8'),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
+
+    def _add_prometheus_metrics(
+            self,
+            lines: list[str],
+            prefix: str,
+            description: str,
+            histograms: list[tuple[str, dict[str, str], LatencyHistogram]]
+        ) -> None:
+        """
+        Add a histogram of durations and a counter of outcomes for a set of series.
+        """
+        if not histograms: return
+
+        series = [
+            (self._get_prometheus_labels(coroutine_id, extra_labels), histogram)
+                for coroutine_id, extra_labels, histogram in histograms
+        ]
+
+        lines.append(f'# HELP {prefix}_duration_seconds Duration of {description}.')
+        lines.append(f'# TYPE {prefix}_duration_seconds histogram')
+        for labels, histogram in series:
+            for exponent in self.PROMETHEUS_EXPONENTS:
+                lines.append(f'{prefix}_duration_seconds_bucket{{{labels},le="{2. ** exponent:g}"}} {histogram.count_below(exponent)}')
+            lines.append(f'{prefix}_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_duration_seconds_sum{{{labels}}} {histogram.total!r}')
+            lines.append(f'{prefix}_duration_seconds_count{{{labels}}} {histogram.count}')
+
+        lines.append(f'# HELP {prefix}s_total Finished {description} by outcome.')
+        lines.append(f'# TYPE {prefix}s_total counter')
+        for labels, histogram in series:
+            lines.append(f'{prefix}s_total{{{labels},outcome="result"}} {histogram.n_results}')
+            lines.append(f'{prefix}s_total{{{labels},outcome="exception"}} {histogram.n_exceptions}')
+            lines.append(f'{prefix}s_total{{{labels},outcome="cancelled"}} {histogram.n_cancelled}')
+
+    @staticmethod
+    def _get_prometheus_labels(coroutine_id: str, extra_labels: dict[str, str]) -> str:
+        """
+        Labels of a series: coroutine (name and module) and extra labels (escaped).
+        """
+        def_info = CoroutineDef.get_coroutine_def_info(coroutine_id)
+        labels = {
+            'coroutine': def_info.func_name if def_info else coroutine_id,
+            'module': def_info.module if def_info else '',
+            **extra_labels,
+        }
+
+        def escape(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+    @staticmethod
+    def _get_metrics(
+            coroutine_id: str,
+            target: Optional[str],
+            histogram: LatencyHistogram,
+            elapsed: float
+        ) -> dict[str, Any]:
+        """
+        Metrics of a coroutine (and target) as shown on the metrics page (durations in milliseconds).
+        """
+        def_info = CoroutineDef.get_coroutine_def_info(coroutine_id)
+        count = histogram.count
+
+        return {
+            'coroutine_id': coroutine_id,
+            'coroutine_name': def_info.func_name if def_info else coroutine_id,
+            'module': def_info.module if def_info else '',
+            'target': target,
+            'count': count,
+            'throughput': count / elapsed,
+            'error_rate': histogram.n_exceptions / count if count else 0.,
+            'n_exceptions': histogram.n_exceptions,
+            'n_cancelled': histogram.n_cancelled,
+            'mean': histogram.mean * 1e3,
+            'p50': histogram.quantile(0.5) * 1e3,
+            'p90': histogram.quantile(0.9) * 1e3,
+            'p99': histogram.quantile(0.99) * 1e3,
+            'max': histogram.max * 1e3,
+        }
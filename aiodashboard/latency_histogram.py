@@ -0,0 +1,110 @@
+from math import frexp, ldexp
+from typing import Iterable
+
+from .task_outcome import TaskOutcome
+
+class LatencyHistogram:
+    """
+    Streaming histogram of task durations (in seconds), together with the number of executions per outcome.
+    Buckets are logarithmic (like HDR histograms): each power of two is split into `SUB_BUCKETS` buckets of
+    equal width, such that quantiles are reported with a relative error of at most 1 / `SUB_BUCKETS`.
+    Durations below 2^`MIN_EXPONENT` seconds (about 1 µs) are counted in the first bucket, durations
+    above 2^`MAX_EXPONENT` seconds (about 68 min) in an extra bucket without upper bound.
+    """
+
+    SUB_BUCKETS: int = 4
+    MIN_EXPONENT: int = -20
+    MAX_EXPONENT: int = 12
+    N_BUCKETS: int = (MAX_EXPONENT - MIN_EXPONENT + 1) * SUB_BUCKETS + 1
+
+    __slots__ = ('counts', 'n_results', 'n_exceptions', 'n_cancelled', 'total', 'max')
+
+    def __init__(self) -> None:
+        """
+        Contructor.
+        """
+        self.counts = [0] * LatencyHistogram.N_BUCKETS
+        self.n_results = 0
+        self.n_exceptions = 0
+        self.n_cancelled = 0
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, duration: float, outcome: str) -> None:
+        """
+        Add the duration of a task execution.
+        """
+        self.add_many([(duration, outcome)])
+
+    def add_many(self, samples: Iterable[tuple[float, str]]) -> None:
+        """
+        Add the durations of task executions (with outcomes).
+        """
+        counts = self.counts
+        min_exponent, sub_buckets, last = LatencyHistogram.MIN_EXPONENT, LatencyHistogram.SUB_BUCKETS, LatencyHistogram.N_BUCKETS - 1
+        n_results = n_exceptions = n_cancelled = 0
+        total, max_duration = self.total, self.max
+
+        for duration, outcome in samples:
+            # Duration = mantissa * 2^exponent, with 0.5 <= mantissa < 1.
+            mantissa, exponent = frexp(duration)
+            pos = (exponent - min_exponent) * sub_buckets + int((mantissa - 0.5) * 2 * sub_buckets)
+            if pos < 0 or duration <= 0.:
+                pos = 0
+            elif pos > last:
+                pos = last
+            counts[pos] += 1
+
+            if outcome == TaskOutcome.RESULT:
+                n_results += 1
+            elif outcome == TaskOutcome.EXCEPTION:
+                n_exceptions += 1
+            else:
+                n_cancelled += 1
+
+            total += duration
+            if duration > max_duration: max_duration = duration
+
+        self.n_results += n_results
+        self.n_exceptions += n_exceptions
+        self.n_cancelled += n_cancelled
+        self.total, self.max = total, max_duration
+
+    @property
+    def count(self) -> int:
+        return self.n_results + self.n_exceptions + self.n_cancelled
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile of the durations (upper bound of the bucket containing it).
+        """
+        n = sum(self.counts)
+        if not n: return 0.
+
+        rank = q * n
+        cumulative = 0
+        for pos, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count: return min(self.upper_bound(pos), self.max)
+        return self.max
+
+    def count_below(self, exponent: int) -> int:
+        """
+        Number of durations below 2^`exponent` seconds (as far as the buckets tell), for cumulative histograms.
+        """
+        end = (exponent - LatencyHistogram.MIN_EXPONENT + 1) * LatencyHistogram.SUB_BUCKETS
+        return sum(self.counts[:max(0, end)])
+
+    @staticmethod
+    def upper_bound(pos: int) -> float:
+        """
+        Upper bound of a bucket.
+        """
+        if pos == LatencyHistogram.N_BUCKETS - 1: return float('inf')
+
+        exponent, sub_bucket = divmod(pos, LatencyHistogram.SUB_BUCKETS)
+        return ldexp(0.5 + (sub_bucket + 1) / (2 * LatencyHistogram.SUB_BUCKETS), exponent + LatencyHistogram.MIN_EXPONENT)
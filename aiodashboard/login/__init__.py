@@ -1,5 +1,8 @@
 from .login_status import LoginStatus
 from .password_hash import PasswordHash
+from .login_rate_limit import LoginRateLimit
+from .login_pages import LoginPages
+from .session_storage import SessionStorage
 
 from .check_login import check_login
 from .require_login import require_login
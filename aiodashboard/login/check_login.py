@@ -21,8 +21,9 @@ async def check_login(
         # Retrieve login status.
         login_status = session.get('login_status', LoginStatus.LOGGED_OUT)
 
-        # Redirect to login page if not logged in.
+        # Redirect to login page if not logged in. JSON API endpoints just report the missing authorization.
         if login_status != LoginStatus.LOGGED_IN:
+            if getattr(handler, '__json_api__', False): raise web.HTTPUnauthorized()
             raise web.HTTPSeeOther(location='/login')
 
     return await handler(request)
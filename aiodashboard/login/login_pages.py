@@ -0,0 +1,103 @@
+import aiohttp.web as web
+import aiohttp_session
+import aiohttp_jinja2
+
+from .login_rate_limit import LoginRateLimit
+from .login_status import LoginStatus
+from .password_hash import PasswordHash
+
+from typing import Any
+
+class LoginPages:
+    """
+    Login and logout pages (base class of the dashboards).
+    Login attempts are limited per client IP address (at most `max_login_attempts` attempts
+    within `login_attempt_interval` seconds). Attempts exceeding the capacity for checking passwords
+    are rejected with status 503 (service unavailable).
+    """
+
+    def __init__(
+            self,
+            pwd_hash: bytes,
+            max_login_attempts: int = 5,
+            login_attempt_interval: float = 60.
+        ) -> None:
+        """
+        Contructor.
+        """
+        self._pwd_hash = PasswordHash(pwd_hash)
+        self._login_rate_limit = LoginRateLimit(max_login_attempts, login_attempt_interval)
+
+    @aiohttp_jinja2.template('login.html')
+    async def login(
+            self,
+            request: web.Request
+        ) -> dict[str, Any]:
+        """
+        Login page.
+        """
+        # Retrieve session.
+        session = await aiohttp_session.get_session(request)
+
+        # Get login status.
+        login_status = session.get('login_status', LoginStatus.LOGGED_OUT)
+
+        # Display login page.
+        if login_status == LoginStatus.FAILED:
+            return {'info': 'Login failed.'}
+        elif login_status == LoginStatus.THROTTLED:
+            return {'info': 'Too many login attempts, please try again later.'}
+        else:
+            return {}
+
+    async def login_apply(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Handle login attempts.
+        """
+        # Retrieve session.
+        session = await aiohttp_session.get_session(request)
+
+        # Limit login attempts per client, such that password checks cannot be flooded.
+        if not self._login_rate_limit.allow(request.remote or ''):
+            session['login_status'] = LoginStatus.THROTTLED
+            raise web.HTTPSeeOther(location='/login')
+
+        # Get entered password.
+        form = await request.post()
+        password = str(form['password'])
+
+        # Too many passwords are being checked (across all clients): do not queue up more checks.
+        if self._pwd_hash.is_busy():
+            raise web.HTTPServiceUnavailable(
+                text='Too many login attempts, please try again later.', headers={'Retry-After': '1'}
+            )
+
+        # Check entered password (in a thread pool, checking is expensive).
+        if await self._pwd_hash.check_async(password):
+            # Correct password: start a new session (with a new ID) and redirect to main content page.
+            session = await aiohttp_session.new_session(request)
+            session['login_status'] = LoginStatus.LOGGED_IN
+            raise web.HTTPSeeOther(location='/')
+        else:
+            # Incorrect password: redirect to login page.
+            session['login_status'] = LoginStatus.FAILED
+            raise web.HTTPSeeOther(location='/login')
+
+    async def logout(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Handle logout.
+        """
+        # Retrieve session.
+        session = await aiohttp_session.get_session(request)
+
+        # Reset login status.
+        session['login_status'] = LoginStatus.LOGGED_OUT
+
+        # Redirect to login page.
+        raise web.HTTPSeeOther(location="/login")
@@ -0,0 +1,35 @@
+import time
+from collections import OrderedDict, deque
+
+class LoginRateLimit:
+  """
+  Limit the number of login attempts per client (e.g., per IP address) within a sliding time window.
+  The number of tracked clients is limited, the least recently seen clients are forgotten first.
+  """
+
+  def __init__(self, max_attempts: int = 5, interval: float = 60., max_clients: int = 10000) -> None:
+      self.__max_attempts = max_attempts
+      self.__interval = interval
+      self.__max_clients = max_clients
+      self.__attempts: OrderedDict[str, deque[float]] = OrderedDict()
+
+  def allow(self, client: str) -> bool:
+      """
+      Check if a client is allowed another login attempt. Allowed attempts are counted.
+      """
+      now = time.monotonic()
+
+      attempts = self.__attempts.pop(client, None)
+      if attempts is None: attempts = deque()
+      self.__attempts[client] = attempts
+
+      # Forget attempts that are outside the time window.
+      while attempts and attempts[0] <= now - self.__interval: attempts.popleft()
+
+      # Forget least recently seen clients.
+      while len(self.__attempts) > self.__max_clients: self.__attempts.popitem(last=False)
+
+      if len(attempts) >= self.__max_attempts: return False
+
+      attempts.append(now)
+      return True
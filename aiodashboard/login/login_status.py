@@ -7,3 +7,4 @@ class LoginStatus(IntEnum):
     LOGGED_OUT = 0
     LOGGED_IN = 1
     FAILED = 2
+    THROTTLED = 3
@@ -1,12 +1,21 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
 class PasswordHash:
   """
   Store password hash (generated with bcrypt) and check against entered password. 
+  Checking a password is expensive (by design). Use `check_async` for running the check in a
+  bounded thread pool instead of blocking the event loop. At most `max_pending` checks are queued
+  or running at a time, further checks are rejected (see `is_busy`).
   """
 
-  def __init__(self, password_hash: bytes) -> None:
+  def __init__(self, password_hash: bytes, max_workers: int = 2, max_pending: int = 8) -> None:
       self.__pwd_hash = password_hash
+      self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='aiodashboard-bcrypt')
+      self.__max_pending = max_pending
+      self.__pending = 0
 
   def check(self, password: str) -> bool:
       """
@@ -14,3 +23,22 @@ class PasswordHash:
       """
       pwd_bytes = password.encode('utf-8')
       return bcrypt.checkpw(pwd_bytes, self.__pwd_hash)
+
+  def is_busy(self) -> bool:
+      """
+      Check whether the maximum number of pending checks has been reached.
+      """
+      return self.__pending >= self.__max_pending
+
+  async def check_async(self, password: str) -> bool:
+      """
+      Check entered password against stored password hash in the thread pool.
+      Raise a `RuntimeError` if too many checks are pending.
+      """
+      if self.is_busy(): raise RuntimeError('Too many pending password checks')
+
+      self.__pending += 1
+      try:
+          return await asyncio.get_running_loop().run_in_executor(self.__executor, self.check, password)
+      finally:
+          self.__pending -= 1
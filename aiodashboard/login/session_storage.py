@@ -0,0 +1,177 @@
+import asyncio
+import secrets
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from aiohttp_session import AbstractStorage, Session, SessionData
+
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+class SessionStorage(AbstractStorage):
+    """
+    Server-side session storage (see `aiohttp_session`): the session cookie only carries an opaque, random
+    session ID, while the session data stay on the server. Unlike encrypted cookies, reading a session
+    is a lookup (no decryption and verification per request).
+    Sessions expire `ttl` seconds after they have been created (logging in starts a new session). At most
+    `max_sessions` sessions are kept in memory, the least recently used ones are evicted first.
+    Optionally, sessions are backed by an SQLite database (`path`), such that they survive restarts and
+    can be shared by the processes on a host. Sessions read from the database are trusted for `sync_interval`
+    seconds before they are read again (i.e., logging out in another process takes effect within this time).
+    The database is accessed from a dedicated thread.
+    """
+
+    def __init__(
+            self,
+            ttl: float = 86400.,
+            max_sessions: int = 10000,
+            path: Optional[str] = None,
+            sync_interval: float = 1.,
+            cookie_name: str = 'AIOHTTP_SESSION',
+            secure: Optional[bool] = None
+        ) -> None:
+        """
+        Contructor.
+        """
+        super().__init__(cookie_name=cookie_name, max_age=int(ttl), secure=secure)
+        self._ttl = ttl
+        self._max_sessions = max_sessions
+        self._path = path
+        self._sync_interval = sync_interval
+
+        # Expiry (time since the epoch), time of retrieval (monotonic) and data by session ID.
+        self._sessions: OrderedDict[str, tuple[float, float, SessionData]] = OrderedDict()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aiodashboard-sessions') if path else None
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def get_size(self) -> int:
+        """
+        Retrieve the number of sessions kept in memory.
+        """
+        return len(self._sessions)
+
+    async def load_session(self, request: web.Request) -> Session:
+        """
+        Retrieve the session of a request. Unknown and expired session IDs get a new session (with a new ID).
+        """
+        session_id = self.load_cookie(request)
+        data = await self._get(session_id) if session_id else None
+        if data is None: return Session(None, data=None, new=True, max_age=self.max_age)
+        return Session(session_id, data=data, new=False, max_age=self.max_age)
+
+    async def save_session(self, request: web.Request, response: web.StreamResponse, session: Session) -> None:
+        """
+        Store a (changed) session. Empty sessions are deleted.
+        """
+        if session.empty:
+            if session.identity: await self._delete(str(session.identity))
+            self.save_cookie(response, '', max_age=session.max_age)
+            return
+
+        session_id = str(session.identity) if session.identity else secrets.token_urlsafe(32)
+        data = self._get_session_data(session)
+        expires = session.created + self._ttl
+
+        self._put(session_id, expires, data)
+        if self._path: await self._run(self._db_put, session_id, expires, self._encoder(data))
+
+        self.save_cookie(response, session_id, max_age=session.max_age)
+
+    async def close(self) -> None:
+        """
+        Close the database (if any).
+        """
+        if not self._executor: return
+        await self._run(self._db_close)
+        self._executor.shutdown()
+
+    async def _get(self, session_id: str) -> Optional[SessionData]:
+        """
+        Retrieve the data of a session (from memory or from the database). Return `None` if there is no such session.
+        """
+        now = time.time()
+
+        entry = self._sessions.get(session_id)
+        if entry and entry[0] > now and (not self._path or time.monotonic() - entry[1] < self._sync_interval):
+            self._sessions.move_to_end(session_id)
+            return entry[2]
+
+        self._sessions.pop(session_id, None)
+        if not self._path: return None
+
+        row = await self._run(self._db_get, session_id)
+        if row is None or row[0] <= now: return None
+
+        data = self._decoder(row[1])
+        self._put(session_id, row[0], data)
+        return data
+
+    def _put(self, session_id: str, expires: float, data: SessionData) -> None:
+        """
+        Keep a session in memory, evict the least recently used sessions.
+        """
+        self._sessions.pop(session_id, None)
+        self._sessions[session_id] = (expires, time.monotonic(), data)
+        while len(self._sessions) > self._max_sessions: self._sessions.popitem(last=False)
+
+    async def _delete(self, session_id: str) -> None:
+        """
+        Delete a session.
+        """
+        self._sessions.pop(session_id, None)
+        if self._path: await self._run(self._db_delete, session_id)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a database access in the dedicated thread.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _db(self) -> sqlite3.Connection:
+        """
+        Connect to the database (in the dedicated thread), create the table of sessions if necessary.
+        """
+        if self._connection is None:
+            assert self._path
+            connection = sqlite3.connect(self._path, timeout=10.)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, expires REAL NOT NULL, data TEXT NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _db_get(self, session_id: str) -> Optional[tuple[float, str]]:
+        """
+        Read a session (expiry and encoded data) from the database.
+        """
+        return self._db().execute('SELECT expires, data FROM sessions WHERE id = ?', (session_id,)).fetchone()
+
+    def _db_put(self, session_id: str, expires: float, data: str) -> None:
+        """
+        Write a session to the database, delete expired sessions.
+        """
+        with self._db() as connection:
+            connection.execute('REPLACE INTO sessions (id, expires, data) VALUES (?, ?, ?)', (session_id, expires, data))
+            connection.execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),))
+
+    def _db_delete(self, session_id: str) -> None:
+        """
+        Delete a session from the database.
+        """
+        with self._db() as connection:
+            connection.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def _db_close(self) -> None:
+        """
+        Close the connection to the database.
+        """
+        if self._connection: self._connection.close()
+        self._connection = None
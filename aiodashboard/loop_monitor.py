@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+from .util import *
+
+from .loop_slow_callback import LoopSlowCallback
+from .task_exec import TaskExec
+from .task_history import TaskHistory
+
+from typing import Any, Callable, Optional
+
+class LoopMonitor:
+    """
+    Monitor the health of the event loop executing the monitored tasks.
+    A probe task sleeps for `interval` seconds over and over again. The time it oversleeps (lag) tells how long
+    ready callbacks had to wait for being run. The lags are kept as a time series of fixed size (`series_size`),
+    percentiles are computed over sliding windows (in seconds, at most as long as the series).
+    Optionally, callbacks (including task steps) running longer than `slow_callback_threshold` seconds are
+    captured, together with the decorated coroutine the task was executing (if any). For this, running callbacks
+    is timed for all event loops of the process (`asyncio.Handle._run` is wrapped while the monitor is running).
+    The monitor may be read from another thread (see `start_dashboard`), access to the series is locked.
+    """
+
+    def __init__(
+            self,
+            interval: float = 0.1,
+            windows: tuple[float, ...] = (10., 60., 300.),
+            series_size: int = 3000,
+            slow_callback_threshold: Optional[float] = 0.1,
+            max_slow_callbacks: int = 100
+        ) -> None:
+        """
+        Contructor.
+        """
+        self._interval = interval
+        self._windows = windows
+        self._slow_callback_threshold = slow_callback_threshold
+
+        self._lock = threading.Lock()
+        self._series: deque[tuple[float, float]] = deque(maxlen=series_size)
+        self._slow_callbacks: deque[LoopSlowCallback] = deque(maxlen=max_slow_callbacks)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._handle_run: Optional[Callable[[asyncio.Handle], None]] = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def slow_callback_threshold(self) -> Optional[float]:
+        return self._slow_callback_threshold
+
+    def start(self) -> None:
+        """
+        Start monitoring the running event loop.
+        """
+        if self._loop: raise RuntimeError('Event loop monitor has already been started')
+
+        self._loop = asyncio.get_running_loop()
+        self._probe_task = self._loop.create_task(self._probe())
+        if self._slow_callback_threshold is not None: self._wrap_handle_run()
+
+    async def close(self) -> None:
+        """
+        Stop monitoring (may be called from another event loop).
+        """
+        if self._handle_run and getattr(asyncio.Handle._run, '__loop_monitor__', None) is self:
+            asyncio.Handle._run = self._handle_run # type: ignore[method-assign, assignment]
+        self._handle_run = None
+
+        if self._loop and self._probe_task and not self._loop.is_closed():
+            call_in_loop(self._loop, self._probe_task.cancel)
+        self._probe_task = None
+
+    def get_series(self, since: Optional[float] = None) -> list[tuple[float, float]]:
+        """
+        Retrieve the lags (time in seconds since the epoch, lag in seconds), optionally only since a point in time.
+        """
+        with self._lock: series = list(self._series)
+        return series if since is None else [sample for sample in series if sample[0] > since]
+
+    def get_windows(self) -> list[dict[str, float]]:
+        """
+        Retrieve lag percentiles (and maximum) over each of the sliding windows.
+        """
+        now = time.time()
+        series = self.get_series()
+
+        windows = []
+        for window in self._windows:
+            lags = sorted(lag for t, lag in series if t >= now - window)
+            windows.append({
+                'window': window,
+                'n': len(lags),
+                'p50': self._percentile(lags, 0.5),
+                'p90': self._percentile(lags, 0.9),
+                'p99': self._percentile(lags, 0.99),
+                'max': lags[-1] if lags else 0.,
+            })
+        return windows
+
+    def get_slow_callbacks(self, limit: Optional[int] = None) -> list[LoopSlowCallback]:
+        """
+        Retrieve the captured slow callbacks, most recent first.
+        """
+        with self._lock: slow_callbacks = list(reversed(self._slow_callbacks))
+        return slow_callbacks[:limit]
+
+    async def _probe(self) -> None:
+        """
+        Measure by how much the event loop oversleeps.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            lag = max(0., loop.time() - start - self._interval)
+            with self._lock: self._series.append((time.time(), lag))
+
+    def _wrap_handle_run(self) -> None:
+        """
+        Time all callbacks run by event loops, capture the slow ones of the monitored loop.
+        """
+        if getattr(asyncio.Handle._run, '__loop_monitor__', None):
+            raise RuntimeError('Slow callbacks are already captured by another event loop monitor')
+
+        handle_run = self._handle_run = asyncio.Handle._run
+        threshold, loop, timer = self._slow_callback_threshold or 0., self._loop, time.perf_counter
+
+        def run(handle: asyncio.Handle) -> None:
+            start = timer()
+            handle_run(handle)
+            duration = timer() - start
+            if duration > threshold and getattr(handle, '_loop', None) is loop: self._capture(handle, duration)
+
+        run.__loop_monitor__ = self # type: ignore[attr-defined]
+        asyncio.Handle._run = run # type: ignore[method-assign, assignment]
+
+    def _capture(self, handle: asyncio.Handle, duration: float) -> None:
+        """
+        Capture a slow callback. For task steps, identify the task and its decorated coroutine.
+        """
+        callback: Any = getattr(handle, '_callback', None)
+        task = getattr(callback, '__self__', None)
+
+        if isinstance(task, asyncio.Task):
+            slow_callback = self._describe_task(task, duration)
+        else:
+            description = getattr(callback, '__qualname__', None) or repr(callback)
+            slow_callback = LoopSlowCallback(time=time.time(), duration=duration, callback=description)
+
+        with self._lock: self._slow_callbacks.append(slow_callback)
+
+    @staticmethod
+    def _describe_task(task: asyncio.Task, duration: float) -> LoopSlowCallback:
+        """
+        Describe a slow step of a task. In case the decorated coroutine has finished during the step,
+        it is identified via the task history.
+        """
+        now = time.time()
+        coro = task.get_coro()
+        description = f'{task.get_name()} ({getattr(coro, "__qualname__", repr(coro))})'
+        str_task_id = task_id(task)
+
+        identity: tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+        exec_info = TaskExec.get(task)
+        if exec_info:
+            try:
+                target: Optional[str] = str(exec_info.target)
+            except RuntimeError:
+                target = None # Coroutine definition not available (anymore).
+            identity = (exec_info.coroutine_id, exec_info.coroutine_name, exec_info.module, target)
+        elif (record := TaskHistory.get_latest(str_task_id)) and record.finished >= now - duration:
+            identity = (record.coroutine_id, record.coroutine_name, record.module, record.target)
+        else:
+            identity = (None, None, None, None)
+
+        coroutine_id, coroutine_name, module, target = identity
+        return LoopSlowCallback(
+            time=now,
+            duration=duration,
+            callback=description,
+            task_id=str_task_id,
+            coroutine_id=coroutine_id,
+            coroutine_name=coroutine_name,
+            module=module,
+            target=target,
+        )
+
+    @staticmethod
+    def _percentile(values: list[float], q: float) -> float:
+        """
+        Percentile of sorted values (nearest rank).
+        """
+        if not values: return 0.
+        return values[min(len(values) - 1, max(0, int(q * len(values) + 0.5) - 1))]
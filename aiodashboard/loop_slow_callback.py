@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True, slots=True)
+class LoopSlowCallback:
+    """
+    Provide information about a callback that blocked the event loop for too long (see `LoopMonitor`).
+    For steps of tasks executing a decorated coroutine, the coroutine and the target are included.
+    """
+    time: float
+    duration: float
+    callback: str
+    task_id: Optional[str] = None
+    coroutine_id: Optional[str] = None
+    coroutine_name: Optional[str] = None
+    module: Optional[str] = None
+    target: Optional[str] = None
@@ -1,32 +1,55 @@
 from aiohttp.web import Application
 from aiohttp_jinja2 import setup, get_env
-from jinja2 import FileSystemLoader
+from jinja2 import FileSystemBytecodeCache, FileSystemLoader
 
 from pathlib import Path
 from datetime import datetime
 from dataclasses import asdict
+from typing import Optional
 import socket
 import inspect
+from warnings import warn
 
 from .dashboard_style import DashboardStyle
+from .static_assets import StaticAssets
+
+# Files of Bootstrap served as static assets (see `setup_jinja2`).
+BOOTSTRAP_FILES = ('bootstrap.min.css', 'bootstrap.bundle.min.js')
 
 def setup_jinja2(
         app: Application,
         dashboard_name: str,
         style: DashboardStyle,
         use_plain_html: bool = False,
+        precompile: bool = True,
+        auto_reload: bool = False,
+        bytecode_cache_path: Optional[str] = None,
+        static_path: Optional[str] = None,
+        bootstrap_cdn: bool = False,
     ) -> None:
     """
     Setup for jinja2 template renderer.
+    By default, all templates are compiled at startup (`precompile`) and are not checked for changes
+    afterwards (`auto_reload`), such that requests never parse templates or check template files.
+    Optionally, compiled templates are cached in a directory (`bytecode_cache_path`), such that they
+    are not parsed again when the dashboard is restarted (templates that have changed are compiled again).
+    Static assets are served by the dashboard (see `StaticAssets`): the files bundled with the package
+    (directory 'static'), the files of an additional directory (`static_path`) and the stylesheet of the
+    color theme, which is rendered once here. Bootstrap 5.3.3 ('bootstrap.min.css', 'bootstrap.bundle.min.js')
+    is served as an asset as well, such that pages do not depend on external servers. Loading it from its CDN
+    instead has to be requested explicitly (`bootstrap_cdn`), it is only a fallback if its files are missing.
     """
-    # Select path for rendering templates.
+    # Select path for rendering templates and for static assets.
     templates_path = str(Path(__file__).parent / 'templates' / 'plain') \
         if use_plain_html else str(Path(__file__).parent / 'templates' / 'bootstrap')
+    bundled_static_path = Path(__file__).parent / 'static'
 
     # Basic setup for jinja2 templating engine.
     setup(
         app,
-        loader = FileSystemLoader(templates_path)
+        loader = FileSystemLoader(templates_path),
+        auto_reload = auto_reload,
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_path) if bytecode_cache_path else None
         )
 
     env = get_env(app)
@@ -37,6 +60,9 @@ def setup_jinja2(
     # Add function 'datetime.now' from Python package 'datetime' to jinja2 environment.
     env.globals.update(datetime_now=datetime.now)
 
+    # Add function 'datetime.fromtimestamp' from Python package 'datetime' to jinja2 environment.
+    env.globals.update(datetime_fromtimestamp=datetime.fromtimestamp)
+
     # Add dashboard name to jinja2 environment.
     env.globals.update(dashboard_name=dashboard_name)
 
@@ -50,3 +76,24 @@ def setup_jinja2(
     env.globals.update(
         {k: f'#{v.to_hex().value}' for (k, v) in asdict(style).items()}
         )
+
+    # Serve bundled assets and the stylesheet of the color theme (not for plain HTML).
+    static_assets = StaticAssets()
+    static_assets.add_dir(bundled_static_path)
+    if static_path: static_assets.add_dir(Path(static_path))
+    if not use_plain_html: static_assets.add('theme.css', env.get_template('theme.css').render().encode())
+    static_assets.setup(app)
+    env.globals.update(static_url=static_assets.url)
+
+    # Serve Bootstrap as asset, unless loading it from its CDN is requested.
+    if not use_plain_html and not bootstrap_cdn and not all(static_assets.url(name) for name in BOOTSTRAP_FILES):
+        warn(
+            f'Bootstrap files ({", ".join(BOOTSTRAP_FILES)}) are missing in "{bundled_static_path}", ' +
+                'loading Bootstrap from its CDN'
+        )
+        bootstrap_cdn = True
+    env.globals.update(bootstrap_cdn=bootstrap_cdn)
+
+    # Compile all templates now (kept in the environment's cache), instead of on their first use.
+    if precompile:
+        for name in env.list_templates(): env.get_template(name)
@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+
+from aiohttp import web
+
+from ..util import get_accepted_encodings
+
+try:
+    import brotli # type: ignore[import-not-found]
+except ImportError:
+    brotli = None
+
+from typing import Optional
+
+class StaticAssets:
+    """
+    Static assets (stylesheets, scripts, ...) served by the dashboard itself, such that pages do not depend
+    on external servers. Assets are kept in memory and served under content-hashed names: their URLs change
+    whenever their content does, such that clients may cache them forever ('Cache-Control: immutable').
+    Compressed variants (gzip and, if the 'brotli' package is available, brotli) are prepared once when
+    an asset is added and are served to clients accepting them.
+    """
+
+    # Path of the route serving the assets.
+    ROUTE = '/static'
+
+    CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+    def __init__(self) -> None:
+        """
+        Contructor.
+        """
+        self._urls: dict[str, str] = dict()
+        # Content type, entity tag and bodies by content coding ('identity', 'br', 'gzip') by hashed name.
+        self._assets: dict[str, tuple[str, str, dict[str, bytes]]] = dict()
+
+    def add(self, name: str, body: bytes, content_type: Optional[str] = None) -> str:
+        """
+        Add an asset and return its URL. The content type is guessed from the name, unless given.
+        """
+        content_type = content_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        stem, dot, suffix = name.rpartition('.')
+        hashed_name = f'{stem}.{digest}.{suffix}' if dot else f'{name}.{digest}'
+
+        # Compressed variants are only kept if they are smaller.
+        bodies = {'identity': body}
+        if brotli: bodies['br'] = brotli.compress(body, quality=11)
+        bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        bodies = {coding: b for coding, b in bodies.items() if coding == 'identity' or len(b) < len(body)}
+
+        self._assets[hashed_name] = (content_type, f'"{digest}"', bodies)
+        url = self._urls[name] = f'{StaticAssets.ROUTE}/{hashed_name}'
+        return url
+
+    def add_dir(self, path: Path) -> None:
+        """
+        Add all files of a directory as assets (except hidden files), if it exists.
+        """
+        if not path.is_dir(): return
+        for file in sorted(path.iterdir()):
+            if file.is_file() and not file.name.startswith('.'): self.add(file.name, file.read_bytes())
+
+    def url(self, name: str) -> Optional[str]:
+        """
+        Retrieve the URL of an asset. Return `None` if there is no such asset.
+        """
+        return self._urls.get(name)
+
+    def setup(self, app: web.Application) -> None:
+        """
+        Add the route serving the assets to a web application.
+        """
+        app.router.add_get(f'{StaticAssets.ROUTE}/{{name}}', self.get)
+
+    async def get(self, request: web.Request) -> web.Response:
+        """
+        Serve an asset, compressed if the client accepts it.
+        """
+        asset = self._assets.get(request.match_info['name'])
+        if not asset: raise web.HTTPNotFound()
+        content_type, etag, bodies = asset
+
+        headers = {'Cache-Control': StaticAssets.CACHE_CONTROL, 'ETag': etag, 'Vary': 'Accept-Encoding'}
+        if request.if_none_match and any(f'"{e.value}"' == etag for e in request.if_none_match):
+            return web.Response(status=304, headers=headers)
+
+        codings = get_accepted_encodings(request, tuple(c for c in ('br', 'gzip') if c in bodies))
+        if codings: headers['Content-Encoding'] = codings[0]
+
+        return web.Response(body=bodies[codings[0] if codings else 'identity'], content_type=content_type, headers=headers)
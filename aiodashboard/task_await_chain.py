@@ -0,0 +1,111 @@
+import asyncio
+
+from .util import *
+
+from .task_await_node import TaskAwaitNode
+
+from typing import Any
+
+# Await chain: nodes from the task's outermost coroutine to the awaited task or future.
+AwaitChain = tuple[TaskAwaitNode, ...]
+
+class TaskAwaitChain:
+    """
+    Retrieve where a task is suspended: the chain of coroutines it awaits, from its outermost coroutine to
+    the innermost one (with file and line numbers), followed by the task or future the innermost coroutine
+    is waiting for (`Task._fut_waiter`). Awaited tasks and the awaitables gathered by `asyncio.gather` are
+    followed, such that the result is a tree.
+    The chain is only retrieved on demand. The number of nodes along each path (`max_depth`) and the number
+    of gathered awaitables followed (`max_children`) are limited, the remainder is marked as truncated.
+    Like for `TaskExec`, a task's coroutines must only be inspected from its own event loop (see `get_async`).
+    """
+
+    # Default and maximum number of nodes along each path.
+    DEFAULT_DEPTH: int = 32
+    MAX_DEPTH: int = 256
+
+    # Maximum number of gathered awaitables followed.
+    MAX_CHILDREN: int = 20
+
+    @staticmethod
+    def get(task: asyncio.Task, max_depth: int = DEFAULT_DEPTH) -> AwaitChain:
+        """
+        Retrieve the await chain of a task (from the task's event loop). For a done task, the chain is empty.
+        """
+        return TaskAwaitChain.__get_chain(task, min(max(1, max_depth), TaskAwaitChain.MAX_DEPTH), {task})
+
+    @staticmethod
+    async def get_async(task: asyncio.Task, max_depth: int = DEFAULT_DEPTH) -> AwaitChain:
+        """
+        Retrieve the await chain of a task thread-safely (on the task's event loop).
+        """
+        chain: AwaitChain = await run_in_loop(task.get_loop(), TaskAwaitChain.get, task, max_depth)
+        return chain
+
+    @staticmethod
+    def __get_chain(task: asyncio.Task, depth: int, path: set[asyncio.Task]) -> AwaitChain:
+        """
+        Retrieve the await chain of a task with at most `depth` nodes along each path.
+        Tasks on the path are not followed again (tasks awaiting each other).
+        """
+        if task.done(): return ()
+
+        chain: list[TaskAwaitNode] = []
+
+        # Follow the coroutines (and generator-based coroutines) awaiting each other.
+        awaited: Any = task.get_coro()
+        while awaited is not None:
+            frame = getattr(awaited, 'cr_frame', None) or getattr(awaited, 'gi_frame', None)
+            if frame is None: break
+            if len(chain) == depth: return (*chain, TaskAwaitChain.__truncated())
+
+            code = frame.f_code
+            chain.append(TaskAwaitNode(
+                TaskAwaitNode.COROUTINE, getattr(code, 'co_qualname', code.co_name), code.co_filename, frame.f_lineno
+            ))
+            awaited = getattr(awaited, 'cr_await', None) or getattr(awaited, 'gi_yieldfrom', None)
+
+        # The future the task is waiting for (not available for tasks that are scheduled to run).
+        waiter = getattr(task, '_fut_waiter', None)
+        if waiter is not None:
+            if len(chain) == depth: return (*chain, TaskAwaitChain.__truncated())
+            chain.append(TaskAwaitChain.__get_future_node(waiter, depth - len(chain), path))
+
+        return tuple(chain)
+
+    @staticmethod
+    def __get_future_node(future: asyncio.Future, depth: int, path: set[asyncio.Task]) -> TaskAwaitNode:
+        """
+        Describe an awaited future. Awaited tasks are followed with their own await chain (of at most
+        `depth - 1` nodes), gathered awaitables with one chain each.
+        """
+        if isinstance(future, asyncio.Task):
+            if future in path: return TaskAwaitNode(TaskAwaitNode.CYCLE, future.get_name(), task_id=task_id(future))
+
+            chain = TaskAwaitChain.__get_chain(future, depth - 1, path | {future}) if depth > 1 else None
+            return TaskAwaitNode(
+                TaskAwaitNode.TASK, future.get_name(), task_id=task_id(future),
+                children=(chain if chain is not None else (TaskAwaitChain.__truncated(),),)
+            )
+
+        # Futures returned by `asyncio.gather` keep the gathered awaitables (wrapped into tasks or futures).
+        gathered = getattr(future, '_children', None)
+        if isinstance(gathered, list):
+            children: tuple[AwaitChain, ...] = ((TaskAwaitChain.__truncated(),),) if gathered else ()
+            if depth > 1:
+                max_children = TaskAwaitChain.MAX_CHILDREN
+                children = tuple(
+                    (TaskAwaitChain.__get_future_node(child, depth - 1, path),) for child in gathered[:max_children]
+                )
+                if len(gathered) > max_children:
+                    children += ((TaskAwaitNode(TaskAwaitNode.TRUNCATED, f'{len(gathered) - max_children} more'),),)
+            return TaskAwaitNode(TaskAwaitNode.GATHER, f'gather ({len(gathered)})', children=children)
+
+        return TaskAwaitNode(TaskAwaitNode.FUTURE, type(future).__name__)
+
+    @staticmethod
+    def __truncated() -> TaskAwaitNode:
+        """
+        Marker for the remainder of a chain that is not retrieved.
+        """
+        return TaskAwaitNode(TaskAwaitNode.TRUNCATED, '...')
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True, slots=True)
+class TaskAwaitNode:
+    """
+    Provide a node of the await chain of a task (see `TaskAwaitChain`): a suspended coroutine (with file and
+    line number), or the task or future awaited by the innermost coroutine. Awaited tasks have their own
+    await chain as child, futures gathering awaitables (`asyncio.gather`) have one child chain per awaitable.
+    """
+    kind: str
+    name: str
+    file: Optional[str] = None
+    line: Optional[int] = None
+    task_id: Optional[str] = None
+    children: tuple[tuple[TaskAwaitNode, ...], ...] = ()
+
+    # Kinds of nodes.
+    COROUTINE = 'coroutine'
+    TASK = 'task'
+    GATHER = 'gather'
+    FUTURE = 'future'
+    CYCLE = 'cycle'
+    TRUNCATED = 'truncated'
@@ -0,0 +1,188 @@
+import asyncio
+
+import aiohttp.web as web
+import aiohttp_jinja2
+from jinja2 import Environment
+
+from .login import *
+from .util import *
+
+from .dashboard import Dashboard
+from .task_exec import TaskExec
+from .task_registry import TaskRegistry
+
+from typing import Any, Optional
+
+TaskEventBatch = list[dict[str, Any]]
+
+class TaskEventStream:
+    """
+    Push updates about started and finished tasks to the clients via server-sent events (SSE).
+    Updates are driven by the task registry (no polling). Events are coalesced and sent in batches,
+    i.e., a task that is started and finished in between two batches does not show up at all.
+    Each event about a started task carries the rendered HTML of its entry in the list of running tasks.
+    The number of batches buffered per client is limited. If a client does not keep up, its buffer is
+    dropped and it is told to reload the page instead.
+    Clients may pass the registry generation their page was rendered with (query parameter 'since').
+    If the registry has changed since, the stream starts with a snapshot of the IDs of all running
+    tasks, such that the client can catch up on changes that happened before it connected.
+    """
+
+    def __init__(
+            self,
+            dashboard: Dashboard,
+            batch_interval: float = 0.1,
+            max_buffer: int = 100,
+            keep_alive: float = 15.
+        ) -> None:
+        """
+        Contructor.
+        """
+        self._dashboard = dashboard
+        self._batch_interval = batch_interval
+        self._max_buffer = max_buffer
+        self._keep_alive = keep_alive
+
+        self._clients: set[asyncio.Queue[TaskEventBatch]] = set()
+        self._pending: dict[asyncio.Task, bool] = dict()
+        self._flush_scheduled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._env: Optional[Environment] = None
+
+    @require_login
+    async def events(
+            self,
+            request: web.Request
+        ) -> web.StreamResponse:
+        """
+        Stream of server-sent events about started and finished tasks.
+        """
+        # Make sure the list of targets is available, it is kept up to date without waiting afterwards.
+        await self._dashboard._update_target_list()
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+
+        queue = self._subscribe(aiohttp_jinja2.get_env(request.app))
+        try:
+            # Note: The generation is checked after subscribing, such that no change can be missed.
+            since = request.query.get('since')
+            if since is not None and int(since) != TaskRegistry.get_generation():
+                snapshot = {'type': 'snapshot', 'task_ids': [task_id(task) for task in TaskRegistry.get_tasks()]}
+                await response.write(b'data: ' + json_dumps([snapshot]) + b'\n\n')
+
+            while True:
+                try:
+                    batch = await asyncio.wait_for(queue.get(), timeout=self._keep_alive)
+                except asyncio.TimeoutError:
+                    # Send a comment, which keeps the connection alive.
+                    await response.write(b': keep-alive\n\n')
+                    continue
+
+                await response.write(b'data: ' + json_dumps(batch) + b'\n\n')
+        except ConnectionResetError:
+            pass
+        finally:
+            self._unsubscribe(queue)
+
+        return response
+
+    def _subscribe(self, env: Environment) -> asyncio.Queue[TaskEventBatch]:
+        """
+        Add a client. Start listening to the task registry when the first client is added.
+        """
+        if not self._clients:
+            self._loop = asyncio.get_running_loop()
+            self._env = env
+            TaskRegistry.add_listener(self._on_registry_event)
+
+        queue: asyncio.Queue[TaskEventBatch] = asyncio.Queue(maxsize=self._max_buffer)
+        self._clients.add(queue)
+        return queue
+
+    def _unsubscribe(self, queue: asyncio.Queue[TaskEventBatch]) -> None:
+        """
+        Remove a client. Stop listening to the task registry when the last client is removed.
+        """
+        self._clients.discard(queue)
+
+        if not self._clients:
+            TaskRegistry.remove_listener(self._on_registry_event)
+            self._pending.clear()
+
+    def _on_registry_event(self, task: asyncio.Task, started: bool) -> None:
+        """
+        Hand over events from the task registry to the event loop of the clients,
+        which is not the tasks' event loop in case the dashboard runs in a separate thread.
+        """
+        if self._loop: call_in_loop(self._loop, self._collect, task, started)
+
+    def _collect(self, task: asyncio.Task, started: bool) -> None:
+        """
+        Collect events from the task registry until the next batch is sent.
+        """
+        if not self._clients: return
+
+        if not started and self._pending.get(task):
+            # The task has been started and finished since the last batch, it is not reported at all.
+            del self._pending[task]
+        else:
+            self._pending[task] = started
+
+        if not self._flush_scheduled and self._loop:
+            self._flush_scheduled = True
+            self._loop.call_later(self._batch_interval, self._flush)
+
+    def _flush(self) -> None:
+        """
+        Send a batch of events to all clients.
+        """
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, dict()
+
+        if any(pending.values()): self._dashboard._update_target_list_nowait()
+
+        batch: TaskEventBatch = []
+
+        for task, started in pending.items():
+            if not started:
+                batch.append({'type': 'finished', 'task_id': task_id(task)})
+                continue
+
+            exec_info = TaskExec.get(task)
+            if not exec_info: continue
+
+            try:
+                target_pos = self._dashboard._get_target_pos(exec_info.target)
+            except ValueError:
+                continue # The task's target is not listed (anymore).
+
+            display_info = self._dashboard._get_display_info(exec_info, target_pos)
+            batch.append({
+                'type': 'started',
+                'task_id': exec_info.task_id,
+                'target_pos': target_pos,
+                'target_version': self._dashboard._target_index.version,
+                'html': self._render(display_info),
+            })
+
+        if batch: self._publish(batch)
+
+    def _render(self, display_info: tuple) -> str:
+        """
+        Render the entry of a task in the list of running tasks (cached for rendering the index page).
+        """
+        target_version = self._dashboard._target_index.version
+        return str(self._dashboard._task_fragments.render(self._env, display_info, target_version)) # type: ignore[arg-type]
+
+    def _publish(self, batch: TaskEventBatch) -> None:
+        """
+        Add a batch of events to the buffers of all clients.
+        """
+        for queue in self._clients:
+            try:
+                queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                # The client does not keep up. Drop its buffer and tell it to reload the page.
+                while not queue.empty(): queue.get_nowait()
+                queue.put_nowait([{'type': 'reset'}])
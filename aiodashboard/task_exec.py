@@ -1,32 +1,75 @@
 from __future__ import annotations
 
-from asyncio import Task
+from asyncio import Task, get_event_loop
 
-from typing import Any, Optional
-from inspect import getcallargs
-from collections import OrderedDict
+import threading
+import weakref
+from bisect import bisect_left, insort
+from typing import Any, Callable, Iterable, Optional
 
 from .coroutine_def import CoroutineDef
+from .coroutine_def_info import CoroutineDefInfo
 from .task_exec_info import TaskExecInfo
-from .util import all_tasks, task_id as str_task_id, get_package_name
+from .task_registry import TaskRegistry
+from .util import Loop, all_tasks, call_in_loop, get_call_params, in_loop_thread, target_key, task_id as str_task_id, get_package_name
 
 class TaskExec:
     """
     Collect and provide info for all running tasks.
+    The info may be retrieved from a thread other than the one running the tasks' event loop
+    (see `start_dashboard`). Access to the cache is therefore serialized with a lock, and tasks
+    are only ever modified (cancelled, callbacks added) from their own event loop.
     """
 
-    __cache: dict[Task, Optional[TaskExecInfo]] = dict()
+    # Lock protecting the cache and the indexes. Reentrant, since public methods call each other.
+    __lock = threading.RLock()
+
+    # Event loop executing the monitored tasks (if `None`, the currently running loop is assumed).
+    __loop: Optional[Loop] = None
+
+    # Cached task execution infos. Tasks that have been inspected but do not execute a decorated
+    # coroutine are cached with `None` as info (negative cache), such that they are inspected only once.
+    # Entries are evicted when a task is done (done-callback). The cache only keeps weak references to
+    # the tasks, such that tasks that are destroyed without finishing do not linger in the cache.
+    __cache: weakref.WeakKeyDictionary[Task, Optional[TaskExecInfo]] = weakref.WeakKeyDictionary()
+
+    # Marker for tasks without cache entry (distinguishes them from entries of the negative cache).
+    __NOT_CACHED: Any = object()
+
+    # Index of cached task execution infos by task ID, for constant-time lookups. Like the cache, the index
+    # only keeps weak references to the tasks. Entries are removed together with the cache entries, or
+    # when they are looked up after their task has been destroyed.
+    __index: dict[str, tuple[weakref.ref[Task], TaskExecInfo]] = dict()
+
+    # Secondary indexes of task IDs by coroutine ID, module and target, for selecting tasks without
+    # checking all of them. Unhashable targets are indexed by their string representation.
+    __index_by_coroutine: dict[str, set[str]] = dict()
+    __index_by_module: dict[str, set[str]] = dict()
+    __index_by_target: dict[Any, set[str]] = dict()
+
+    # Index of task IDs ordered by target (and task ID), such that a page of tasks ordered by target
+    # is a slice of the index.
+    __index_ordered: list[tuple[Any, str]] = list()
+
+    # Registered tasks that have not been indexed yet.
+    __unindexed: set[Task] = set()
+
+    # Number of times the stack of an undecorated task has not been inspected thanks to the negative cache.
+    __n_stack_walks_avoided: int = 0
+
+    # Tasks started via `TaskExec.start`. Strong references, such that these tasks cannot disappear mid-execution.
+    __started: set[Task] = set()
 
     @staticmethod
     def get_all() -> list[TaskExecInfo]:
         """
         Retrieve info for all running tasks.
-        Relevant tasks are identfied via the 'CoroutineDef' decorator.
+        Relevant tasks are identfied via the 'CoroutineDef' decorator, which pushes them to the task registry.
         For other tasks, no info is returned.
         """
         all_exec_infos = []
 
-        for task in all_tasks():
+        for task in TaskRegistry.get_tasks():
             info = TaskExec.get(task=task)
             if info: all_exec_infos.append(info)
 
@@ -36,12 +79,230 @@ class TaskExec:
     def get(task: Task[Any]) -> Optional[TaskExecInfo]:
         """
         Retrieve info for a running task.
+        Relevant tasks are identfied via the 'CoroutineDef' decorator.
+        For other tasks, `None` is returned as info.
+        """
+        with TaskExec.__lock:
+            cached = TaskExec.__cache.get(task, TaskExec.__NOT_CACHED)
+            if cached is not None and cached is not TaskExec.__NOT_CACHED: return cached
+
+            # Retrieve function object and call arguments from the task registry.
+            entry = TaskRegistry.get(task)
+            if entry: return TaskExec.__add_to_cache(task, TaskExec.__create_exec_info(task, *entry))
+
+            # The task has already been inspected and it is not executing a decorated coroutine.
+            if cached is None:
+                TaskExec.__n_stack_walks_avoided += 1
+                return None
+
+            # Inspecting the stack of a task running in another thread is not safe. Report no info
+            # (without caching it), the task will be inspected once asked for from its own thread.
+            if not in_loop_thread(task.get_loop()): return None
+
+            # Fall back to inspecting the task's stack for tasks that have not started
+            # executing the decorated coroutine yet.
+            return TaskExec.__add_to_cache(task, TaskExec.__inspect_stack(task))
+
+    @staticmethod
+    def get_by_id(task_id: str, from_cache: bool = False) -> Optional[TaskExecInfo]:
+        """
+        Retrieve info for a running task by its ID.
         Relevant tasks are identfied via the 'TaskDef' decorator.
         For other tasks, `None` is returned as info.
         """
-        exec_info = TaskExec.__cache.get(task)
-        if exec_info: return exec_info
+        with TaskExec.__lock: indexed = TaskExec.__lookup(task_id)
+        if indexed: return indexed[1]
+
+        if from_cache:
+            raise RuntimeError(f'No task with ID "{task_id}" has been found in the internal cache.')
+        else:
+            task = TaskExec.__find(task_id)
+            if task: return TaskExec.get(task)
+            raise RuntimeError(f'No task with ID "{task_id}" has been found.')
+
+    @staticmethod
+    def get_task(task_id: str) -> Optional[Task[Any]]:
+        """
+        Retrieve a running task by its ID from the index. Return `None` if the task is not indexed (anymore).
+        """
+        with TaskExec.__lock: indexed = TaskExec.__lookup(task_id)
+        return indexed[0] if indexed else None
+
+    @staticmethod
+    def start(func_info: CoroutineDefInfo, param_apply: dict[str, Any], process: Any = None) -> Task[Any]:
+        """
+        Start a new task executing a coroutine on the current event loop.
+        For methods, the coroutine is called for the given process (class instance).
+        """
+        loop = get_event_loop()
+        args = (process,) if func_info.context.is_method else ()
+        task = loop.create_task(func_info.func(*args, **param_apply))
+
+        # Register the new task right away, such that it is listed even before it starts executing.
+        TaskRegistry.register(task, getattr(func_info.func, '__wrapped__'), args, param_apply, pending=True)
+        task.add_done_callback(TaskRegistry.unregister)
+
+        # Keep a reference to the task until it is done.
+        TaskExec.__started.add(task)
+        task.add_done_callback(TaskExec.__started.discard)
+
+        return task
+
+    @staticmethod
+    def cancel(task_id: str, target: Any, coroutine_id: str) -> None:
+        """
+        Cancel a running task.
+        The task's target has to match the specified target.
+        """
+        with TaskExec.__lock: indexed = TaskExec.__lookup(task_id)
+        task = indexed[0] if indexed else TaskExec.__find(task_id)
+        if not task: raise RuntimeError(f'No task with ID = "{task_id}" found')
+        exec_info = indexed[1] if indexed else TaskExec.get(task)
+
+        def_info = CoroutineDef.get_coroutine_def_info(coroutine_id)
+        if not def_info: raise RuntimeError(f'Unknown coroutine ID = {coroutine_id}')
+
+        if not exec_info: raise RuntimeError(f'No execution info available for task ID = {task_id}')
 
+        check_target = exec_info.params[def_info.target_param] == target
+        if check_target:
+            call_in_loop(task.get_loop(), task.cancel)
+        else:
+            raise RuntimeError(f'Incorrect target ("{target}")')
+
+    @staticmethod
+    def select(
+            task_ids: Optional[Iterable[str]] = None,
+            coroutine_id: Optional[str] = None,
+            targets: Optional[list[Any]] = None,
+            module: Optional[str] = None,
+            params: Optional[dict[str, str]] = None,
+        ) -> dict[str, tuple[Task[Any], TaskExecInfo]]:
+        """
+        Select running tasks by task ID, coroutine ID, target, module and/or parameter values, using the index.
+        Parameter values are compared by their string representation.
+        Criteria that are not specified (`None`) are not applied.
+        Return the selected tasks and their execution infos, by task ID.
+        """
+        with TaskExec.__lock:
+            if task_ids is None:
+                # Make sure all registered tasks are indexed.
+                TaskExec.__update_index()
+
+                # Use the most selective index for retrieving the candidates.
+                index_sets = []
+                if coroutine_id is not None: index_sets.append(TaskExec.__index_by_coroutine.get(coroutine_id, set()))
+                if module is not None: index_sets.append(TaskExec.__index_by_module.get(module, set()))
+                if targets is not None:
+                    index_sets.append(set().union(
+                        *(TaskExec.__index_by_target.get(target_key(t), set()) for t in targets)
+                    ))
+                candidates = list(min(index_sets, key=len) if index_sets else TaskExec.__index.keys())
+            else:
+                candidates = list(task_ids)
+
+            selected = {}
+
+            for task_id in candidates:
+                indexed = TaskExec.__lookup(task_id)
+                if not indexed:
+                    # Fall back to search for tasks that have not been indexed yet.
+                    task = TaskExec.__find(task_id) if task_ids is not None else None
+                    exec_info = TaskExec.get(task) if task else None
+                    if not task or not exec_info: continue
+                    indexed = (task, exec_info)
+
+                exec_info = indexed[1]
+                if coroutine_id is not None and exec_info.coroutine_id != coroutine_id: continue
+                if targets is not None and exec_info.target not in targets: continue
+                if module is not None and exec_info.module != module: continue
+                if params is not None and any(
+                        not name in exec_info.params or str(exec_info.params[name]) != value for name, value in params.items()
+                    ): continue
+
+                selected[task_id] = indexed
+
+        return selected
+
+    @staticmethod
+    def select_page(
+            offset: int,
+            limit: int,
+            coroutine_id: Optional[str] = None,
+            targets: Optional[list[Any]] = None,
+            module: Optional[str] = None,
+            params: Optional[dict[str, str]] = None,
+        ) -> tuple[int, list[tuple[Task[Any], TaskExecInfo]]]:
+        """
+        Select running tasks like `TaskExec.select`, ordered by target. Return the number of selected
+        tasks and a page of them (at most `limit` tasks, starting at position `offset`).
+        Without criteria, the page is a slice of the index ordered by target, i.e., the cost only depends
+        on the page size. With criteria, all matching tasks are retrieved via the indexes and ordered
+        (k log k for k matching tasks). Note: Parameter values are not indexed, they are checked for
+        all candidates selected by the other criteria.
+        """
+        with TaskExec.__lock:
+            if coroutine_id is None and targets is None and module is None and params is None:
+                TaskExec.__update_index()
+
+                page = []
+                for _, task_id in TaskExec.__index_ordered[offset:offset + limit]:
+                    # Tasks that are done but have not been evicted yet are skipped.
+                    indexed = TaskExec.__lookup(task_id)
+                    if indexed: page.append(indexed)
+
+                return len(TaskExec.__index_ordered), page
+
+            selected = TaskExec.select(coroutine_id=coroutine_id, targets=targets, module=module, params=params)
+
+        ordered = sorted(selected.values(), key=lambda indexed: (indexed[1].target, indexed[1].task_id))
+        return len(ordered), ordered[offset:offset + limit]
+
+    @staticmethod
+    def cancel_many(
+            task_ids: Optional[Iterable[str]] = None,
+            coroutine_id: Optional[str] = None,
+            targets: Optional[list[Any]] = None,
+        ) -> dict[str, tuple[Task[Any], TaskExecInfo]]:
+        """
+        Cancel all running tasks selected by task ID, coroutine ID and/or target (see `TaskExec.select`).
+        Return the tasks for which cancellation has been requested and their execution infos, by task ID.
+        """
+        selected = TaskExec.select(task_ids=task_ids, coroutine_id=coroutine_id, targets=targets)
+        for task, _ in selected.values(): call_in_loop(task.get_loop(), task.cancel)
+        return selected
+
+    @staticmethod
+    def __lookup(task_id: str) -> Optional[tuple[Task[Any], TaskExecInfo]]:
+        """
+        Look up a running task and its execution info in the index.
+        """
+        indexed = TaskExec.__index.get(task_id)
+        if not indexed: return None
+
+        task = indexed[0]()
+        if not task:
+            # The task has been destroyed without finishing.
+            TaskExec.__remove_from_index(indexed[1])
+            return None
+        if task.done(): return None
+
+        return task, indexed[1]
+
+    @staticmethod
+    def __find(task_id: str) -> Optional[Task[Any]]:
+        """
+        Find a running task by its ID, for tasks that are not indexed.
+        """
+        for task in all_tasks(TaskExec.__loop):
+            if task_id == str_task_id(task): return task
+        return None
+
+    @staticmethod
+    def __inspect_stack(task: Task[Any]) -> Optional[TaskExecInfo]:
+        """
+        Retrieve info for a task by inspecting its stack frames.
+        """
         # Get stack frames for this task's coroutine.
         stack = task.get_stack()
         for frame in stack:
@@ -50,74 +311,120 @@ class TaskExec:
 
             # Check if the 'coroutine_def_wrapper' decorator has been applied to the task's coroutine.
             if package_name == get_package_name() and coroutine_name == 'coroutine_def_wrapper':
-                # Get function object.
-                func = frame.f_locals['func']
+                return TaskExec.__create_exec_info(
+                    task, frame.f_locals['func'], frame.f_locals['args'], frame.f_locals['kwargs']
+                )
 
-                # Retrieve task parameters.
-                args = frame.f_locals['args']
-                kwargs = frame.f_locals['kwargs']
+        return None
 
-                # Special case: class method.
-                if (type(func) == classmethod): args = ['cls', *args]
+    @staticmethod
+    def __create_exec_info(task: Task[Any], func: Callable, args: tuple, kwargs: dict[str, Any]) -> TaskExecInfo:
+        """
+        Create the execution info for a task from the function object and the call arguments.
+        """
+        # Get the mapping of call arguments to values.
+        params = get_call_params(func, args, kwargs)
 
-                # Special case: stacked decorators.
-                if hasattr(func, '__wrapped__'): func = getattr(func, '__wrapped__')
+        # Special case: stacked decorators.
+        if hasattr(func, '__wrapped__'): func = getattr(func, '__wrapped__')
 
-                # Get the mapping of call arguments to values.
-                params = getcallargs(func, *args, **kwargs)
+        return TaskExecInfo(
+            task_id=str_task_id(task),
+            coroutine_name=func.__qualname__,
+            module=func.__module__,
+            params=params,
+        )
 
-                # Generate and append task execution info.
-                exec_info = TaskExecInfo(
-                    task_id=str_task_id(task),
-                    coroutine_name=func.__qualname__,
-                    module=func.__module__,
-                    params=OrderedDict(sorted(params.items())),
-                )
+    @staticmethod
+    def get_stack_walks_avoided() -> int:
+        """
+        Get the number of times the stack of an undecorated task has not been inspected
+        because the task was found in the negative cache.
+        """
+        return TaskExec.__n_stack_walks_avoided
 
+    @staticmethod
+    def __add_to_cache(task: Task[Any], exec_info: Optional[TaskExecInfo]) -> Optional[TaskExecInfo]:
+        """
+        Add the execution info of a task to the cache. The entry is evicted once the task is done.
+        """
+        if task not in TaskExec.__cache:
+            call_in_loop(task.get_loop(), task.add_done_callback, TaskExec.__remove_from_cache)
         TaskExec.__cache[task] = exec_info
-        task.add_done_callback(TaskExec.__remove_from_cache)
+        if exec_info:
+            task_id = exec_info.task_id
+            # Task IDs may be reused, drop the entries of a previous task with the same ID.
+            previous = TaskExec.__index.get(task_id)
+            if previous: TaskExec.__remove_from_index(previous[1])
 
+            TaskExec.__index[task_id] = (weakref.ref(task), exec_info)
+            TaskExec.__index_by_coroutine.setdefault(exec_info.coroutine_id, set()).add(task_id)
+            TaskExec.__index_by_module.setdefault(exec_info.module, set()).add(task_id)
+            TaskExec.__index_by_target.setdefault(target_key(exec_info.target), set()).add(task_id)
+            insort(TaskExec.__index_ordered, (exec_info.target, task_id))
         return exec_info
 
     @staticmethod
-    def get_by_id(task_id: str, from_cache: bool = False) -> Optional[TaskExecInfo]:
-        """
-        Retrieve info for a running task by its ID.
-        Relevant tasks are identfied via the 'TaskDef' decorator.
-        For other tasks, `None` is returned as info.
-        """
-        if from_cache:
-            for task, info in TaskExec.__cache.items():
-                if task_id == str_task_id(task): return info
-            raise RuntimeError(f'No task with ID "{task_id}" has been found in the internal cache.')
-        else:
-            for task in all_tasks():
-                if task_id == str_task_id(task): return TaskExec.get(task)
-            raise RuntimeError(f'No task with ID "{task_id}" has been found.')
+    def __remove_from_cache(t: Task[Any]) -> None:
+        with TaskExec.__lock:
+            exec_info = TaskExec.__cache.pop(t, None)
+            if exec_info: TaskExec.__remove_from_index(exec_info)
 
     @staticmethod
-    def cancel(task_id: str, target: Any, coroutine_id: str) -> None:
-        for task in all_tasks():
-            if task_id == str_task_id(task):
-                def_info = CoroutineDef.get_coroutine_def_info(coroutine_id)
-                if not def_info: raise RuntimeError(f'Unknown coroutine ID = {coroutine_id}')
+    def __remove_from_index(exec_info: TaskExecInfo) -> None:
+        task_id = exec_info.task_id
+        indexed = TaskExec.__index.get(task_id)
+        # Task IDs may be reused, only remove entries that still belong to this task.
+        if not indexed or indexed[1] is not exec_info: return
 
-                exec_info = TaskExec.get(task)
-                if not exec_info: raise RuntimeError(f'No execution info available for task ID = {task_id}')
+        del TaskExec.__index[task_id]
+        TaskExec.__discard_from_index(TaskExec.__index_by_coroutine, exec_info.coroutine_id, task_id)
+        TaskExec.__discard_from_index(TaskExec.__index_by_module, exec_info.module, task_id)
+        TaskExec.__discard_from_index(TaskExec.__index_by_target, target_key(exec_info.target), task_id)
 
-                check_target = exec_info.params[def_info.target_param] == target
-                if check_target:
-                    task.cancel()
-                    return
-                else:
-                    raise RuntimeError(f'Incorrect target ("{target}")')
-        raise RuntimeError(f'No task with ID = "{task_id}" found')
+        entry = (exec_info.target, task_id)
+        pos = bisect_left(TaskExec.__index_ordered, entry)
+        if pos < len(TaskExec.__index_ordered) and TaskExec.__index_ordered[pos] == entry:
+            del TaskExec.__index_ordered[pos]
 
     @staticmethod
-    def __remove_from_cache(t: Task[Any]) -> None:
-        del TaskExec.__cache[t]
+    def __discard_from_index(index: dict[Any, set[str]], key: Any, task_id: str) -> None:
+        task_ids = index.get(key)
+        if task_ids is None: return
+        task_ids.discard(task_id)
+        if not task_ids: del index[key]
+
+    @staticmethod
+    def __update_index() -> None:
+        """
+        Index all registered tasks that have not been indexed yet.
+        """
+        while TaskExec.__unindexed: TaskExec.get(TaskExec.__unindexed.pop())
+
+    @staticmethod
+    def _on_registry_event(task: Task[Any], registered: bool) -> None:
+        """
+        Keep track of registered tasks that have not been indexed yet. Remove unregistered tasks from
+        the cache, since they no longer execute a decorated coroutine.
+        """
+        with TaskExec.__lock:
+            if registered:
+                TaskExec.__unindexed.add(task)
+            else:
+                TaskExec.__unindexed.discard(task)
+                TaskExec.__remove_from_cache(task)
+
+    @staticmethod
+    def set_loop(loop: Optional[Loop]) -> None:
+        """
+        Set the event loop executing the monitored tasks. Only needed in case task info is
+        retrieved from another thread, for finding tasks that have not been registered.
+        """
+        TaskExec.__loop = loop
 
     # @staticmethod
     # def __print_cache() -> None:
     #     print('### TASK INFO CACHE ###')
     #     for task, info in TaskExec.__cache.items(): print(f'\t{task.get_name()}: {info}')
+
+TaskRegistry.add_listener(TaskExec._on_registry_event)
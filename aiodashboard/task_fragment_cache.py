@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+from jinja2 import Environment, pass_environment
+from markupsafe import Markup
+
+from .util import *
+
+from .task_exec import TaskExec
+from .task_registry import TaskRegistry
+
+from typing import Any
+
+class TaskFragmentCache:
+    """
+    Cache of the rendered entries of running tasks in the list of running tasks (template 'task-item.html'),
+    by task ID. An entry is rendered once per task and version of the list of targets (it refers to the target
+    by position), such that rendering the list of unchanged tasks boils down to joining cached strings.
+    Entries are evicted when their task finishes (via the task registry, which is listened to as long as entries
+    are cached) and the oldest entries are evicted beyond `max_entries`. Entries of tasks that finish while they are
+    rendered are not kept. Since task IDs may be reused once a task
+    is gone, an entry is only used if the task's display info is unchanged (the target and the parameter values
+    being the same objects, whose comparison might be costly or fail).
+    Entries may be evicted from the tasks' event loop while the dashboard renders in another thread, access is locked.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 10000
+        ) -> None:
+        """
+        Contructor.
+        """
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[Environment, int, tuple, Markup]] = dict()
+        self._listening = False
+
+    @pass_environment
+    def render(self, env: Environment, display_info: tuple, target_version: int) -> Markup:
+        """
+        Render the entry of a task (display info as collected by `Dashboard._get_display_info`), or retrieve
+        it from the cache. Called from templates, which pass their environment.
+        """
+        str_task_id = display_info[4]
+
+        entry = self._entries.get(str_task_id)
+        if entry and entry[0] is env and entry[1] == target_version and self._is_unchanged(entry[2], display_info):
+            return entry[3]
+
+        module: Any = env.get_template('task-item.html').module
+        html = Markup(str(module.task_item(*display_info, target_version=target_version)))
+
+        with self._lock:
+            if not self._listening:
+                TaskRegistry.add_listener(self._on_registry_event)
+                self._listening = True
+
+            self._entries.pop(str_task_id, None)
+            self._entries[str_task_id] = (env, target_version, display_info, html)
+            if len(self._entries) > self._max_entries: del self._entries[next(iter(self._entries))]
+
+        # The task may have finished (and its entry may have been evicted) in the meantime. Checked after storing
+        # the entry, such that the entry is dropped either here or by the registry listener.
+        task = TaskExec.get_task(str_task_id)
+        if task is None or TaskRegistry.get(task) is None:
+            with self._lock: self._entries.pop(str_task_id, None)
+
+        return html
+
+    def get_size(self) -> int:
+        """
+        Retrieve the number of cached entries.
+        """
+        return len(self._entries)
+
+    def close(self) -> None:
+        """
+        Drop all entries and stop listening to the task registry.
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._listening: TaskRegistry.remove_listener(self._on_registry_event)
+            self._listening = False
+
+    @staticmethod
+    def _is_unchanged(cached: tuple, display_info: tuple) -> bool:
+        """
+        Check whether the display info of a task is the same as the one of a cached entry.
+        """
+        target, *names, params, type_info = display_info
+        cached_target, *cached_names, cached_params, cached_type_info = cached
+
+        return target is cached_target and names == cached_names and type_info == cached_type_info \
+            and len(params) == len(cached_params) \
+            and all(k == ck and v is cv for (k, v), (ck, cv) in zip(params.items(), cached_params.items()))
+
+    def _on_registry_event(self, task: asyncio.Task, started: bool) -> None:
+        """
+        Evict the entry of a finished task. Stop listening once the cache is empty.
+        """
+        if started: return
+
+        with self._lock:
+            self._entries.pop(task_id(task), None)
+            if not self._entries and self._listening:
+                TaskRegistry.remove_listener(self._on_registry_event)
+                self._listening = False
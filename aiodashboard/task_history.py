@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Optional
+
+from .task_history_record import TaskHistoryRecord
+from .task_outcome import TaskOutcome
+from .util import get_call_params, json_dumps
+
+# Finished task execution as recorded on the task's done path, turned into a record later on (see `TaskHistory.flush`):
+# task (by `id`), coroutine ID, coroutine function, target parameter, call arguments, start and end time, outcome, result or exception.
+TaskHistoryEntry = tuple[int, str, Callable, str, tuple, dict[str, Any], float, float, str, Any]
+
+class TaskHistory:
+    """
+    History of recent task executions (all tasks executing a coroutine decorated with 'CoroutineDef').
+    The history is a ring buffer of at most `max_records` records, older records are dropped. Optionally,
+    records are also appended to a file (one JSON object per line), which keeps the complete history.
+    Recording a finished task only appends the raw call data to a queue. Records are created from the
+    queue in batches (after `flush_interval`, soon after the queue is full, or whenever the history is queried),
+    such that the history does not add noticeable overhead to the tasks' done path. Records are appended
+    to the file by a dedicated thread.
+    The history may be queried from another thread (see `start_dashboard`), access to the records is locked.
+    """
+
+    # Maximum length of the string representations of parameter values and outcome details.
+    MAX_VALUE_LENGTH: int = 200
+
+    # Maximum number of recorded task executions waiting for their records to be created.
+    MAX_PENDING: int = 1000
+
+    __lock = threading.Lock()
+
+    __max_records: int = 10000
+    __flush_interval: float = 1.
+    __flush_scheduled: bool = False
+    __flush_soon: bool = False
+
+    __pending: deque[TaskHistoryEntry] = deque()
+    __records: deque[TaskHistoryRecord] = deque(maxlen=10000)
+
+    __spill_path: Optional[str] = None
+    __spill_file: Optional[BinaryIO] = None
+    __spill_executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def configure(
+            max_records: int = 10000,
+            spill_path: Optional[str] = None,
+            flush_interval: float = 1.
+        ) -> None:
+        """
+        Configure the history: maximum number of records kept in memory (0 disables the history), file the
+        records are appended to (optional) and maximum delay until finished tasks show up in the history.
+        Records kept so far are retained (as far as they fit).
+        """
+        TaskHistory.flush()
+
+        with TaskHistory.__lock:
+            TaskHistory.__max_records = max_records
+            TaskHistory.__flush_interval = flush_interval
+            TaskHistory.__records = deque(TaskHistory.__records, maxlen=max_records)
+
+            if spill_path != TaskHistory.__spill_path:
+                # The file is closed once the records pending for it have been written.
+                if TaskHistory.__spill_file and TaskHistory.__spill_executor:
+                    TaskHistory.__spill_executor.submit(TaskHistory.__spill_file.close)
+                if spill_path and not TaskHistory.__spill_executor:
+                    TaskHistory.__spill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aiodashboard-history')
+                TaskHistory.__spill_path = spill_path
+                TaskHistory.__spill_file = open(spill_path, 'ab') if spill_path else None
+
+    @staticmethod
+    def add(
+            task: asyncio.Task,
+            coroutine_id: str,
+            func: Callable,
+            target_param: str,
+            args: tuple,
+            kwargs: dict[str, Any],
+            started: float,
+            finished: float,
+            outcome: str,
+            value: Any
+        ) -> None:
+        """
+        Record a finished task execution (called from the task's done path).
+        """
+        if not TaskHistory.__max_records: return
+
+        TaskHistory.__pending.append(
+            (id(task), coroutine_id, func, target_param, args, kwargs, started, finished, outcome, value)
+        )
+
+        # Many tasks finished within the flush interval, do not wait any longer (but do not flush on the done path).
+        if len(TaskHistory.__pending) >= min(TaskHistory.__max_records, TaskHistory.MAX_PENDING):
+            if not TaskHistory.__flush_soon:
+                TaskHistory.__flush_soon = True
+                task.get_loop().call_soon(TaskHistory.flush)
+        elif not TaskHistory.__flush_scheduled:
+            TaskHistory.__flush_scheduled = True
+            task.get_loop().call_later(TaskHistory.__flush_interval, TaskHistory.flush)
+
+    @staticmethod
+    def flush() -> None:
+        """
+        Create records for all recorded task executions (and append them to the file, if configured).
+        """
+        with TaskHistory.__lock:
+            TaskHistory.__flush_scheduled = False
+            TaskHistory.__flush_soon = False
+            if not TaskHistory.__pending: return
+
+            records = []
+            while TaskHistory.__pending: records.append(TaskHistory.__create_record(TaskHistory.__pending.popleft()))
+            TaskHistory.__records.extend(records)
+
+            # Submitted under the lock, such that records are written in order.
+            if TaskHistory.__spill_file and TaskHistory.__spill_executor:
+                TaskHistory.__spill_executor.submit(TaskHistory.__write, TaskHistory.__spill_file, records)
+
+    @staticmethod
+    def __write(file: BinaryIO, records: list[TaskHistoryRecord]) -> None:
+        """
+        Append records to the file (called from the dedicated thread).
+        """
+        file.write(b''.join(json_dumps(dataclasses.asdict(record)) + b'\n' for record in records))
+        file.flush()
+
+    @staticmethod
+    def query(
+            since: Optional[float] = None,
+            until: Optional[float] = None,
+            targets: Optional[list[str]] = None,
+            coroutine_id: Optional[str] = None,
+            limit: Optional[int] = None
+        ) -> list[TaskHistoryRecord]:
+        """
+        Select records of task executions overlapping the time range `since` to `until` (in seconds since the epoch),
+        optionally only for some targets (by their string representation) and/or a coroutine. The most recently
+        finished tasks come first, at most `limit` records are returned.
+        Criteria that are not specified (`None`) are not applied.
+        """
+        TaskHistory.flush()
+
+        with TaskHistory.__lock: records = list(TaskHistory.__records)
+
+        # Records are ordered by end time, older records are not checked at all.
+        selected = []
+        for record in reversed(records):
+            if since is not None and record.finished < since: break
+            if not TaskHistory.__matches(record, until, targets, coroutine_id): continue
+            selected.append(record)
+            if limit is not None and len(selected) >= limit: break
+
+        return selected
+
+    @staticmethod
+    def query_file(
+            since: Optional[float] = None,
+            until: Optional[float] = None,
+            targets: Optional[list[str]] = None,
+            coroutine_id: Optional[str] = None,
+            limit: Optional[int] = None
+        ) -> list[TaskHistoryRecord]:
+        """
+        Select records of task executions from the file (see `TaskHistory.query`), including records that
+        have been dropped from memory. Reads the complete file, better not to call it from an event loop.
+        """
+        TaskHistory.flush()
+
+        path = TaskHistory.__spill_path
+        if not path: raise RuntimeError('Task history is not stored in a file')
+
+        # Wait for the records pending to be written.
+        if TaskHistory.__spill_executor: TaskHistory.__spill_executor.submit(lambda: None).result()
+
+        selected: deque[TaskHistoryRecord] = deque(maxlen=limit)
+        with open(path, 'rb') as file:
+            for line in file:
+                record = TaskHistoryRecord(**json.loads(line))
+                if since is not None and record.finished < since: continue
+                if TaskHistory.__matches(record, until, targets, coroutine_id): selected.append(record)
+
+        return list(reversed(selected))
+
+    @staticmethod
+    def get_latest(task_id: str) -> Optional[TaskHistoryRecord]:
+        """
+        Retrieve the record of the most recently finished execution of a task (if still kept in memory).
+        """
+        TaskHistory.flush()
+
+        with TaskHistory.__lock:
+            for record in reversed(TaskHistory.__records):
+                if record.task_id == task_id: return record
+        return None
+
+    @staticmethod
+    def is_file_enabled() -> bool:
+        """
+        Check if records are appended to a file.
+        """
+        return TaskHistory.__spill_path is not None
+
+    @staticmethod
+    def __matches(
+            record: TaskHistoryRecord,
+            until: Optional[float],
+            targets: Optional[list[str]],
+            coroutine_id: Optional[str]
+        ) -> bool:
+        if until is not None and record.started > until: return False
+        if targets is not None and record.target not in targets: return False
+        if coroutine_id is not None and record.coroutine_id != coroutine_id: return False
+        return True
+
+    @staticmethod
+    def __create_record(entry: TaskHistoryEntry) -> TaskHistoryRecord:
+        """
+        Create the record of a finished task execution.
+        """
+        task_id, coroutine_id, func, target_param, args, kwargs, started, finished, outcome, value = entry
+
+        try:
+            params = get_call_params(func, args, kwargs)
+        except TypeError:
+            # The coroutine has been called with invalid arguments (and failed right away).
+            params = OrderedDict(sorted(kwargs.items()))
+        target = params.get(target_param)
+        for name in ['self', 'cls']: params.pop(name, None)
+
+        if outcome == TaskOutcome.EXCEPTION:
+            detail = f'{type(value).__name__}: {value}'
+        elif outcome == TaskOutcome.RESULT:
+            detail = repr(value)
+        else:
+            detail = ''
+
+        # Special case: stacked decorators.
+        if hasattr(func, '__wrapped__'): func = getattr(func, '__wrapped__')
+
+        return TaskHistoryRecord(
+            task_id=str(task_id),
+            coroutine_id=coroutine_id,
+            coroutine_name=func.__qualname__,
+            module=func.__module__,
+            target=str(target),
+            params={name: TaskHistory.__truncate(str(value)) for name, value in params.items()},
+            started=started,
+            finished=finished,
+            outcome=outcome,
+            detail=TaskHistory.__truncate(detail),
+        )
+
+    @staticmethod
+    def __truncate(value: str) -> str:
+        max_length = TaskHistory.MAX_VALUE_LENGTH
+        return value if len(value) <= max_length else value[:max_length - 3] + '...'
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Drop all records (the file is kept).
+        Mostly intended for testing.
+        """
+        with TaskHistory.__lock:
+            TaskHistory.__pending.clear()
+            TaskHistory.__records.clear()
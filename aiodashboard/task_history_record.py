@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True, slots=True)
+class TaskHistoryRecord:
+    """
+    Provide information about a finished task execution.
+    Parameter values, target and outcome detail are kept as (truncated) strings, such that records
+    do not keep any objects of the monitored application alive.
+    """
+    task_id: str
+    coroutine_id: str
+    coroutine_name: str
+    module: str
+    target: str
+    params: dict[str, str]
+    started: float
+    finished: float
+    outcome: str
+    detail: str
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
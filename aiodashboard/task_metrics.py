@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from inspect import Parameter, signature
+
+from typing import Any, Callable, Optional
+
+from .latency_histogram import LatencyHistogram
+from .util import get_call_params
+
+# Finished task execution as recorded on the task's done path, added to the histograms later on (see `TaskMetrics.flush`):
+# coroutine ID, coroutine function, target parameter, call arguments, duration, outcome.
+TaskMetricsSample = tuple[str, Callable, str, tuple, dict[str, Any], float, str]
+
+class TaskMetrics:
+    """
+    Runtime metrics of all coroutines decorated with 'CoroutineDef': a latency histogram per coroutine
+    (see `LatencyHistogram`), optionally also per coroutine and target (by its string representation).
+    Recording a finished task only appends a sample to a queue. Samples are added to the histograms in
+    batches (when the queue is full, or whenever the metrics are retrieved), such that the metrics add
+    as little overhead as possible to the tasks' done path.
+    Metrics may be retrieved from another thread (see `start_dashboard`), access to the histograms is locked.
+    """
+
+    # Maximum number of samples waiting to be added to the histograms.
+    MAX_PENDING: int = 1024
+
+    __lock = threading.Lock()
+
+    # Marker for samples whose target cannot be determined.
+    __NO_TARGET: Any = object()
+
+    __by_target: bool = False
+    __since: float = time.time()
+
+    __pending: deque[TaskMetricsSample] = deque()
+    __histograms: dict[str, LatencyHistogram] = dict()
+    __target_histograms: dict[tuple[str, str], LatencyHistogram] = dict()
+
+    @staticmethod
+    def configure(by_target: bool = False) -> None:
+        """
+        Configure the metrics: break them down by target (in addition to coroutine)?
+        """
+        TaskMetrics.flush()
+        TaskMetrics.__by_target = by_target
+
+    @staticmethod
+    def observe(
+            coroutine_id: str,
+            func: Callable,
+            target_param: str,
+            args: tuple,
+            kwargs: dict[str, Any],
+            duration: float,
+            outcome: str
+        ) -> None:
+        """
+        Record a finished task execution (called from the task's done path).
+        """
+        pending = TaskMetrics.__pending
+        pending.append((coroutine_id, func, target_param, args, kwargs, duration, outcome))
+        if len(pending) >= TaskMetrics.MAX_PENDING: TaskMetrics.flush()
+
+    @staticmethod
+    def flush() -> None:
+        """
+        Add all recorded task executions to the histograms.
+        """
+        with TaskMetrics.__lock:
+            pending = TaskMetrics.__pending
+            if not pending: return
+
+            # Group samples by coroutine (and target), such that each histogram is updated in one go.
+            samples: dict[Any, list[tuple[float, str]]] = dict()
+            target_samples: dict[tuple[str, str], list[tuple[float, str]]] = dict()
+
+            while pending:
+                coroutine_id, func, target_param, args, kwargs, duration, outcome = pending.popleft()
+                samples.setdefault(coroutine_id, []).append((duration, outcome))
+
+                if TaskMetrics.__by_target:
+                    target = TaskMetrics.__get_target(func, target_param, args, kwargs)
+                    if target is not TaskMetrics.__NO_TARGET:
+                        target_samples.setdefault((coroutine_id, str(target)), []).append((duration, outcome))
+
+            TaskMetrics.__add_samples(TaskMetrics.__histograms, samples)
+            TaskMetrics.__add_samples(TaskMetrics.__target_histograms, target_samples)
+
+    @staticmethod
+    def get_histograms() -> dict[str, LatencyHistogram]:
+        """
+        Retrieve the latency histograms by coroutine ID.
+        """
+        TaskMetrics.flush()
+        return dict(TaskMetrics.__histograms)
+
+    @staticmethod
+    def get_target_histograms() -> dict[tuple[str, str], LatencyHistogram]:
+        """
+        Retrieve the latency histograms by coroutine ID and target (empty unless broken down by target).
+        """
+        TaskMetrics.flush()
+        return dict(TaskMetrics.__target_histograms)
+
+    @staticmethod
+    def get_since() -> float:
+        """
+        Retrieve the time (in seconds since the epoch) since when metrics are collected.
+        """
+        return TaskMetrics.__since
+
+    @staticmethod
+    def __get_target(func: Callable, target_param: str, args: tuple, kwargs: dict[str, Any]) -> Any:
+        if target_param in kwargs: return kwargs[target_param]
+
+        # Fast path: target passed as positional argument.
+        pos = TaskMetrics.__get_target_position(func, target_param)
+        if pos is not None and pos < len(args): return args[pos]
+
+        try:
+            return get_call_params(func, args, kwargs)[target_param]
+        except TypeError:
+            return TaskMetrics.__NO_TARGET # The coroutine has been called with invalid arguments (and failed right away).
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def __get_target_position(func: Callable, target_param: str) -> Optional[int]:
+        """
+        Position of the target parameter among the positional arguments of a decorated coroutine function.
+        """
+        # Special case: class method (no argument for 'cls').
+        offset = -1 if type(func) == classmethod else 0
+
+        # Special case: stacked decorators.
+        if hasattr(func, '__wrapped__'): func = getattr(func, '__wrapped__')
+
+        for pos, param in enumerate(signature(func, follow_wrapped=False).parameters.values()):
+            if param.name == target_param:
+                positional = param.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+                return pos + offset if positional and pos + offset >= 0 else None
+        return None
+
+    @staticmethod
+    def __add_samples(histograms: dict[Any, LatencyHistogram], samples: dict[Any, list[tuple[float, str]]]) -> None:
+        for key, key_samples in samples.items():
+            histogram = histograms.get(key)
+            if histogram is None: histogram = histograms[key] = LatencyHistogram()
+            histogram.add_many(key_samples)
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Drop all metrics.
+        Mostly intended for testing.
+        """
+        with TaskMetrics.__lock:
+            TaskMetrics.__pending.clear()
+            TaskMetrics.__histograms.clear()
+            TaskMetrics.__target_histograms.clear()
+            TaskMetrics.__since = time.time()
@@ -0,0 +1,7 @@
+class TaskOutcome:
+    """
+    Outcomes of task executions.
+    """
+    RESULT: str = 'result'
+    EXCEPTION: str = 'exception'
+    CANCELLED: str = 'cancelled'
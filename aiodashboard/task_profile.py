@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Any
+
+@dataclass(frozen=True, slots=True)
+class TaskProfile:
+    """
+    Provide the result of profiling tasks (see `TaskProfiler`): the sampled stacks (from the task's
+    outermost coroutine to the innermost frame, as 'function (file:line)') and how often each has been sampled.
+    Stacks of tasks that were suspended when sampled end with `TaskProfile.WAITING`.
+    """
+    started: float
+    duration: float
+    interval: float
+    n_samples: int
+    n_tasks: int
+    stacks: dict[tuple[str, ...], int]
+
+    # Innermost frame of stacks sampled while the task was waiting (not executing).
+    WAITING = '<waiting>'
+
+    def collapsed(self) -> str:
+        """
+        Stacks in the collapsed format (one line per stack, frames separated by ';', followed by the count),
+        as read by 'flamegraph.pl', speedscope and other flame graph tools. Most frequent stacks first.
+        """
+        ordered = sorted(self.stacks.items(), key=lambda item: -item[1])
+        return ''.join(f'{";".join(stack)} {count}\n' for stack, count in ordered)
+
+    def flamegraph(self) -> dict[str, Any]:
+        """
+        Stacks merged into a tree (nodes with 'name', 'value' and 'children'), as read by d3-flame-graph.
+        """
+        root: dict[str, Any] = {'name': 'all', 'value': 0, 'children': {}}
+
+        for stack, count in self.stacks.items():
+            node = root
+            node['value'] += count
+            for frame in stack:
+                node = node['children'].setdefault(frame, {'name': frame, 'value': 0, 'children': {}})
+                node['value'] += count
+
+        def to_list(node: dict[str, Any]) -> dict[str, Any]:
+            return {**node, 'children': [to_list(child) for child in node['children'].values()]}
+
+        return to_list(root)
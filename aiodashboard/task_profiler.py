@@ -0,0 +1,174 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import CodeType, FrameType
+
+from .util import *
+
+from .task_profile import TaskProfile
+
+from typing import Any, Optional
+
+# Sampled stack: code objects and line numbers, from the outermost to the innermost frame.
+RawStack = tuple[tuple[Optional[CodeType], int], ...]
+
+class TaskProfiler:
+    """
+    Sampling profiler for running tasks. For a given time, the stacks of the selected tasks are sampled
+    from a background thread. For a task that is executing when sampled, the stack is taken from the frames
+    of the event loop's thread (`sys._current_frames`), otherwise it is the chain of awaiting coroutines.
+    The overhead is bounded: at most one profile is taken at a time, for at most `max_duration` seconds,
+    at most every `interval` seconds, for at most `max_tasks` tasks and `max_depth` frames per stack.
+    Between samples, the sampling thread sleeps (releasing the GIL). Frames are only formatted once
+    sampling has finished.
+    Note: The sampling thread needs the GIL, which the loop thread hands over when waiting for I/O or
+    after the interpreter's switch interval (`sys.getswitchinterval`). Task steps shorter than this
+    interval are therefore mostly sampled as waiting, while long steps (blocking the loop) are caught.
+    """
+
+    def __init__(
+            self,
+            interval: float = 0.01,
+            max_duration: float = 60.,
+            max_tasks: int = 100,
+            max_depth: int = 64
+        ) -> None:
+        """
+        Contructor.
+        """
+        self._interval = interval
+        self._max_duration = max_duration
+        self._max_tasks = max_tasks
+        self._max_depth = max_depth
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aiodashboard-profiler')
+        self._stop: Optional[threading.Event] = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def max_duration(self) -> float:
+        return self._max_duration
+
+    async def profile(
+            self,
+            tasks: list[asyncio.Task],
+            duration: float,
+            interval: Optional[float] = None
+        ) -> TaskProfile:
+        """
+        Sample the stacks of tasks for `duration` seconds, every `interval` seconds (by default and at least
+        the profiler's interval). The tasks must run on the same event loop. Tasks that finish in the
+        meantime are not sampled anymore. Stopping to wait for the profile stops sampling.
+        """
+        if self._stop: raise RuntimeError('Another profile is being taken')
+        if not tasks: raise RuntimeError('No tasks to profile')
+
+        duration = min(max(0., duration), self._max_duration)
+        interval = max(interval or self._interval, self._interval)
+        tasks = tasks[:self._max_tasks]
+
+        # The thread running the tasks' event loop, whose frames belong to the task executing when sampled.
+        thread_id = await run_in_loop(tasks[0].get_loop(), threading.get_ident)
+
+        stop = self._stop = threading.Event()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._sample, tasks, thread_id, duration, interval, stop
+            )
+        finally:
+            stop.set()
+            self._stop = None
+
+    def close(self) -> None:
+        """
+        Stop sampling and shut down the sampling thread.
+        """
+        if self._stop: self._stop.set()
+        self._executor.shutdown(wait=False)
+
+    def _sample(
+            self,
+            tasks: list[asyncio.Task],
+            thread_id: int,
+            duration: float,
+            interval: float,
+            stop: threading.Event
+        ) -> TaskProfile:
+        """
+        Sample the stacks of tasks (in the sampling thread).
+        """
+        counts: Counter[RawStack] = Counter()
+        n_samples = 0
+
+        started = time.time()
+        start = next_sample = time.monotonic()
+        deadline = start + duration
+
+        while not stop.is_set() and time.monotonic() < deadline:
+            for task in tasks:
+                if task.done(): continue
+                stack = self._get_stack(task, thread_id)
+                if stack: counts[stack] += 1
+            n_samples += 1
+
+            # Samples that have been missed (e.g., while waiting for the GIL) are not caught up on.
+            next_sample = max(next_sample + interval, time.monotonic())
+            stop.wait(min(next_sample, deadline) - time.monotonic())
+
+        # Distinct frames may look the same once formatted (e.g., same function in files of the same name).
+        stacks: Counter[tuple[str, ...]] = Counter()
+        for stack, count in counts.items():
+            stacks[tuple(self._format_frame(code, line) for code, line in stack)] += count
+
+        return TaskProfile(started, time.monotonic() - start, interval, n_samples, len(tasks), dict(stacks))
+
+    def _get_stack(self, task: asyncio.Task, thread_id: int) -> Optional[RawStack]:
+        """
+        Sample the stack of a task. Return `None` if the task has no stack (anymore).
+        """
+        coro: Any = task.get_coro()
+        root: Optional[FrameType] = getattr(coro, 'cr_frame', None)
+        if root is None: return None
+
+        stack: list[tuple[Optional[CodeType], int]] = []
+
+        if coro.cr_running:
+            # The task is executing: walk the loop thread's frames up to the task's outermost coroutine.
+            frame = sys._current_frames().get(thread_id)
+            while frame is not None and frame is not root:
+                stack.append((frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+
+            # The task has been suspended in the meantime.
+            if frame is None: return None
+
+            stack.append((root.f_code, root.f_lineno))
+            stack.reverse()
+            return tuple(stack[:self._max_depth])
+
+        # The task is waiting: follow the chain of awaited coroutines (and generators).
+        awaited: Any = coro
+        while awaited is not None and len(stack) < self._max_depth:
+            frame = getattr(awaited, 'cr_frame', None) or getattr(awaited, 'gi_frame', None)
+            if frame is None: break
+            stack.append((frame.f_code, frame.f_lineno))
+            awaited = getattr(awaited, 'cr_await', None) or getattr(awaited, 'gi_yieldfrom', None)
+
+        stack.append((None, 0))
+        return tuple(stack)
+
+    @staticmethod
+    def _format_frame(code: Optional[CodeType], line: int) -> str:
+        """
+        Frame as shown in the profile: 'function (file:line)'.
+        """
+        if code is None: return TaskProfile.WAITING
+        name = getattr(code, 'co_qualname', code.co_name)
+        return f'{name} ({os.path.basename(code.co_filename)}:{line})'
@@ -0,0 +1,114 @@
+from asyncio import Task
+
+import threading
+
+from typing import Any, Callable, Optional
+
+TaskRegistryEntry = tuple[Callable, tuple, dict[str, Any]]
+
+# Listeners are notified about tasks being registered (`True`) or unregistered (`False`).
+TaskRegistryListener = Callable[[Task, bool], None]
+
+class TaskRegistry:
+    """
+    Registry of all tasks that are currently executing a coroutine decorated with 'CoroutineDef'.
+    Tasks are pushed to the registry by the coroutine wrapper when they start and removed when they
+    finish. Hence, the registry only ever contains tasks that are relevant for the dashboard.
+    The registry may be read from another thread (see `start_dashboard`), access to the entries is locked.
+    """
+
+    __lock = threading.Lock()
+
+    # Generation of the registry, incremented with every change. Allows clients to detect changes they missed.
+    __generation: int = 0
+    __entries: dict[Task, TaskRegistryEntry] = dict()
+    # Tasks registered before executing their decorated coroutine (see `TaskExec.start`).
+    __pending: set[Task] = set()
+    __listeners: list[TaskRegistryListener] = list()
+
+    @staticmethod
+    def register(task: Task, func: Callable, args: tuple, kwargs: dict[str, Any], pending: bool = False) -> bool:
+        """
+        Register a task executing a decorated coroutine, together with the call arguments.
+        If the task has already been registered (i.e., a decorated coroutine has been awaited by
+        another decorated coroutine), the existing entry is kept and `False` is returned.
+        Tasks registered before they start executing the decorated coroutine are flagged as `pending`,
+        such that the coroutine can still claim the registration (see `claim`).
+        """
+        with TaskRegistry.__lock:
+            if task in TaskRegistry.__entries: return False
+            TaskRegistry.__entries[task] = (func, args, kwargs)
+            if pending: TaskRegistry.__pending.add(task)
+            TaskRegistry.__generation += 1
+        for listener in tuple(TaskRegistry.__listeners): listener(task, True)
+        return True
+
+    @staticmethod
+    def unregister(task: Task) -> None:
+        """
+        Remove a task from the registry.
+        """
+        with TaskRegistry.__lock:
+            TaskRegistry.__pending.discard(task)
+            if TaskRegistry.__entries.pop(task, None) is None: return
+            TaskRegistry.__generation += 1
+        for listener in tuple(TaskRegistry.__listeners): listener(task, False)
+
+    @staticmethod
+    def claim(task: Task) -> bool:
+        """
+        Claim the registration of a pending task, i.e., of a task registered before it started executing.
+        Return `True` only for the first claim, such that only the outermost decorated coroutine does.
+        """
+        with TaskRegistry.__lock:
+            if task not in TaskRegistry.__pending: return False
+            TaskRegistry.__pending.remove(task)
+            return True
+
+    @staticmethod
+    def get(task: Task) -> Optional[TaskRegistryEntry]:
+        """
+        Retrieve the registry entry (function object and call arguments) of a task.
+        If the task is not registered, return None.
+        """
+        with TaskRegistry.__lock: return TaskRegistry.__entries.get(task)
+
+    @staticmethod
+    def get_tasks() -> list[Task]:
+        """
+        Get a list of all registered tasks.
+        """
+        with TaskRegistry.__lock: return list(TaskRegistry.__entries)
+
+    @staticmethod
+    def get_generation() -> int:
+        """
+        Get the generation of the registry, which changes whenever a task is registered or unregistered.
+        """
+        return TaskRegistry.__generation
+
+    @staticmethod
+    def add_listener(listener: TaskRegistryListener) -> None:
+        """
+        Add a listener that is notified whenever a task is registered or unregistered.
+        Listeners are called synchronously from the task's event loop and must return quickly.
+        Listeners living on another event loop have to hand over the event thread-safely.
+        """
+        TaskRegistry.__listeners.append(listener)
+
+    @staticmethod
+    def remove_listener(listener: TaskRegistryListener) -> None:
+        """
+        Remove a listener.
+        """
+        TaskRegistry.__listeners.remove(listener)
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Reset the registry.
+        Mostly intended for testing.
+        """
+        with TaskRegistry.__lock:
+            TaskRegistry.__entries.clear()
+            TaskRegistry.__pending.clear()
@@ -1,12 +1,12 @@
-from typing import Any, Callable, Optional, TypeAlias
+from typing import Any, Awaitable, Callable, Optional, TypeAlias
 from types import FunctionType, GenericAlias
-from inspect import isfunction, Signature
+from inspect import isawaitable, isfunction, iscoroutinefunction, Signature
 from warnings import warn
 
 from .callable_code_context import CallableCodeContext
 from .util import check_callable
 
-TaskTargetDefType: TypeAlias = Callable[..., list]
+TaskTargetDefType: TypeAlias = Callable[..., list | Awaitable[list]]
 
 class TaskTargetDef:
     """
@@ -14,15 +14,19 @@ class TaskTargetDef:
     This decorator is used for marking this specific function.
     The function must not take any arguments.
     The function must return a list (declared via a function annotation).
+    The function may also be a coroutine function (`async def`) returning a list.
     The dashboard won't work unless this decorator is applied to a function.
+    In case the list of targets changes, the application can report this (see `notify_changed`),
+    such that the dashboard does not need to retrieve the list with every request.
     """
 
     __target_func: Optional[TaskTargetDefType] = None
     __target_func_context: Optional[CallableCodeContext] = None
+    __generation: int = 0
 
     def __call__(self, func: TaskTargetDefType):
-        # Check if this decorator has been applied to a callable.
-        check_callable(callable=func)
+        # Check if this decorator has been applied to a callable (coroutine functions are supported).
+        check_callable(callable=func, is_coroutine=None)
 
         # Check and warn if the decorator has been applied previously.
         if TaskTargetDef.__target_func:
@@ -37,6 +41,9 @@ class TaskTargetDef:
         # Save a reference to the callable.
         TaskTargetDef.__target_func = func
 
+        # The list of targets may have changed.
+        TaskTargetDef.__generation += 1
+
         # Return the callable as is.
         return func
 
@@ -44,6 +51,38 @@ class TaskTargetDef:
     def get_targets(process: Any = None) -> list:
         """
         Retrieve the targets using the callable marked by this decorator.
+        Coroutine functions are not supported (see `get_targets_async`).
+        """
+        if TaskTargetDef.is_async():
+            func_name = TaskTargetDef.__target_func.__qualname__ # type: ignore[union-attr]
+            raise RuntimeError(f'Function "{func_name}" is a coroutine, use "get_targets_async" for retrieving targets.')
+
+        return TaskTargetDef.__call_target_func(process) # type: ignore[return-value]
+
+    @staticmethod
+    async def get_targets_async(process: Any = None) -> list:
+        """
+        Retrieve the targets using the callable marked by this decorator,
+        which may be a coroutine function or an ordinary function.
+        """
+        targets = TaskTargetDef.__call_target_func(process)
+        return (await targets) if isawaitable(targets) else targets
+
+    @staticmethod
+    def is_async() -> bool:
+        """
+        Check if the callable marked by this decorator is a coroutine function.
+        """
+        if not TaskTargetDef.__target_func:
+            raise RuntimeError('task target function has not been declared.')
+
+        func = TaskTargetDef.__target_func
+        return iscoroutinefunction(getattr(func, '__wrapped__', func))
+
+    @staticmethod
+    def __call_target_func(process: Any) -> list | Awaitable[list]:
+        """
+        Call the callable marked by this decorator (depending on its type).
         """
         if not TaskTargetDef.__target_func:
             raise RuntimeError('task target function has not been declared.')
@@ -62,6 +101,20 @@ class TaskTargetDef:
         else:
             return TaskTargetDef.__target_func()
 
+    @staticmethod
+    def notify_changed() -> None:
+        """
+        Report that the list of targets provided by the target function has changed.
+        """
+        TaskTargetDef.__generation += 1
+
+    @staticmethod
+    def get_generation() -> int:
+        """
+        Retrieve the generation of the list of targets, which changes whenever a change has been reported.
+        """
+        return TaskTargetDef.__generation
+
     @staticmethod
     def get_context() -> CallableCodeContext:
         """
@@ -80,7 +133,8 @@ class TaskTargetDef:
         """
         Check the definition of the provided target function.
         The function must not take any arguments.
-        The function must return a list (declared via a function annotation).
+        The function must return a list (declared via a function annotation). For coroutine
+        functions, this is the type of the awaited result.
         """
         if not TaskTargetDef.__target_func:
             raise RuntimeError('task target function has not been declared.')
@@ -110,3 +164,4 @@ class TaskTargetDef:
         """
         TaskTargetDef.__target_func = None
         TaskTargetDef.__target_func_context = None
+        TaskTargetDef.__generation = 0
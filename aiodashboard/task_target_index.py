@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .util import target_key
+
+class TaskTargetIndex:
+    """
+    Sorted list of all targets with constant-time lookup of a target's position.
+    Each change of the list creates a new version. The lists of a few previous versions are kept, such
+    that positions referring to a previous version (e.g., sent by a page rendered before the change) can
+    still be resolved to the correct target.
+    """
+
+    def __init__(self, max_versions: int = 8) -> None:
+        self.__max_versions = max_versions
+        self.__version = 0
+        self.__retrieved: Optional[list] = None
+        self.__targets: list = []
+        self.__positions: dict[Any, int] = {}
+        self.__previous: OrderedDict[int, list] = OrderedDict()
+
+    @property
+    def targets(self) -> list:
+        """
+        Sorted list of all targets (must not be modified).
+        """
+        return self.__targets
+
+    @property
+    def version(self) -> int:
+        """
+        Version of the list of targets.
+        """
+        return self.__version
+
+    def update(self, targets: list) -> bool:
+        """
+        Update the list of targets (as retrieved from the target function).
+        The list is only sorted and indexed again in case it has changed. Return whether it has changed.
+        """
+        if targets == self.__retrieved: return False
+        self.__retrieved = list(targets)
+
+        sorted_targets = sorted(targets)
+        if sorted_targets == self.__targets: return False
+
+        # Keep the list of the current version, forget the oldest versions.
+        self.__previous[self.__version] = self.__targets
+        while len(self.__previous) > self.__max_versions: self.__previous.popitem(last=False)
+
+        self.__version += 1
+        self.__targets = sorted_targets
+        self.__positions = {target_key(target): pos for pos, target in enumerate(sorted_targets)}
+        return True
+
+    def get_pos(self, target: Any) -> int:
+        """
+        Retrieve the position of a target. Raise a `ValueError` if the target is not listed.
+        """
+        pos = self.__positions.get(target_key(target))
+        if pos is None: raise ValueError(f'{target!r} is not in the list of targets')
+        return pos
+
+    def resolve(self, pos: int, version: Optional[int] = None) -> Any:
+        """
+        Retrieve the target at a position. In case a version is given, the position refers to the list
+        of targets of this version. The target must still be listed in the current version.
+        """
+        if version is None or version == self.__version:
+            targets = self.__targets
+        elif version in self.__previous:
+            targets = self.__previous[version]
+        else:
+            raise RuntimeError('The list of targets has changed, please reload the page')
+
+        if not 0 <= pos < len(targets): raise RuntimeError('Invalid target position')
+        target = targets[pos]
+
+        if targets is not self.__targets and not target_key(target) in self.__positions:
+            raise RuntimeError(f'Target {target} is not available anymore')
+
+        return target
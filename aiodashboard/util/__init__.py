@@ -1,10 +1,21 @@
 from .all_tasks import all_tasks
+from .call_in_loop import call_in_loop
 from .check_callable import check_callable
+from .compress_responses import compress_responses
+from .conditional_get import conditional_get
 from .error_handler import error_handler
+from .get_accepted_encodings import get_accepted_encodings
+from .get_call_params import get_call_params
 from .get_html_input_type import get_html_input_type
 from .get_package_name import get_package_name
 from .get_type_from_str import get_type_from_str
+from .in_loop_thread import in_loop_thread
+from .json_api import json_api
+from .json_response import json_dumps, json_response
+from .run_in_loop import run_in_loop
 from .setup_cookie_storage import setup_cookie_storage
+from .stream_template import stream_template
+from .target_key import target_key
 from .coroutine_id import coroutine_id
 from .task_id import task_id
 from .typing import Loop, WebHandler
@@ -0,0 +1,15 @@
+from typing import Any, Callable
+
+from .in_loop_thread import in_loop_thread
+from .typing import Loop
+
+def call_in_loop(loop: Loop, func: Callable[..., Any], *args: Any) -> None:
+    """
+    Call a function in the thread of an event loop, without waiting for it.
+    If the loop is running in the current thread, the function is called right away.
+    Otherwise, the call is scheduled thread-safely.
+    """
+    if in_loop_thread(loop):
+        func(*args)
+    else:
+        loop.call_soon_threadsafe(func, *args)
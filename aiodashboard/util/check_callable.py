@@ -1,10 +1,11 @@
-from typing import Any
+from typing import Any, Optional
 from types import FunctionType
 from inspect import iscoroutinefunction
 
-def check_callable(callable: Any, is_coroutine: bool = False) -> None:
+def check_callable(callable: Any, is_coroutine: Optional[bool] = False) -> None:
     """
     Check if object is a callable.
+    Also check if it is a coroutine (or not), unless `is_coroutine` is None.
     """
 
     is_function = (type(callable) == FunctionType)
@@ -13,7 +14,9 @@ def check_callable(callable: Any, is_coroutine: bool = False) -> None:
     if not is_function and not is_wrapped:
         raise RuntimeError(f'"{callable.__qualname__}" is not a supported callable')
 
-    if not is_coroutine:
+    if is_coroutine is None:
+        return
+    elif not is_coroutine:
         if is_function and iscoroutinefunction(callable):
             raise RuntimeError(f'"{callable.__qualname__}" is a coroutine')
         elif is_wrapped and iscoroutinefunction(callable.__wrapped__):
@@ -0,0 +1,87 @@
+import asyncio
+import gzip
+
+from aiohttp import hdrs, web
+from aiohttp.helpers import ETag
+from aiohttp.typedefs import Middleware
+from multidict import CIMultiDict
+
+from .get_accepted_encodings import get_accepted_encodings
+from .typing import WebHandler
+
+try:
+    import brotli # type: ignore[import-not-found]
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard # type: ignore[import-not-found]
+except ImportError:
+    zstandard = None
+
+from typing import Callable
+
+# Compression functions by content coding, in the order of preference (if the client has no preference).
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    **({'br': lambda body: brotli.compress(body, quality=5)} if brotli else {}),
+    **({'zstd': lambda body: zstandard.ZstdCompressor(level=3).compress(body)} if zstandard else {}),
+    'gzip': lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+def compress_responses(
+        min_size: int = 1024,
+        offload_size: int = 65536
+    ) -> Middleware:
+    """
+    Middleware for compressing responses (HTML, JSON, ...), as negotiated with the client (header
+    'Accept-Encoding'): brotli and zstd (if the packages 'brotli' and 'zstandard' are available) or gzip.
+    Responses smaller than `min_size` bytes are sent as they are. Bodies of at least `offload_size` bytes
+    are compressed in a thread (executor), such that the event loop is not blocked. Streamed responses
+    are compressed chunk-wise (gzip only). Already encoded responses are left alone.
+    Entity tags of compressed responses are made weak, since they no longer refer to the exact bytes sent.
+    """
+    @web.middleware
+    async def middleware(
+            request: web.Request,
+            handler: WebHandler
+        ) -> web.StreamResponse:
+        response = await handler(request)
+
+        if response.prepared or response.status != 200 or hdrs.CONTENT_ENCODING in response.headers \
+                or not response.content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        if isinstance(response, web.Response):
+            body = response.body
+            if not isinstance(body, bytes) or len(body) < min_size: return response
+
+            _add_vary(response.headers)
+            codings = get_accepted_encodings(request, tuple(COMPRESSORS))
+            if not codings: return response
+
+            compress = COMPRESSORS[codings[0]]
+            if len(body) >= offload_size:
+                response.body = await asyncio.get_running_loop().run_in_executor(None, compress, body)
+            else:
+                response.body = compress(body)
+            response.headers[hdrs.CONTENT_ENCODING] = codings[0]
+        else:
+            _add_vary(response.headers)
+            if not get_accepted_encodings(request, ('gzip',)): return response
+            response.enable_compression(web.ContentCoding.gzip)
+
+        etag = response.etag
+        if etag and not etag.is_weak: response.etag = ETag(value=etag.value, is_weak=True)
+        return response
+
+    return middleware
+
+def _add_vary(headers: CIMultiDict[str]) -> None:
+    """
+    Tell caches that the response depends on the accepted encodings.
+    """
+    vary = headers.get(hdrs.VARY)
+    if not vary: headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+    elif hdrs.ACCEPT_ENCODING.lower() not in vary.lower(): headers[hdrs.VARY] = f'{vary}, {hdrs.ACCEPT_ENCODING}'
@@ -0,0 +1,38 @@
+import functools
+
+from aiohttp import web
+
+from .typing import WebHandler
+
+from typing import Any, Awaitable, Callable, Optional
+
+def conditional_get(
+        get_etag: Callable[[Any, web.Request], Awaitable[Optional[str]]]
+    ) -> Callable[[WebHandler], WebHandler]:
+    """
+    Decorator for handler methods of pages that only change along with an entity tag (ETag), which is
+    cheap to determine in advance (`get_etag`, called with the handler's instance and the request).
+    If the client already has the current version (header 'If-None-Match'), the handler is not called at all
+    and status 304 (not modified) is returned. Otherwise, the entity tag is added to the handler's response
+    and clients are told to revalidate the page whenever they use it. Pages without entity tag (`None`) are
+    always served.
+    """
+    def decorator(func: WebHandler) -> WebHandler:
+
+        @functools.wraps(func)
+        async def wrapper(self: Any, request: web.Request) -> Any:
+            etag = await get_etag(self, request)
+            if etag is None: return await func(self, request)
+
+            if request.if_none_match and any(e.value == etag for e in request.if_none_match):
+                return web.Response(status=304, headers={'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'})
+
+            response = await func(self, request)
+            if isinstance(response, web.StreamResponse) and not response.prepared:
+                response.etag = etag
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+
+    return decorator
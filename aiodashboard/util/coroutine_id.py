@@ -1,8 +1,13 @@
+from functools import lru_cache
+from hashlib import blake2b
+
+@lru_cache(maxsize=1024)
 def coroutine_id(
         func_name: str, 
         module: str
     ) -> str:
     """
-    Define unique ID for coroutines.    
+    Define unique ID for coroutines.
+    The ID is a short digest of the qualified name, hence it is identical across processes and restarts.
     """
-    return str(hash((func_name, module)))
+    return blake2b(f'{module}:{func_name}'.encode(), digest_size=8).hexdigest()
@@ -3,6 +3,7 @@ import asyncio
 from aiohttp import web
 from aiohttp_jinja2 import render_template
 
+from .json_response import json_dumps
 from .typing import WebHandler
 
 @web.middleware
@@ -20,6 +21,12 @@ async def error_handler(
     except asyncio.CancelledError:
         raise
     except Exception as ex:
+        # Report errors of JSON API endpoints as JSON. Invalid requests are reported as client
+        # errors, everything else as server errors.
+        if getattr(request.match_info.handler, '__json_api__', False):
+            status = 400 if isinstance(ex, (RuntimeError, ValueError, KeyError)) else 500
+            return web.Response(body=json_dumps({'error': str(ex)}), status=status, content_type='application/json')
+
         return render_template(
             'error.html', 
             request, 
@@ -0,0 +1,28 @@
+from aiohttp import web
+
+def get_accepted_encodings(
+        request: web.Request,
+        available: tuple[str, ...]
+    ) -> list[str]:
+    """
+    Retrieve the content codings (e.g., 'br' or 'gzip') the client accepts (header 'Accept-Encoding'),
+    among the available ones. They are ordered by the client's preference (quality value), ties are
+    broken by the order of the available codings.
+    """
+    qualities: dict[str, float] = dict()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding: continue
+
+        quality = 1.
+        name, _, value = params.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.
+        qualities[coding] = quality
+
+    accepted = [c for c in available if qualities.get(c, qualities.get('*', 0.)) > 0.]
+    return sorted(accepted, key=lambda c: -qualities.get(c, qualities.get('*', 0.)))
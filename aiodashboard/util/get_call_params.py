@@ -0,0 +1,25 @@
+from collections import OrderedDict
+from functools import lru_cache
+from inspect import Signature, signature
+from typing import Any, Callable
+
+def get_call_params(func: Callable, args: tuple, kwargs: dict[str, Any]) -> OrderedDict[str, Any]:
+    """
+    Map the call arguments of a decorated coroutine function to its parameters (ordered by name).
+    """
+    # Special case: class method.
+    if (type(func) == classmethod): args = ('cls', *args)
+
+    # Special case: stacked decorators.
+    if hasattr(func, '__wrapped__'): func = getattr(func, '__wrapped__')
+
+    bound = _get_signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return OrderedDict(sorted(bound.arguments.items()))
+
+@lru_cache(maxsize=1024)
+def _get_signature(func: Callable) -> Signature:
+    """
+    Signatures are cached, since they are retrieved for every task.
+    """
+    return signature(func, follow_wrapped=False)
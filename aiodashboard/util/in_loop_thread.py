@@ -0,0 +1,12 @@
+import asyncio
+
+from .typing import Loop
+
+def in_loop_thread(loop: Loop) -> bool:
+    """
+    Check if an event loop is the running loop of the current thread.
+    """
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
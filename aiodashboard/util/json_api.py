@@ -0,0 +1,9 @@
+from .typing import WebHandler
+
+def json_api(func: WebHandler) -> WebHandler:
+    """
+    Decorator for endpoints of the JSON API.
+    Errors are reported to these endpoints as JSON instead of rendered HTML pages.
+    """
+    func.__json_api__ = True  # type: ignore
+    return func
@@ -0,0 +1,37 @@
+import json
+import hashlib
+from typing import Any
+
+from aiohttp import web
+
+try:
+    import orjson # type: ignore[import-not-found]
+except ImportError:
+    orjson = None # type: ignore[assignment]
+
+def json_dumps(data: Any) -> bytes:
+    """
+    Serialize data to JSON. Use the fast 'orjson' encoder if it is available.
+    Objects that are not JSON serializable (e.g., custom target types) are serialized as strings.
+    """
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(data, default=str, option=option)
+    return json.dumps(data, default=str, separators=(',', ':')).encode('utf-8')
+
+def json_response(
+        request: web.Request,
+        data: Any,
+        status: int = 200
+    ) -> web.Response:
+    """
+    Create a JSON response with an entity tag (ETag) derived from its content.
+    If the client already has the current version (header 'If-None-Match'), reply with status 304 (not modified).
+    """
+    body = json_dumps(data)
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    if status == 200 and request.if_none_match and any(e.value == etag for e in request.if_none_match):
+        return web.Response(status=304, headers={'ETag': f'"{etag}"'})
+
+    return web.Response(body=body, status=status, content_type='application/json', headers={'ETag': f'"{etag}"'})
@@ -0,0 +1,21 @@
+import asyncio
+from inspect import iscoroutine
+
+from typing import Any, Callable
+
+from .in_loop_thread import in_loop_thread
+from .typing import Loop
+
+async def run_in_loop(loop: Loop, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a function in the thread of an event loop and return its result. Coroutines returned
+    by the function are awaited, other results (e.g., tasks) are returned as they are.
+    If the loop is running in the current thread, the function is run right away.
+    Otherwise, it is handed over thread-safely and the result is awaited without blocking the current loop.
+    """
+    async def run() -> Any:
+        result = func(*args, **kwargs)
+        return (await result) if iscoroutine(result) else result
+
+    if in_loop_thread(loop): return await run()
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(run(), loop))
@@ -4,16 +4,27 @@ from aiohttp_session.cookie_storage import EncryptedCookieStorage
 
 from cryptography import fernet
 import base64
+import binascii
+
+from typing import Optional
 
 def setup_cookie_storage(
-        app: Application
+        app: Application,
+        fernet_key: Optional[bytes] = None
     ) -> None:
     """
     Setup for encrypted cookie storage.
-    Uses the fernet method (symmetric-key encryption).
+    Uses the fernet method (symmetric-key encryption). Unless a key is given (e.g., from
+    `cryptography.fernet.Fernet.generate_key`), a new key is generated, i.e., sessions
+    neither survive restarts nor can they be shared between processes.
     """
-    fernet_key = fernet.Fernet.generate_key()
-    secret_key = base64.urlsafe_b64decode(fernet_key)
+    fernet_key = fernet_key or fernet.Fernet.generate_key()
+    try:
+        secret_key = base64.urlsafe_b64decode(fernet_key)
+    except (binascii.Error, ValueError):
+        secret_key = b''
+    if len(secret_key) != 32: raise RuntimeError('Session key must be a Fernet key (32 bytes, URL-safe base64-encoded)')
+
     setup(
         app,
         EncryptedCookieStorage(secret_key)
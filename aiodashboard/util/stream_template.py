@@ -0,0 +1,78 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp_jinja2 import REQUEST_CONTEXT_KEY, get_env
+
+from typing import Any, AsyncIterator, Mapping, Optional
+
+async def stream_template(
+        template_name: str,
+        request: web.Request,
+        context: Mapping[str, Any],
+        chunk_size: int = 65536,
+        encoding: str = 'utf-8'
+    ) -> web.StreamResponse:
+    """
+    Render a template into a streamed (chunked) response, instead of rendering it into one string first.
+    The output is sent in chunks of about `chunk_size` characters, yielding to the event loop after each chunk.
+    The first chunk is rendered right away, such that errors at the beginning of the template are reported
+    like for other responses. The rest is rendered while the response is sent, later errors abort the response.
+    The response is returned unprepared, such that headers can still be added (e.g., by middlewares).
+    Templates are rendered asynchronously (`generate_async`) if the environment is in async mode.
+    """
+    env = get_env(request.app)
+    template = env.get_template(template_name)
+    if request.get(REQUEST_CONTEXT_KEY): context = dict(request[REQUEST_CONTEXT_KEY], **context)
+
+    chunks = _chunks(template.generate_async(context) if env.is_async else _aiter(template.generate(context)), chunk_size)
+    first = await anext(chunks, '')
+
+    return _TemplateStreamResponse(first, chunks, encoding)
+
+class _TemplateStreamResponse(web.StreamResponse):
+    """
+    Streamed response sending the chunks of a rendered template once it has been prepared.
+    """
+
+    def __init__(self, first: str, chunks: AsyncIterator[str], encoding: str) -> None:
+        """
+        Contructor.
+        """
+        super().__init__(headers={'Content-Type': f'text/html; charset={encoding}'})
+        self.enable_chunked_encoding()
+        self._first: str = first
+        self._chunks: Optional[AsyncIterator[str]] = chunks
+        self._encoding = encoding
+
+    async def write_eof(self, data: bytes = b'') -> None:
+        """
+        Send the chunks before finishing the response (called by the server once the response has been prepared).
+        """
+        chunks, self._chunks = self._chunks, None
+        if chunks is not None:
+            await self.write(self._first.encode(self._encoding))
+            async for chunk in chunks:
+                await asyncio.sleep(0)
+                await self.write(chunk.encode(self._encoding))
+        await super().write_eof(data)
+
+async def _aiter(parts: Any) -> AsyncIterator[str]:
+    """
+    Iterate over the parts of a template rendered synchronously.
+    """
+    for part in parts: yield part
+
+async def _chunks(parts: AsyncIterator[str], chunk_size: int) -> AsyncIterator[str]:
+    """
+    Join the parts of a rendered template into chunks of at least `chunk_size` characters (except for the last one).
+    """
+    buffer: list[str] = []
+    size = 0
+    async for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer: yield ''.join(buffer)
@@ -0,0 +1,11 @@
+from typing import Any
+
+def target_key(target: Any) -> Any:
+    """
+    Key for looking up targets. Unhashable targets are represented by their string representation.
+    """
+    try:
+        hash(target)
+        return target
+    except TypeError:
+        return repr(target)
@@ -0,0 +1,236 @@
+import asyncio
+import itertools
+import json
+from bisect import bisect_left, insort
+
+from .util import *
+
+from .worker_export import WorkerExport, WorkerMessage
+from .worker_info import WorkerInfo
+from .worker_task_info import WorkerTaskInfo
+
+from typing import Any, Optional
+
+class WorkerAggregator:
+    """
+    Merge the running tasks of multiple worker processes, which export them via Unix sockets
+    (see `WorkerExport` for the protocol). Workers are identified by the position of their socket
+    path in the list of paths. Lost connections are re-established, workers that are not connected
+    do not contribute any tasks.
+    Tasks are kept ordered by target (and worker and task ID), such that a page of tasks is a slice.
+    Starting and cancelling tasks is requested from the worker executing them.
+    """
+
+    def __init__(
+            self,
+            paths: list[str],
+            reconnect_interval: float = 1.,
+            request_timeout: float = 10.
+        ) -> None:
+        """
+        Contructor.
+        """
+        self._workers = [WorkerInfo(path) for path in paths]
+        self._reconnect_interval = reconnect_interval
+        self._request_timeout = request_timeout
+
+        self._tasks: dict[tuple[int, str], WorkerTaskInfo] = dict()
+        self._ordered: list[tuple[str, int, str]] = list()
+        self._generation = 0
+
+        self._writers: dict[int, asyncio.StreamWriter] = dict()
+        self._requests: dict[int, tuple[int, asyncio.Future]] = dict()
+        self._request_ids = itertools.count()
+        self._connections: list[asyncio.Task] = list()
+
+    async def start(self) -> None:
+        """
+        Connect to all workers (in the background, on the running event loop).
+        """
+        loop = asyncio.get_running_loop()
+        self._connections = [loop.create_task(self._connect(worker)) for worker in range(len(self._workers))]
+
+    async def close(self) -> None:
+        """
+        Disconnect from all workers.
+        """
+        for connection in self._connections: connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._connections = list()
+
+    def get_workers(self) -> list[WorkerInfo]:
+        """
+        Retrieve information about all workers (by worker ID).
+        """
+        return list(self._workers)
+
+    def get_generation(self) -> int:
+        """
+        Retrieve the generation of the merged tasks, which changes whenever tasks are added or removed.
+        """
+        return self._generation
+
+    def get_coroutines(self) -> dict[str, dict[str, Any]]:
+        """
+        Retrieve the coroutine definitions of all connected workers (by coroutine ID).
+        """
+        return {
+            coroutine_id: coroutine
+                for worker in self._workers if worker.connected for coroutine_id, coroutine in worker.coroutines.items()
+        }
+
+    def select_page(
+            self,
+            offset: int,
+            limit: int,
+            worker: Optional[int] = None,
+            coroutine_id: Optional[str] = None,
+            target: Optional[str] = None
+        ) -> tuple[int, list[WorkerTaskInfo]]:
+        """
+        Select a page of running tasks (ordered by target), optionally only tasks of a worker, executing
+        a coroutine and/or for a target (given by its string representation).
+        Return the total number of selected tasks and the tasks on the page.
+        """
+        if worker is None and coroutine_id is None and target is None:
+            return len(self._ordered), [self._tasks[(w, t)] for _, w, t in self._ordered[offset:offset + limit]]
+
+        candidates: Any = self._ordered
+        if target is not None:
+            pos = bisect_left(self._ordered, (target,))
+            candidates = itertools.takewhile(lambda entry: entry[0] == target, itertools.islice(self._ordered, pos, None))
+
+        selected = [
+            self._tasks[(w, t)] for _, w, t in candidates
+                if (worker is None or w == worker) and
+                    (coroutine_id is None or self._tasks[(w, t)].coroutine_id == coroutine_id)
+        ]
+        return len(selected), selected[offset:offset + limit]
+
+    async def start_task(self, worker: int, coroutine_id: str, target: str, params: dict[str, Any]) -> str:
+        """
+        Start a new task in a worker process. The target is given by its string representation.
+        Parameter values given as strings are converted to the parameter types. Return the new task's ID.
+        """
+        result = await self._request(worker, {
+            'type': 'start', 'coroutine_id': coroutine_id, 'target': target, 'params': params
+        })
+        return str(result['task_id'])
+
+    async def cancel_tasks(self, worker: int, task_ids: list[str]) -> list[str]:
+        """
+        Cancel running tasks in a worker process. Return the IDs of the tasks for which cancellation has been requested.
+        """
+        result = await self._request(worker, {'type': 'cancel', 'task_ids': task_ids})
+        return [str(task_id) for task_id in result['task_ids']]
+
+    async def _request(self, worker: int, request: WorkerMessage) -> Any:
+        """
+        Send a request to a worker and wait for its reply.
+        """
+        if not 0 <= worker < len(self._workers): raise RuntimeError(f'Unknown worker: {worker}')
+
+        writer = self._writers.get(worker)
+        if not writer: raise RuntimeError(f'Worker {worker} is not connected')
+
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = (worker, future)
+        try:
+            writer.write(json_dumps({**request, 'id': request_id}) + b'\n')
+            return await asyncio.wait_for(future, timeout=self._request_timeout)
+        finally:
+            self._requests.pop(request_id, None)
+
+    async def _connect(self, worker: int) -> None:
+        """
+        Keep up the connection to a worker and receive its messages.
+        """
+        info = self._workers[worker]
+
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(info.path, limit=WorkerExport.MAX_MESSAGE_SIZE)
+            except OSError:
+                await asyncio.sleep(self._reconnect_interval)
+                continue
+
+            self._writers[worker] = writer
+            info.connected = True
+            try:
+                async for line in reader: self._receive(worker, json.loads(line))
+            except (ConnectionError, ValueError):
+                pass # Disconnected or invalid message.
+            finally:
+                info.connected = False
+                del self._writers[worker]
+                writer.close()
+                self._remove_worker_tasks(worker)
+
+                # Requests to the worker will not be answered anymore.
+                for request_id, (request_worker, future) in list(self._requests.items()):
+                    if request_worker == worker and not future.done():
+                        future.set_exception(RuntimeError(f'Worker {worker} has been disconnected'))
+
+            await asyncio.sleep(self._reconnect_interval)
+
+    def _receive(self, worker: int, message: WorkerMessage) -> None:
+        """
+        Handle a message from a worker.
+        """
+        info = self._workers[worker]
+
+        if message['type'] == 'hello':
+            info.name = message['name']
+            info.pid = message['pid']
+            info.coroutines = {coroutine['coroutine_id']: coroutine for coroutine in message['coroutines']}
+
+        elif message['type'] == 'delta':
+            if message.get('reset'): self._remove_worker_tasks(worker)
+            for task_id, coroutine_id, target, params in message['started']:
+                self._add_task(worker, task_id, coroutine_id, target, params)
+            for task_id in message['finished']:
+                self._remove_task(worker, task_id)
+            self._generation += 1
+
+        elif message['type'] == 'reply':
+            _, future = self._requests.get(message['id'], (None, None))
+            if not future or future.done(): return
+            if 'error' in message:
+                future.set_exception(RuntimeError(message['error']))
+            else:
+                future.set_result(message['result'])
+
+    def _add_task(self, worker: int, task_id: str, coroutine_id: str, target: str, params: dict[str, Any]) -> None:
+        """
+        Add a running task of a worker (replacing a previously added task with the same ID).
+        """
+        self._remove_task(worker, task_id)
+
+        coroutine = self._workers[worker].coroutines.get(coroutine_id, {})
+        self._tasks[(worker, task_id)] = WorkerTaskInfo(
+            worker, task_id, coroutine_id, coroutine.get('coroutine_name', ''), coroutine.get('module', ''), target, params
+        )
+        insort(self._ordered, (target, worker, task_id))
+        self._workers[worker].n_tasks += 1
+
+    def _remove_task(self, worker: int, task_id: str) -> None:
+        """
+        Remove a finished task of a worker.
+        """
+        info = self._tasks.pop((worker, task_id), None)
+        if not info: return
+
+        del self._ordered[bisect_left(self._ordered, (info.target, worker, task_id))]
+        self._workers[worker].n_tasks -= 1
+
+    def _remove_worker_tasks(self, worker: int) -> None:
+        """
+        Remove all tasks of a worker.
+        """
+        if not self._workers[worker].n_tasks: return
+
+        self._ordered = [entry for entry in self._ordered if entry[1] != worker]
+        self._tasks = {key: info for key, info in self._tasks.items() if key[0] != worker}
+        self._workers[worker].n_tasks = 0
+        self._generation += 1
@@ -0,0 +1,198 @@
+import aiohttp.web as web
+import aiohttp_jinja2
+
+from .login import *
+from .util import *
+
+from .worker_aggregator import WorkerAggregator
+from .worker_task_info import WorkerTaskInfo
+
+from typing import Any, Optional
+
+class WorkerDashboard(LoginPages):
+    """
+    Dashboard showing the running tasks of multiple worker processes (see `WorkerAggregator`).
+    Provides an HTML page listing the merged tasks (filtered and split into pages like the index page
+    of `Dashboard`) and a JSON API for listing workers and tasks and for starting and cancelling tasks,
+    which is routed to the worker executing them.
+    """
+
+    def __init__(
+            self,
+            pwd_hash: bytes,
+            aggregator: WorkerAggregator,
+            page_size: int = 100,
+            max_login_attempts: int = 5,
+            login_attempt_interval: float = 60.
+        ) -> None:
+        """
+        Contructor.
+        """
+        super().__init__(pwd_hash, max_login_attempts, login_attempt_interval)
+        self._aggregator = aggregator
+        self._page_size = page_size
+
+    @require_login
+    @aiohttp_jinja2.template('workers.html')
+    async def index(
+            self,
+            request: web.Request
+        ) -> dict[str, Any]:
+        """
+        Main content page: workers and their running tasks.
+        The list of running tasks can be filtered by worker, coroutine and target (string representation).
+        """
+        query = request.query
+
+        filters = {
+            'worker': str(query.get('worker', '')),
+            'coroutine-id': str(query.get('coroutine-id', '')),
+            'target': str(query.get('target', '')),
+        }
+
+        page_size = max(1, int(query.get('page-size', self._page_size)))
+        page = max(1, int(query.get('page', 1)))
+        n_tasks, tasks = self._select_page((page - 1) * page_size, page_size, filters)
+
+        # Requested page is beyond the last page: show the last page.
+        n_pages = max(1, -(-n_tasks // page_size))
+        if page > n_pages:
+            page = n_pages
+            n_tasks, tasks = self._select_page((page - 1) * page_size, page_size, filters)
+
+        return {
+            'workers': self._aggregator.get_workers(),
+            'coroutines': self._aggregator.get_coroutines(),
+            'tasks': tasks,
+            'filters': filters,
+            'n_tasks': n_tasks,
+            'page': page,
+            'n_pages': n_pages,
+            'page_size': page_size,
+            'page_url': lambda p: str(request.rel_url.update_query(page=p)),
+        }
+
+    @require_login
+    async def cancel_task_apply(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Handle task cancellation (routed to the worker executing the task).
+        """
+        form = await request.post()
+        await self._aggregator.cancel_tasks(int(str(form['worker'])), [str(form['task-id'])])
+
+        # Go back to index page.
+        raise web.HTTPSeeOther(location='/')
+
+    @require_login
+    @json_api
+    async def get_workers(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        List all workers.
+        """
+        workers = [
+            {
+                'worker': worker,
+                'path': info.path,
+                'name': info.name,
+                'pid': info.pid,
+                'connected': info.connected,
+                'n_tasks': info.n_tasks,
+            }
+            for worker, info in enumerate(self._aggregator.get_workers())
+        ]
+
+        return json_response(request, {'workers': workers})
+
+    @require_login
+    @json_api
+    async def get_tasks(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        List running tasks of all workers, ordered by target. Tasks can be filtered like on the
+        HTML page (query parameters 'worker', 'coroutine-id' and 'target'), the list is split into
+        pages by 'offset' and 'limit'.
+        """
+        query = request.query
+
+        filters = {key: str(query.get(key, '')) for key in ['worker', 'coroutine-id', 'target']}
+        offset = max(0, int(query.get('offset', 0)))
+        limit = max(0, int(query.get('limit', self._page_size)))
+        n_tasks, tasks = self._select_page(offset, limit, filters)
+
+        return json_response(request, {
+            'n_tasks': n_tasks,
+            'generation': self._aggregator.get_generation(),
+            'tasks': [self._get_task_data(task) for task in tasks],
+        })
+
+    @require_login
+    @json_api
+    async def start_task(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Start a new task in a worker process.
+        The request body is a JSON object with the coroutine ID ('coroutine_id'), the target (by its
+        string representation 'target') and the parameters ('params'), see `DashboardAPI.start_task`.
+        """
+        data = await request.json()
+        if not isinstance(data, dict): raise RuntimeError('Request body must be a JSON object')
+
+        worker = int(request.match_info['worker'])
+        task_id = await self._aggregator.start_task(
+            worker, str(data['coroutine_id']), str(data['target']), data.get('params', {})
+        )
+
+        return json_response(request, {'worker': worker, 'task_id': task_id}, status=201)
+
+    @require_login
+    @json_api
+    async def cancel_task(
+            self,
+            request: web.Request
+        ) -> web.Response:
+        """
+        Cancel a running task in a worker process.
+        """
+        worker = int(request.match_info['worker'])
+        str_task_id = request.match_info['task_id']
+
+        cancelled = await self._aggregator.cancel_tasks(worker, [str_task_id])
+        if not cancelled: raise web.HTTPNotFound(text=f'No task with ID "{str_task_id}" found')
+
+        return json_response(
+            request, {'worker': worker, 'task_id': str_task_id, 'outcome': 'cancellation requested'}, status=202
+        )
+
+    def _select_page(self, offset: int, limit: int, filters: dict[str, str]) -> tuple[int, list[WorkerTaskInfo]]:
+        """
+        Select a page of running tasks of all workers (empty filter values match any task).
+        """
+        worker: Optional[int] = int(filters['worker']) if filters['worker'] else None
+        return self._aggregator.select_page(
+            offset, limit, worker=worker, coroutine_id=filters['coroutine-id'] or None, target=filters['target'] or None
+        )
+
+    @staticmethod
+    def _get_task_data(task: WorkerTaskInfo) -> dict[str, Any]:
+        """
+        Information about a running task for the JSON API.
+        """
+        return {
+            'worker': task.worker,
+            'task_id': task.task_id,
+            'coroutine_id': task.coroutine_id,
+            'coroutine_name': task.coroutine_name,
+            'module': task.module,
+            'target': task.target,
+            'params': task.params,
+        }
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+
+from .util import *
+
+from .coroutine_def import CoroutineDef
+from .task_exec import TaskExec
+from .task_exec_info import TaskExecInfo
+from .task_registry import TaskRegistry
+from .task_target_def import TaskTargetDef
+
+from typing import Any, Optional
+
+WorkerMessage = dict[str, Any]
+
+class WorkerExport:
+    """
+    Export the running tasks of a worker process via a Unix socket, such that a single dashboard can
+    show the tasks of multiple worker processes (see `WorkerAggregator`).
+    Messages are JSON objects, one per line. After connecting, the aggregator receives a greeting
+    ('hello', including the worker's coroutine definitions) and all running tasks ('delta' with 'reset').
+    Afterwards, changes are sent in batches ('delta' with the tasks started and the IDs of the tasks
+    finished since the previous batch). Like for `TaskEventStream`, updates are driven by the task registry.
+    Tasks are sent as lists (task ID, coroutine ID, target as string, parameters).
+    The aggregator may request to start ('start') and cancel ('cancel') tasks. Each request is answered
+    ('reply', with the request's 'id' and a 'result' or an 'error').
+    An aggregator that does not keep up (too much data buffered) is disconnected, it catches up
+    with a complete list of running tasks after reconnecting.
+    """
+
+    # Maximum size of a message.
+    MAX_MESSAGE_SIZE: int = 2 ** 24
+
+    def __init__(
+            self,
+            path: str,
+            process: Any = None,
+            name: Optional[str] = None,
+            batch_interval: float = 0.1,
+            batch_size: int = 1000,
+            max_buffer: int = 2 ** 24
+        ) -> None:
+        """
+        Contructor.
+        The worker's name is shown on the dashboard (by default, host name and process ID).
+        At most `batch_size` tasks are sent per message. At most `max_buffer` bytes are buffered per aggregator.
+        """
+        self._path = path
+        self._process = process
+        self._name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self._batch_interval = batch_interval
+        self._batch_size = batch_size
+        self._max_buffer = max_buffer
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._pending: dict[asyncio.Task, bool] = dict()
+        self._flush_scheduled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """
+        Start listening for aggregators on the Unix socket (on the running event loop).
+        """
+        # Remove a socket left behind by a previous run.
+        if os.path.exists(self._path) and stat.S_ISSOCK(os.stat(self._path).st_mode): os.unlink(self._path)
+
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_unix_server(self._handle, path=self._path, limit=self.MAX_MESSAGE_SIZE)
+        TaskRegistry.add_listener(self._on_registry_event)
+
+    async def close(self) -> None:
+        """
+        Stop listening and disconnect all aggregators.
+        """
+        TaskRegistry.remove_listener(self._on_registry_event)
+        for writer in list(self._clients): writer.close()
+        self._clients.clear()
+
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        """
+        Serve an aggregator: send the running tasks, then answer its requests until it disconnects.
+        Note: The running tasks are collected and the aggregator is added to the recipients of
+        changes in one go, such that no change can be missed.
+        """
+        self._clients.add(writer)
+        tasks = [self._export(exec_info) for _, exec_info in TaskExec.select().values()]
+        self._send(writer, [self._get_hello(), *self._get_deltas(tasks, [], reset=True)])
+
+        try:
+            async for line in reader:
+                request = json.loads(line)
+                try:
+                    reply = {'type': 'reply', 'id': request.get('id'), 'result': await self._apply(request)}
+                except Exception as e:
+                    reply = {'type': 'reply', 'id': request.get('id'), 'error': str(e) or repr(e)}
+                self._send(writer, [reply])
+        except (ConnectionError, ValueError):
+            pass # Disconnected or invalid request.
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _apply(self, request: WorkerMessage) -> Any:
+        """
+        Handle a request of an aggregator.
+        """
+        if request['type'] == 'start':
+            def_info = CoroutineDef.get_coroutine_def_info(str(request['coroutine_id']))
+            if not def_info: raise RuntimeError('Unknown function ID')
+
+            # Retrieve target by its string representation.
+            targets = await TaskTargetDef.get_targets_async(process=self._process)
+            matches = [t for t in targets if str(t) == str(request['target'])]
+            if not matches: raise RuntimeError(f'Unknown target: {request["target"]}')
+
+            # Retrieve parameter values (like `DashboardAPI.start_task`).
+            params = def_info.context.parameters
+            param_values = request.get('params', {})
+            unknown = [name for name in param_values if not name in params or name in ['self', 'cls']]
+            if unknown: raise RuntimeError(f'Unknown parameters: {", ".join(unknown)}')
+
+            param_apply = {
+                name: get_type_from_str(params[name], value) if isinstance(value, str) else value
+                    for name, value in param_values.items()
+            }
+            param_apply[def_info.target_param] = matches[0]
+
+            return {'task_id': task_id(TaskExec.start(def_info, param_apply, self._process))}
+
+        elif request['type'] == 'cancel':
+            cancelled = TaskExec.cancel_many(task_ids=[str(t) for t in request['task_ids']])
+            return {'task_ids': list(cancelled)}
+
+        raise RuntimeError(f'Unknown request: {request["type"]}')
+
+    def _on_registry_event(self, task: asyncio.Task, started: bool) -> None:
+        """
+        Hand over events from the task registry to the event loop of the aggregators.
+        """
+        if self._loop: call_in_loop(self._loop, self._collect, task, started)
+
+    def _collect(self, task: asyncio.Task, started: bool) -> None:
+        """
+        Collect events from the task registry until the next batch is sent (see `TaskEventStream`).
+        """
+        if not self._clients: return
+
+        if not started and self._pending.get(task):
+            # The task has been started and finished since the last batch, it is not reported at all.
+            del self._pending[task]
+        else:
+            self._pending[task] = started
+
+        if not self._flush_scheduled and self._loop:
+            self._flush_scheduled = True
+            self._loop.call_later(self._batch_interval, self._flush)
+
+    def _flush(self) -> None:
+        """
+        Send a batch of changes to all aggregators.
+        """
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, dict()
+
+        started: list[list[Any]] = []
+        finished: list[str] = []
+
+        for task, is_started in pending.items():
+            if not is_started:
+                finished.append(task_id(task))
+            elif exec_info := TaskExec.get(task):
+                started.append(self._export(exec_info))
+
+        if not started and not finished: return
+
+        messages = self._get_deltas(started, finished)
+        for writer in list(self._clients): self._send(writer, messages)
+
+    def _send(self, writer: asyncio.StreamWriter, messages: list[WorkerMessage]) -> None:
+        """
+        Send messages to an aggregator. Disconnect the aggregator in case it does not keep up.
+        """
+        if writer.is_closing(): return
+
+        writer.write(b''.join(json_dumps(message) + b'\n' for message in messages))
+
+        if writer.transport.get_write_buffer_size() > self._max_buffer:
+            self._clients.discard(writer)
+            writer.transport.abort()
+
+    def _get_deltas(self, started: list[list[Any]], finished: list[str], reset: bool = False) -> list[WorkerMessage]:
+        """
+        Split changes into messages of limited size.
+        """
+        n = self._batch_size
+        deltas: list[WorkerMessage] = [
+            {'type': 'delta', 'started': started[pos:pos + n], 'finished': finished[pos:pos + n]}
+                for pos in range(0, max(len(started), len(finished)), n)
+        ] or [{'type': 'delta', 'started': [], 'finished': []}]
+
+        if reset: deltas[0]['reset'] = True
+        return deltas
+
+    def _get_hello(self) -> WorkerMessage:
+        """
+        Greeting of an aggregator: information about the worker and its coroutine definitions.
+        """
+        coroutines = [
+            {
+                'coroutine_id': coroutine_id,
+                'coroutine_name': def_info.func_name,
+                'module': def_info.module,
+                'target_param': def_info.target_param,
+            }
+            for coroutine_id, def_info in CoroutineDef.get_coroutine_defs().items()
+        ]
+        return {'type': 'hello', 'name': self._name, 'pid': os.getpid(), 'coroutines': coroutines}
+
+    @staticmethod
+    def _export(exec_info: TaskExecInfo) -> list[Any]:
+        """
+        Running task as sent to the aggregators (task ID, coroutine ID, target as string, parameters).
+        """
+        # Get parameters of executing task. Remove 'self' from methods and 'cls' from class methods.
+        params = exec_info.params.copy()
+        if exec_info.coroutine_def.context.is_method: params.pop('self')
+        if exec_info.coroutine_def.context.is_class_method: params.pop('cls')
+
+        return [exec_info.task_id, exec_info.coroutine_id, str(exec_info.target), params]
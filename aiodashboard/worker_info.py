@@ -0,0 +1,15 @@
+from typing import Any, Optional
+from dataclasses import dataclass, field
+
+@dataclass
+class WorkerInfo:
+    """
+    Provide information about a worker process exporting its tasks (see `WorkerAggregator`).
+    Name, process ID and coroutine definitions (by coroutine ID) are reported by the worker.
+    """
+    path: str
+    name: Optional[str] = None
+    pid: Optional[int] = None
+    connected: bool = False
+    n_tasks: int = 0
+    coroutines: dict[str, dict[str, Any]] = field(default_factory=dict)
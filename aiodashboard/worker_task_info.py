@@ -0,0 +1,16 @@
+from typing import Any
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class WorkerTaskInfo:
+    """
+    Provide information about a task executing in a worker process (see `WorkerAggregator`).
+    The target is given by its string representation.
+    """
+    worker: int
+    task_id: str
+    coroutine_id: str
+    coroutine_name: str
+    module: str
+    target: str
+    params: dict[str, Any]
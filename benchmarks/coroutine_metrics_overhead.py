@@ -0,0 +1,71 @@
+"""
+Benchmark: cost of the runtime metrics per call of a decorated coroutine.
+
+Times the instrumentation added to `coroutine_def_wrapper`: recording a finished task ('observe', i.e.,
+the cost on the task's done path, without the cost of calling an empty function) and adding the recorded
+tasks to the histograms later on ('flush', per task, broken down per coroutine only or also per target).
+
+Usage (from the repository root): python -m benchmarks.coroutine_metrics_overhead [--calls 1000000]
+"""
+import argparse
+import time
+
+from aiodashboard.coroutine_def import CoroutineDef
+from aiodashboard.task_metrics import TaskMetrics
+from aiodashboard.task_outcome import TaskOutcome
+from aiodashboard.util import coroutine_id
+
+@CoroutineDef(target_param='id')
+async def short(id: str, value: int = 0) -> int:
+    return value
+
+def noop(*args) -> None:
+    pass
+
+def time_calls(func, args: tuple, n_calls: int) -> float:
+    """
+    Time calls of a function (seconds per call).
+    """
+    start = time.perf_counter()
+    for _ in range(n_calls): func(*args)
+    return (time.perf_counter() - start) / n_calls
+
+def time_metrics(observe_args: tuple, n_calls: int) -> tuple[float, float]:
+    """
+    Time recording finished tasks and adding them to the histograms (seconds per call). Like on the done path,
+    histograms are updated whenever the queue is full, but flushing the queue is timed separately.
+    """
+    chunk_size = TaskMetrics.MAX_PENDING
+    TaskMetrics.MAX_PENDING = n_calls + 1
+
+    observe = flush = 0.
+    for _ in range(n_calls // chunk_size):
+        observe += time_calls(TaskMetrics.observe, observe_args, chunk_size) * chunk_size
+        start = time.perf_counter()
+        TaskMetrics.flush()
+        flush += time.perf_counter() - start
+
+    TaskMetrics.MAX_PENDING = chunk_size
+    n_timed = n_calls // chunk_size * chunk_size
+    return observe / n_timed, flush / n_timed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=1000000, help='number of calls')
+    args = parser.parse_args()
+
+    func = short.__wrapped__
+    str_coroutine_id = coroutine_id(func.__qualname__, func.__module__)
+    observe_args = (str_coroutine_id, func, 'id', ('ABC',), {}, 0.0123, TaskOutcome.RESULT)
+
+    for mode, by_target in [('coroutine', False), ('target', True)]:
+        TaskMetrics.reset()
+        TaskMetrics.configure(by_target=by_target)
+
+        observe, flush = time_metrics(observe_args, args.calls)
+        observe -= time_calls(noop, observe_args, args.calls)
+
+        print(f'{mode:>9}: observe {observe * 1e9:.0f} ns, flush {flush * 1e9:.0f} ns per call')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Benchmark: request paths of the dashboard at scale.
+
+Runs a synthetic process with a number of targets, running decorated tasks and running undecorated tasks
+(by default, the same number for each, from 10 to 100000) and times the hot paths of the dashboard:
+- 'index_handler': collecting the data of the index page (`Dashboard.index` without rendering),
+- 'index_render': rendering the index page template with these data,
+- 'index_request': requesting the index page via HTTP (including session, login check and rendering),
+- 'start_task_apply' and 'cancel_task_apply': starting and cancelling a task via HTTP,
+- 'task_exec_get_all': retrieving info for all running tasks (`TaskExec.get_all`),
+and measures the memory allocated per running decorated task (including its execution info, sampled
+for at most 1000 tasks).
+Requests are sent to the dashboard's web application in the same process, on the tasks' event loop.
+
+Results are written as JSON (to stdout or a file): for each size, the timings in seconds (median, minimum
+and maximum over the repetitions), together with the parameters and the environment of the run, such that
+results can be compared between releases.
+
+Usage (from the repository root):
+    python -m benchmarks.dashboard_scale [--sizes 10 100 1000 10000 100000] [--targets N] [--tasks N]
+        [--undecorated N] [--repeat 5] [--output results.json]
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import aiohttp.web as web
+import aiohttp_jinja2
+import aiohttp_session
+import bcrypt
+from aiohttp.test_utils import TestClient, TestServer, make_mocked_request
+
+from aiodashboard.coroutine_def import CoroutineDef
+from aiodashboard.dashboard import Dashboard
+from aiodashboard.login import SessionStorage, check_login
+from aiodashboard.render import setup_jinja2
+from aiodashboard.render.dashboard_style import BLUE_THEME
+from aiodashboard.task_exec import TaskExec
+from aiodashboard.task_target_def import TaskTargetDef
+from aiodashboard.util import compress_responses, coroutine_id, error_handler, task_id
+
+from typing import Any, Awaitable, Callable
+
+PASSWORD = 'benchmark'
+
+# Maximum number of tasks the memory per task is measured for (tracing allocations is slow).
+MEMORY_SAMPLE = 1000
+
+class SyntheticProcess:
+    """
+    Process with a given number of targets, whose tasks wait for an hour.
+    Targets are named such that their sorted order is the order of creation.
+    """
+
+    def __init__(self, n_targets: int) -> None:
+        self.target_list = [f'target-{pos:07d}' for pos in range(n_targets)]
+
+    @TaskTargetDef()
+    def targets(self) -> list:
+        return self.target_list
+
+    @CoroutineDef(target_param='id')
+    async def work(self, id: str, sleep: float = 3600.) -> None:
+        await asyncio.sleep(sleep)
+
+async def undecorated(sleep: float = 3600.) -> None:
+    await asyncio.sleep(sleep)
+
+async def time_async(func: Callable[[], Awaitable[Any]], repeat: int) -> dict[str, float]:
+    """
+    Time calls of a coroutine function (median, minimum and maximum in seconds).
+    The function is called once more beforehand (not timed), such that caches are warmed up.
+    """
+    await func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        times.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'max_s': max(times)}
+
+def create_app(dashboard: Dashboard) -> web.Application:
+    """
+    Web application of the dashboard (like `start_dashboard`), for the benchmarked request paths.
+    """
+    app = web.Application()
+    app.router.add_get('/', dashboard.index)
+    app.router.add_post('/cancel-task', dashboard.cancel_task_apply)
+    app.router.add_post('/start-task', dashboard.start_task_apply)
+    app.router.add_post('/login', dashboard.login_apply)
+
+    aiohttp_session.setup(app, SessionStorage())
+    setup_jinja2(app, 'Benchmark', BLUE_THEME)
+    app.middlewares.append(compress_responses())
+    app.middlewares.append(error_handler)
+    app.middlewares.append(check_login)
+    return app
+
+async def run(n_targets: int, n_tasks: int, n_undecorated: int, repeat: int) -> dict[str, Any]:
+    """
+    Start the synthetic process' tasks and time the request paths of the dashboard.
+    """
+    loop = asyncio.get_running_loop()
+    process = SyntheticProcess(n_targets)
+    targets = process.target_list
+
+    # Measure the memory allocated per decorated task (until its execution info is available) for a sample of tasks.
+    n_sample = min(n_tasks, MEMORY_SAMPLE)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = [loop.create_task(process.work(id=targets[pos % n_targets])) for pos in range(n_sample)]
+    await asyncio.sleep(0)
+    TaskExec.get_all()
+    allocated = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, 'filename'))
+    tracemalloc.stop()
+
+    for task in tasks: task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Start all tasks (until their execution infos are available).
+    start = time.perf_counter()
+    tasks = [loop.create_task(process.work(id=targets[pos % n_targets])) for pos in range(n_tasks)]
+    other_tasks = [loop.create_task(undecorated()) for _ in range(n_undecorated)]
+    await asyncio.sleep(0)
+    TaskExec.get_all()
+    setup_duration = time.perf_counter() - start
+
+    dashboard = Dashboard(pwd_hash=bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)), process=process)
+    app = create_app(dashboard)
+    str_coroutine_id = coroutine_id(SyntheticProcess.work.__qualname__, __name__)
+    timings: dict[str, dict[str, float]] = {}
+
+    try:
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post('/login', data={'password': PASSWORD}, allow_redirects=False)
+            if response.status != 303: raise RuntimeError(f'Login failed (status {response.status})')
+
+            request = make_mocked_request('GET', '/', app=app)
+            index = inspect.unwrap(Dashboard.index)
+            context = await index(dashboard, request)
+
+            async def get_index() -> None:
+                response = await client.get('/')
+                await response.read()
+                if response.status != 200: raise RuntimeError(f'Index page failed (status {response.status})')
+
+            async def render_index() -> None:
+                aiohttp_jinja2.render_string('index.html', request, context)
+
+            async def get_all() -> None:
+                TaskExec.get_all()
+
+            async def post(path: str, form: dict[str, str]) -> None:
+                response = await client.post(path, data=form, allow_redirects=False)
+                if response.status != 303: raise RuntimeError(f'{path} failed: {await response.text()}')
+
+            timings['index_handler'] = await time_async(lambda: index(dashboard, request), repeat)
+            timings['index_render'] = await time_async(render_index, repeat)
+            timings['index_request'] = await time_async(get_index, repeat)
+            timings['task_exec_get_all'] = await time_async(get_all, repeat)
+
+            timings['start_task_apply'] = await time_async(lambda: post('/start-task', {
+                'coroutine-id': str_coroutine_id, 'target-param': 'id', 'target-pos': '0', 'sleep': '3600'
+            }), repeat)
+
+            # Each call cancels another one of the running tasks.
+            cancelled = iter(range(n_tasks))
+            timings['cancel_task_apply'] = await time_async(lambda: post('/cancel-task', {
+                'task-id': task_id(tasks[(pos := next(cancelled))]), 'coroutine-id': str_coroutine_id,
+                'target-pos': str(pos % n_targets)
+            }), min(repeat, n_tasks - 1))
+    finally:
+        await dashboard.close()
+        all_tasks = tasks + other_tasks + [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in all_tasks: task.cancel()
+        await asyncio.gather(*all_tasks, return_exceptions=True)
+
+    return {
+        'n_targets': n_targets,
+        'n_tasks': n_tasks,
+        'n_undecorated': n_undecorated,
+        'setup_s': setup_duration,
+        'memory_per_task_bytes': allocated / max(1, n_sample),
+        'timings': timings,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000],
+        help='numbers of targets, decorated and undecorated tasks (unless given separately)'
+    )
+    parser.add_argument('--targets', type=int, help='fixed number of targets')
+    parser.add_argument('--tasks', type=int, help='fixed number of running decorated tasks')
+    parser.add_argument('--undecorated', type=int, help='fixed number of running undecorated tasks')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions per measurement')
+    parser.add_argument('--output', help='file to write the results to (default: stdout)')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        n_targets = args.targets if args.targets is not None else size
+        n_tasks = args.tasks if args.tasks is not None else size
+        n_undecorated = args.undecorated if args.undecorated is not None else size
+        print(f'targets {n_targets}, tasks {n_tasks}, undecorated {n_undecorated} ...', file=sys.stderr)
+
+        results.append(asyncio.run(run(max(1, n_targets), max(2, n_tasks), n_undecorated, args.repeat)))
+
+    report = {
+        'benchmark': 'dashboard_scale',
+        'started': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file: file.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
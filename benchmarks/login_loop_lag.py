@@ -0,0 +1,71 @@
+"""
+Benchmark: event loop lag during concurrent login attempts.
+
+Runs a ticker on the event loop that measures how late it is woken up, while a number of concurrent
+login attempts check passwords either directly on the event loop ('blocking', as before) or in the
+bounded thread pool of `PasswordHash` ('executor').
+
+Usage (from the repository root): python -m benchmarks.login_loop_lag [--logins 20] [--rounds 12]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import bcrypt
+
+from aiodashboard.login import PasswordHash
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.005) -> list[float]:
+    """
+    Measure by how much the event loop overshoots a short sleep, until stopped.
+    """
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+async def run(mode: str, pwd_hash: PasswordHash, n_logins: int) -> dict[str, float]:
+    """
+    Run concurrent login attempts and report the loop lag.
+    """
+    async def login() -> bool:
+        if mode == 'blocking': return pwd_hash.check('wrong password')
+        return await pwd_hash.check_async('wrong password')
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(n_logins)))
+    duration = time.perf_counter() - start
+
+    stop.set()
+    lags = await ticker
+
+    return {
+        'duration_s': duration,
+        'lag_max_ms': max(lags) * 1e3,
+        'lag_mean_ms': statistics.mean(lags) * 1e3,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=20, help='number of concurrent login attempts')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor')
+    args = parser.parse_args()
+
+    pwd_hash = PasswordHash(bcrypt.hashpw(b'secret', bcrypt.gensalt(args.rounds)))
+
+    for mode in ['blocking', 'executor']:
+        result = asyncio.run(run(mode, pwd_hash, args.logins))
+        print(
+            f'{mode:>8}: {args.logins} logins in {result["duration_s"]:.2f} s, '
+            f'loop lag max {result["lag_max_ms"]:.1f} ms, mean {result["lag_mean_ms"]:.1f} ms'
+        )
+
+if __name__ == '__main__':
+    main()
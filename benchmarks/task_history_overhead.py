@@ -0,0 +1,46 @@
+"""
+Benchmark: overhead of the task history on short-lived tasks.
+
+Runs many short tasks executing a decorated coroutine, with the task history disabled ('off') and
+enabled ('on'), and reports the time per task. Records are created in batches (see `TaskHistory`),
+the cost of creating them is reported separately ('flush').
+
+Usage (from the repository root): python -m benchmarks.task_history_overhead [--tasks 100000]
+"""
+import argparse
+import asyncio
+import time
+
+from aiodashboard.coroutine_def import CoroutineDef
+from aiodashboard.task_history import TaskHistory
+
+@CoroutineDef(target_param='id')
+async def short(id: str, value: int = 0) -> int:
+    return value
+
+async def run(n_tasks: int) -> float:
+    """
+    Run short tasks one after the other and report the time per task.
+    """
+    start = time.perf_counter()
+    for i in range(n_tasks): await asyncio.create_task(short('ABC', i))
+    return (time.perf_counter() - start) / n_tasks
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000, help='number of tasks')
+    args = parser.parse_args()
+
+    for mode, max_records in [('off', 0), ('on', args.tasks + 1)]:
+        # Records are only created when flushing, such that the done path is measured on its own.
+        TaskHistory.configure(max_records=max_records, flush_interval=3600.)
+        TaskHistory.MAX_PENDING = args.tasks + 1
+        duration = asyncio.run(run(args.tasks))
+        print(f'{mode:>5}: {duration * 1e6:.2f} us per task')
+
+    start = time.perf_counter()
+    TaskHistory.flush()
+    print(f'flush: {(time.perf_counter() - start) / args.tasks * 1e6:.2f} us per record')
+
+if __name__ == '__main__':
+    main()
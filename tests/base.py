@@ -1,7 +1,7 @@
 import pytest
 import pytest_asyncio
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 
 def mock_aiohttp_jinja2_template(*args, **kwargs):
@@ -11,20 +11,53 @@ def mock_aiohttp_jinja2_template(*args, **kwargs):
 patch("aiohttp_jinja2.template", mock_aiohttp_jinja2_template).start()
 
 import asyncio
+import aiohttp_jinja2
+import bcrypt
+import threading
 import importlib
+import json
+import math
+import os
+import subprocess
+import sys
+import time
 
 from aiodashboard.coroutine_def import CoroutineDef
 from aiodashboard.task_target_def import TaskTargetDef
 from aiodashboard.task_exec import TaskExec
+from aiodashboard.task_registry import TaskRegistry
+from aiodashboard.task_await_node import TaskAwaitNode
+from aiodashboard.task_history import TaskHistory
+from aiodashboard.task_metrics import TaskMetrics
+from aiodashboard.task_outcome import TaskOutcome
 from aiodashboard.dashboard import Dashboard
-from aiodashboard.util import task_id, coroutine_id
+from aiodashboard.dashboard_api import DashboardAPI
+from aiodashboard.dashboard_metrics import DashboardMetrics
+from aiodashboard.latency_histogram import LatencyHistogram
+from aiodashboard.task_event_stream import TaskEventStream
+from aiodashboard.render import setup_jinja2
+from aiodashboard.render.dashboard_style import BLUE_THEME
+from aiodashboard.util import task_id, coroutine_id, error_handler
+from aiodashboard.login import LoginStatus
 
 from typing import Any
+from inspect import Parameter
 from types import ModuleType
 from collections.abc import Generator
 
 from contextlib import nullcontext as does_not_raise
-from aiohttp.web import HTTPSeeOther
+from aiohttp.web import Application, HTTPSeeOther, HTTPServiceUnavailable
+from aiohttp.test_utils import TestClient, TestServer
+from multidict import MultiDict
+from yarl import URL
+
+class DummyIndexRequest:
+    def __init__(self, query: dict[str, Any] = {}):
+        self.rel_url = URL("/").with_query({k: str(v) for k, v in query.items()})
+        self.query = self.rel_url.query
+        self.query_string = self.rel_url.query_string
+        self.if_none_match = None
+
 
 class Base:
 
@@ -78,6 +111,28 @@ class Base:
         ids = CoroutineDef.get_coroutine_ids()
         assert len(ids) == 1
 
+    def test_coroutine_id_stable(self) -> None:
+        # Coroutine IDs do not depend on the (randomized) string hashing of a process.
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+        code = f"from aiodashboard.util import coroutine_id; print(coroutine_id({self.COROUTINE_NAME!r}, {self.SETUP_MODULE!r}))"
+        output = subprocess.run(
+            [sys.executable, "-c", code], env={**os.environ, "PYTHONHASHSEED": "1"}, capture_output=True, text=True, check=True
+        ).stdout
+        assert output.strip() == str_coroutine_id
+
+    def test_coroutine_id_collision(self) -> None:
+        str_coroutine_id = CoroutineDef.get_coroutine_ids()[0]
+
+        async def other(id: str) -> None:
+            pass
+
+        with patch("aiodashboard.coroutine_def.str_coroutine_id", return_value=str_coroutine_id):
+            with pytest.raises(RuntimeError, match="collides with"):
+                CoroutineDef(target_param="id")(other)
+
+        assert CoroutineDef.get_coroutine_ids() == [str_coroutine_id]
+        assert CoroutineDef.get_coroutine_def_info(str_coroutine_id).func_name.endswith(self.COROUTINE_NAME)
+
     @pytest.mark.asyncio(loop_scope="module")
     async def test_coroutine_defs(self) -> None:
         defs = CoroutineDef.get_coroutine_defs()
@@ -155,6 +210,42 @@ class Base:
             assert k in params
             assert params[k] == v
 
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_registry(self, task: asyncio.Task, current_loop: asyncio.AbstractEventLoop) -> None:
+        # Tasks not executing a decorated coroutine are not registered.
+        other_task = current_loop.create_task(asyncio.sleep(10))
+        await asyncio.sleep(0.1)
+
+        assert task in TaskRegistry.get_tasks()
+        assert other_task not in TaskRegistry.get_tasks()
+        assert TaskRegistry.get(other_task) is None
+
+        # Tasks are removed from the registry once they are finished.
+        with pytest.raises(asyncio.CancelledError):
+            task.cancel()
+            await task
+
+        assert TaskRegistry.get(task) is None
+        other_task.cancel()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_exec_negative_cache(self, current_loop: asyncio.AbstractEventLoop) -> None:
+        other_task = current_loop.create_task(asyncio.sleep(10))
+        await asyncio.sleep(0.1)
+
+        n_avoided = TaskExec.get_stack_walks_avoided()
+
+        # The first lookup inspects the task's stack, subsequent lookups hit the negative cache.
+        assert TaskExec.get(other_task) is None
+        assert TaskExec.get_stack_walks_avoided() == n_avoided
+        assert TaskExec.get(other_task) is None
+        assert TaskExec.get(other_task) is None
+        assert TaskExec.get_stack_walks_avoided() == n_avoided + 2
+
+        with pytest.raises(asyncio.CancelledError):
+            other_task.cancel()
+            await other_task
+
     @pytest.mark.asyncio(loop_scope="module")
     async def test_task_exec_get_by_id(
         self, target: Any, task: asyncio.Task, task_params: dict[str, Any]
@@ -218,6 +309,20 @@ class Base:
             assert k in params
             assert params[k] == v
 
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_exec_index_eviction(self, task: asyncio.Task) -> None:
+        str_task_id = task_id(task=task)
+        assert TaskExec.get(task)
+        assert TaskExec.get_by_id(task_id=str_task_id, from_cache=True)
+
+        with pytest.raises(asyncio.CancelledError):
+            task.cancel()
+            await task
+
+        # Finished tasks are removed from the index.
+        with pytest.raises(RuntimeError):
+            TaskExec.get_by_id(task_id=str_task_id, from_cache=True)
+
     @pytest.mark.asyncio(loop_scope="module")
     async def test_task_exec_cancel(self, target: Any, task: asyncio.Task) -> None:
         str_task_id = task_id(task=task)
@@ -238,7 +343,7 @@ class Base:
     ) -> None:
         dashboard = Dashboard(pwd_hash=None, process=process)
 
-        response = await dashboard.index(None)
+        response = await dashboard.index(DummyIndexRequest())
 
         coroutine_defs = response["coroutine_defs"]
         assert 1 == len(coroutine_defs)
@@ -269,13 +374,65 @@ class Base:
         assert task_targets == self.ALL_TARGETS
         assert task_targets[tdi_target_pos] == tdi_target
 
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_index_streamed(
+        self, task: asyncio.Task, process: Any, current_loop: asyncio.AbstractEventLoop, task_params: dict[str, Any]
+    ) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process, stream_chunk_size=256)
+
+        app = Application(middlewares=[error_handler])
+        app.router.add_get("/", dashboard.index)
+        setup_jinja2(app, "test", BLUE_THEME)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/")
+            assert response.status == 200
+            assert response.headers["Transfer-Encoding"] == "chunked"
+            assert response.headers["Content-Type"] == "text/html; charset=utf-8"
+
+            chunks = [chunk async for chunk, _ in response.content.iter_chunks()]
+            assert len(chunks) > 1
+            html = b"".join(chunks).decode()
+            assert f'id="task-{task_id(task)}"' in html
+            assert html.rstrip().endswith("</html>")
+
+            # Errors before anything has been sent are reported as usual.
+            response = await client.get("/", params={"param": "invalid"})
+            assert response.status == 400
+
+            # Unchanged pages are not rendered again.
+            etag = (await client.get("/")).headers["ETag"]
+            with patch.object(Dashboard, "_get_task_display_info") as get_task_display_info:
+                response = await client.get("/", headers={"If-None-Match": etag})
+                assert response.status == 304
+                assert response.headers["ETag"] == etag
+                get_task_display_info.assert_not_called()
+
+            # The page changes with the running tasks and the query.
+            response = await client.get("/", headers={"If-None-Match": etag}, params={"page": 2})
+            assert response.status == 200
+            coroutine_def = CoroutineDef.get_coroutine_def_info(coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE))
+            args = (process,) if coroutine_def.context.is_method else ()
+            other_task = current_loop.create_task(coroutine_def.func(*args, **task_params))
+            await asyncio.sleep(0.01)
+            try:
+                response = await client.get("/", headers={"If-None-Match": etag})
+                assert response.status == 200
+                assert response.headers["ETag"] != etag
+            finally:
+                with pytest.raises(asyncio.CancelledError):
+                    other_task.cancel()
+                    await other_task
+
+        await dashboard.close()
+
     @pytest.mark.asyncio(loop_scope="module")
     async def test_dashboard_cancel_task(
         self, task: asyncio.Task, process: Any, target_pos: int
     ) -> None:
         dashboard = Dashboard(pwd_hash=None, process=process)
 
-        response = await dashboard.index(None)
+        response = await dashboard.index(DummyIndexRequest())
         coroutine_defs = response["coroutine_defs"]
         cd_coroutine_id = list(coroutine_defs.keys())[0]
         cd_coroutine_def = list(coroutine_defs.values())[0]
@@ -295,13 +452,47 @@ class Base:
         assert response["task_id"] == task_id(task)
         assert response["coroutine_id"] == cd_coroutine_id
 
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_task_stack(self, task: asyncio.Task, process: Any, target: Any) -> None:
+        await asyncio.sleep(0.01)
+        dashboard = Dashboard(pwd_hash=None, process=process)
+
+        response = await dashboard.task_stack(DummyIndexRequest({"task-id": task_id(task)}))
+        assert response["target"] == target
+        assert response["func_name"] == self.COROUTINE_NAME
+        chain = response["chain"]
+        coroutine_node = next(n for n in chain if n.name.endswith(self.COROUTINE_NAME))
+        assert coroutine_node.kind == TaskAwaitNode.COROUTINE
+        assert coroutine_node.file == sys.modules[self.SETUP_MODULE].__file__
+        assert chain[-1].kind == TaskAwaitNode.FUTURE
+
+        with pytest.raises(RuntimeError, match="No task"):
+            await dashboard.task_stack(DummyIndexRequest({"task-id": "unknown"}))
+
+        app = Application(middlewares=[error_handler])
+        app.router.add_get("/api/tasks/{task_id}/await-chain", DashboardAPI(dashboard).get_await_chain)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get(f"/api/tasks/{task_id(task)}/await-chain")
+            assert response.status == 200
+            data = await response.json()
+            assert [n["name"] for n in data["chain"]] == [n.name for n in chain]
+            assert data["chain"][-1]["children"] == []
+
+            # The chain is limited to the given depth.
+            response = await client.get(f"/api/tasks/{task_id(task)}/await-chain", params={"depth": 1})
+            assert [n["kind"] for n in (await response.json())["chain"]] == ["coroutine", "truncated"]
+
+            response = await client.get("/api/tasks/unknown/await-chain")
+            assert response.status == 404
+
     @pytest.mark.asyncio(loop_scope="module")
     async def test_dashboard_cancel_task_apply(
         self, task: asyncio.Task, process: Any, target_pos: int
     ) -> None:
         dashboard = Dashboard(pwd_hash=None, process=process)
 
-        response = await dashboard.index(None)
+        response = await dashboard.index(DummyIndexRequest())
         coroutine_defs = response["coroutine_defs"]
         cd_coroutine_id = list(coroutine_defs.keys())[0]
 
@@ -321,13 +512,65 @@ class Base:
 
         assert task.cancelled()
 
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_cancel_tasks_apply(
+        self, task: asyncio.Task, process: Any, target_pos: int
+    ) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process)
+
+        response = await dashboard.index(DummyIndexRequest())
+        coroutine_defs = response["coroutine_defs"]
+        cd_coroutine_id = list(coroutine_defs.keys())[0]
+
+        class DummyCancelTasksApplyRequest:
+            async def post(self):
+                return MultiDict([
+                    ("task-id", task_id(task)),
+                    ("task-id", "unknown"),
+                    ("coroutine-id", cd_coroutine_id),
+                    ("target-pos", target_pos),
+                    ("timeout", 1),
+                ])
+
+        response = await dashboard.cancel_tasks_apply(DummyCancelTasksApplyRequest())
+        cancel_info = response["cancel_info"]
+        assert len(cancel_info) == 2
+        assert cancel_info[0] == (
+            self.ALL_TARGETS[target_pos], self.COROUTINE_NAME, self.SETUP_MODULE, task_id(task), "cancelled"
+        )
+        assert cancel_info[1] == (None, None, None, "unknown", "not found")
+        assert task.cancelled()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_cancel_tasks_apply_redirect(self, task: asyncio.Task, process: Any) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process)
+        await dashboard.index(DummyIndexRequest())
+
+        class DummyCancelTasksApplyRequest:
+            def __init__(self, form: list[tuple[str, Any]]):
+                self.form = form
+
+            async def post(self):
+                return MultiDict(self.form)
+
+        # Nothing selected.
+        with pytest.raises(RuntimeError, match="No tasks selected"):
+            await dashboard.cancel_tasks_apply(DummyCancelTasksApplyRequest([("coroutine-id", ""), ("target-pos", "")]))
+
+        # Without waiting, the client is redirected to the index page.
+        with pytest.raises(HTTPSeeOther, match="See Other"):
+            await dashboard.cancel_tasks_apply(DummyCancelTasksApplyRequest([("coroutine-id", "*")]))
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
     @pytest.mark.asyncio(loop_scope="module")
     async def test_dashboard_start_task(
         self, task: asyncio.Task, process: Any, target_pos: int, task_target_param: str
     ) -> None:
         dashboard = Dashboard(pwd_hash=None, process=process)
 
-        response = await dashboard.index(None)
+        response = await dashboard.index(DummyIndexRequest())
         coroutine_defs = response["coroutine_defs"]
         cd_coroutine_id = list(coroutine_defs.keys())[0]
 
@@ -346,6 +589,9 @@ class Base:
 
         assert len(params) == len(coroutine_params)
 
+        # Regression: 'self' / 'cls' are removed by name, not by position (parameters such as 'msg' sort before 'self').
+        assert {param.name for param in params} == set(coroutine_params)
+
         for param in params:
             if param.name in ["self", "cls"]:
                 continue
@@ -358,7 +604,7 @@ class Base:
     ) -> None:
         dashboard = Dashboard(pwd_hash=None, process=process)
 
-        response = await dashboard.index(None)
+        response = await dashboard.index(DummyIndexRequest())
         coroutine_defs = response["coroutine_defs"]
         cd_coroutine_id = list(coroutine_defs.keys())[0]
 
@@ -378,3 +624,671 @@ class Base:
             await dashboard.start_task_apply(DummyStartTaskApplyRequest())
 
         assert len(TaskExec.get_all()) == n_tasks + 1
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_start_tasks_apply(
+        self, process: Any, task_target_param: str
+    ) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process)
+
+        response = await dashboard.index(DummyIndexRequest())
+        coroutine_defs = response["coroutine_defs"]
+        cd_coroutine_id = list(coroutine_defs.keys())[0]
+
+        class DummyStartTasksApplyRequest:
+            def __init__(self, selection: list[tuple[str, Any]]):
+                self.selection = selection
+
+            async def post(self):
+                return MultiDict([
+                    ("coroutine-id", cd_coroutine_id),
+                    ("msg", "TEST"),
+                    ("sleep", 100),
+                    ("batch-size", 1),
+                    ("batch-interval", 0),
+                    *self.selection
+                ])
+
+        task_ids = {info.task_id for info in TaskExec.get_all()}
+
+        # Start tasks for all targets, one batch after the other.
+        with pytest.raises(HTTPSeeOther, match="See Other"):
+            await dashboard.start_tasks_apply(DummyStartTasksApplyRequest([("target-selection", "all")]))
+
+        await asyncio.sleep(0.1)
+        new_infos = [info for info in TaskExec.get_all() if info.task_id not in task_ids]
+        assert sorted(info.target for info in new_infos) == self.ALL_TARGETS
+        assert all(info.params["msg"] == "TEST" for info in new_infos)
+
+        # Start tasks for a list of targets.
+        with pytest.raises(HTTPSeeOther, match="See Other"):
+            await dashboard.start_tasks_apply(DummyStartTasksApplyRequest(
+                [("target-selection", "list"), ("target-pos", 0), ("target-pos", len(self.ALL_TARGETS) - 1)]
+            ))
+
+        await asyncio.sleep(0.1)
+        task_ids.update(info.task_id for info in new_infos)
+        new_infos = [info for info in TaskExec.get_all() if info.task_id not in task_ids]
+        assert sorted(info.target for info in new_infos) == [self.ALL_TARGETS[0], self.ALL_TARGETS[-1]]
+
+        # Start tasks for targets matching a pattern.
+        with pytest.raises(HTTPSeeOther, match="See Other"):
+            await dashboard.start_tasks_apply(DummyStartTasksApplyRequest(
+                [("target-selection", "pattern"), ("target-pattern", f"{self.ALL_TARGETS[1]}*")]
+            ))
+
+        await asyncio.sleep(0.1)
+        task_ids.update(info.task_id for info in new_infos)
+        new_infos = [info for info in TaskExec.get_all() if info.task_id not in task_ids]
+        assert [info.target for info in new_infos] == [self.ALL_TARGETS[1]]
+
+        TaskExec.cancel_many(coroutine_id=cd_coroutine_id)
+        await asyncio.sleep(0.1)
+
+        # Start tasks for all targets, with at most one of them running at a time.
+        with pytest.raises(HTTPSeeOther, match="See Other"):
+            await dashboard.start_tasks_apply(DummyStartTasksApplyRequest(
+                [("target-selection", "all"), ("max-concurrency", 1)]
+            ))
+
+        started = []
+        for _ in self.ALL_TARGETS:
+            await asyncio.sleep(0.1)
+            running = TaskExec.select(coroutine_id=cd_coroutine_id)
+            assert len(running) == 1
+            started.extend(info.target for _, info in running.values())
+            TaskExec.cancel_many(coroutine_id=cd_coroutine_id)
+
+        assert sorted(started) == self.ALL_TARGETS
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_index_filter(
+        self, process: Any, current_loop: asyncio.AbstractEventLoop, task_params: dict[str, Any]
+    ) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process, max_target_options=1)
+
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+        coroutine_def = CoroutineDef.get_coroutine_def_info(str_coroutine_id)
+        args = (process,) if coroutine_def.context.is_method else ()
+
+        tasks = [
+            current_loop.create_task(coroutine_def.func(*args, **{**task_params, "msg": f"MSG{n}"}))
+            for n in range(3)
+        ]
+        await asyncio.sleep(0.01)
+
+        try:
+            response = await dashboard.index(DummyIndexRequest())
+            assert response["n_tasks"] == 3
+            assert response["n_pages"] == 1
+            assert response["modules"] == [self.SETUP_MODULE]
+
+            # Filter by coroutine, module and parameter value.
+            response = await dashboard.index(DummyIndexRequest({"coroutine-id": str_coroutine_id}))
+            assert response["n_tasks"] == 3
+            response = await dashboard.index(DummyIndexRequest({"module": "unknown"}))
+            assert response["n_tasks"] == 0
+            response = await dashboard.index(DummyIndexRequest({"param": "msg=MSG1"}))
+            assert [info[4] for info in response["task_display_info"]] == [task_id(tasks[1])]
+
+            # Filter by target.
+            response = await dashboard.index(DummyIndexRequest({"target-pos": 0}))
+            assert response["n_tasks"] == 3
+            response = await dashboard.index(DummyIndexRequest({"target-pos": len(self.ALL_TARGETS) - 1}))
+            assert response["n_tasks"] == 0
+
+            # Split into pages.
+            response = await dashboard.index(DummyIndexRequest({"page-size": 2, "page": 2}))
+            assert response["n_pages"] == 2
+            assert response["page"] == 2
+            assert len(response["task_display_info"]) == 1
+            assert "page=1" in response["page_url"](1)
+
+            # Pages are slices of the list of tasks ordered by target.
+            paged = []
+            for page in range(1, 4):
+                response = await dashboard.index(DummyIndexRequest({"page-size": 1, "page": page}))
+                paged.extend(info[4] for info in response["task_display_info"])
+            assert sorted(paged) == sorted(map(task_id, tasks))
+            assert paged == [info[4] for info in dashboard._get_task_display_info(TaskExec.get_all())]
+
+            # Search targets.
+            response = await dashboard.index(DummyIndexRequest())
+            assert response["target_options"] == [(0, self.ALL_TARGETS[0])]
+            response = await dashboard.index(DummyIndexRequest({"target-search": str(self.ALL_TARGETS[-1]).upper()}))
+            assert response["target_options"] == [(len(self.ALL_TARGETS) - 1, self.ALL_TARGETS[-1])]
+        finally:
+            for task in tasks: task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_dedicated_thread(
+        self, process: Any, current_loop: asyncio.AbstractEventLoop
+    ) -> None:
+        dashboard_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=dashboard_loop.run_forever, daemon=True)
+        thread.start()
+        TaskExec.set_loop(current_loop)
+
+        async def in_dashboard_thread(coro) -> Any:
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, dashboard_loop))
+
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+
+        class DummyPostRequest:
+            def __init__(self, form: list[tuple[str, Any]]):
+                self.form = form
+
+            async def post(self):
+                return MultiDict(self.form)
+
+        try:
+            dashboard = Dashboard(pwd_hash=None, process=process, loop=current_loop)
+            await in_dashboard_thread(dashboard.index(DummyIndexRequest()))
+
+            # Tasks are started on the application loop, although requested from the dashboard's thread.
+            with pytest.raises(HTTPSeeOther, match="See Other"):
+                await in_dashboard_thread(dashboard.start_tasks_apply(DummyPostRequest([
+                    ("coroutine-id", str_coroutine_id), ("msg", "TEST"), ("sleep", 100), ("target-selection", "all")
+                ])))
+
+            selected = TaskExec.select(coroutine_id=str_coroutine_id)
+            assert len(selected) == len(self.ALL_TARGETS)
+            assert all(task.get_loop() is current_loop for task, _ in selected.values())
+
+            response = await in_dashboard_thread(dashboard.index(DummyIndexRequest()))
+            assert response["n_tasks"] == len(self.ALL_TARGETS)
+
+            # Tasks are cancelled on the application loop, the dashboard's thread waits for the outcome.
+            response = await in_dashboard_thread(dashboard.cancel_tasks_apply(DummyPostRequest([
+                ("coroutine-id", str_coroutine_id), ("timeout", 1)
+            ])))
+            assert [info[4] for info in response["cancel_info"]] == ["cancelled"] * len(self.ALL_TARGETS)
+            assert not TaskExec.select(coroutine_id=str_coroutine_id)
+        finally:
+            TaskExec.set_loop(None)
+            dashboard_loop.call_soon_threadsafe(dashboard_loop.stop)
+            thread.join()
+            dashboard_loop.close()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_target_index(self, process: Any, all_targets: list[Any]) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process, target_ttl=math.inf)
+
+        response = await dashboard.index(DummyIndexRequest())
+        version = response["target_version"]
+        assert response["task_targets"] == all_targets
+        assert dashboard._get_target_pos(all_targets[-1]) == len(all_targets) - 1
+
+        changed_targets = list(reversed(all_targets[1:]))
+        with patch.object(TaskTargetDef, "get_targets", return_value=changed_targets) as get_targets:
+            # The list of targets is only retrieved again once a change has been reported.
+            await dashboard.index(DummyIndexRequest())
+            get_targets.assert_not_called()
+
+            TaskTargetDef.notify_changed()
+            response = await dashboard.index(DummyIndexRequest())
+            get_targets.assert_called_once()
+            assert response["task_targets"] == all_targets[1:]
+            assert response["target_version"] == version + 1
+
+            # An unchanged list of targets does not create a new version.
+            TaskTargetDef.notify_changed()
+            response = await dashboard.index(DummyIndexRequest())
+            assert response["target_version"] == version + 1
+
+        # Positions referring to the previous version are resolved to the same target.
+        response = await dashboard.index(DummyIndexRequest({"target-pos": 1, "target-version": version}))
+        assert response["filters"]["target-pos"] == "0"
+        assert dashboard._get_target("1", str(version)) == all_targets[1]
+        assert dashboard._get_target("0") == all_targets[1]
+
+        with pytest.raises(RuntimeError, match="not available anymore"):
+            dashboard._get_target("0", str(version))
+        with pytest.raises(RuntimeError, match="Invalid target position"):
+            dashboard._get_target(str(len(all_targets)))
+        with pytest.raises(RuntimeError, match="reload the page"):
+            dashboard._get_target("0", str(version + 2))
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_login_rate_limit(self, process: Any) -> None:
+        dashboard = Dashboard(
+            pwd_hash=bcrypt.hashpw(b"secret", bcrypt.gensalt(4)), process=process, max_login_attempts=2
+        )
+        assert await dashboard._pwd_hash.check_async("secret")
+        assert not await dashboard._pwd_hash.check_async("wrong")
+
+        class DummyLoginRequest:
+            remote = "127.0.0.1"
+
+            def __init__(self, password: str):
+                self.password = password
+
+            async def post(self):
+                return {"password": self.password}
+
+        session: dict[str, Any] = {}
+
+        with patch("aiohttp_session.get_session", AsyncMock(return_value=session)):
+            for _ in range(2):
+                with pytest.raises(HTTPSeeOther):
+                    await dashboard.login_apply(DummyLoginRequest("wrong"))
+                assert session["login_status"] == LoginStatus.FAILED
+
+            # Further attempts are rejected without checking the password.
+            with patch.object(dashboard._pwd_hash, "check", side_effect=AssertionError("checked")):
+                with pytest.raises(HTTPSeeOther):
+                    await dashboard.login_apply(DummyLoginRequest("secret"))
+            assert session["login_status"] == LoginStatus.THROTTLED
+            assert (await dashboard.login(None))["info"].startswith("Too many login attempts")
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_login_busy(self, process: Any) -> None:
+        dashboard = Dashboard(
+            pwd_hash=bcrypt.hashpw(b"secret", bcrypt.gensalt(4)), process=process, max_login_attempts=100
+        )
+
+        class DummyLoginRequest:
+            remote = "127.0.0.1"
+
+            async def post(self):
+                return {"password": "wrong"}
+
+        # Hold the password checks, such that they pile up.
+        release = threading.Event()
+        with patch.object(dashboard._pwd_hash, "check", side_effect=lambda password: release.wait(5) and False), \
+                patch("aiohttp_session.get_session", AsyncMock(return_value={})):
+            attempts = [asyncio.ensure_future(dashboard.login_apply(DummyLoginRequest())) for _ in range(8)]
+            await asyncio.sleep(0.01)
+            assert dashboard._pwd_hash.is_busy()
+
+            # Further attempts are rejected right away.
+            with pytest.raises(HTTPServiceUnavailable):
+                await dashboard.login_apply(DummyLoginRequest())
+            with pytest.raises(RuntimeError, match="Too many pending password checks"):
+                await dashboard._pwd_hash.check_async("wrong")
+
+            release.set()
+            for attempt in attempts:
+                with pytest.raises(HTTPSeeOther): await attempt
+            assert not dashboard._pwd_hash.is_busy()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_api(self, task: asyncio.Task, process: Any, target_pos: int, task_target_param: str) -> None:
+        dashboard_api = DashboardAPI(Dashboard(pwd_hash=None, process=process))
+
+        app = Application(middlewares=[error_handler])
+        app.router.add_get("/api/tasks", dashboard_api.get_tasks)
+        app.router.add_post("/api/tasks", dashboard_api.start_task)
+        app.router.add_delete("/api/tasks/{task_id}", dashboard_api.cancel_task)
+        app.router.add_get("/api/targets", dashboard_api.get_targets)
+        app.router.add_get("/api/coroutines", dashboard_api.get_coroutines)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/api/targets")
+            assert response.status == 200
+            targets = (await response.json())["targets"]
+            assert [t["target"] for t in targets] == [str(t) for t in self.ALL_TARGETS]
+
+            response = await client.get("/api/coroutines")
+            coroutines = (await response.json())["coroutines"]
+            assert len(coroutines) == 1
+            str_coroutine_id = coroutines[0]["coroutine_id"]
+            assert str_coroutine_id == coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+            assert coroutines[0]["target_param"] == task_target_param
+            assert {p["name"] for p in coroutines[0]["params"]} == {task_target_param, "msg", "sleep"}
+
+            response = await client.get("/api/tasks")
+            assert response.status == 200
+            tasks = (await response.json())["tasks"]
+            assert len(tasks) == 1
+            assert tasks[0]["task_id"] == task_id(task)
+            assert tasks[0]["target_pos"] == target_pos
+
+            # Unchanged data is not sent again.
+            etag = response.headers["ETag"]
+            response = await client.get("/api/tasks", headers={"If-None-Match": etag})
+            assert response.status == 304
+
+            response = await client.post("/api/tasks", json={
+                "coroutine_id": str_coroutine_id, "target_pos": target_pos, "params": {"msg": "TEST", "sleep": "100"}
+            })
+            assert response.status == 201, await response.text()
+            new_task_id = (await response.json())["task_id"]
+
+            response = await client.get("/api/tasks", headers={"If-None-Match": etag})
+            assert response.status == 200
+            tasks = (await response.json())["tasks"]
+            assert len(tasks) == 2
+            new_task = next(t for t in tasks if t["task_id"] == new_task_id)
+            assert new_task["params"]["sleep"] == 100
+
+            response = await client.get("/api/tasks", params={"offset": 1, "limit": 5})
+            body = await response.json()
+            assert body["n_tasks"] == 2
+            assert [t["task_id"] for t in body["tasks"]] == [t["task_id"] for t in tasks[1:]]
+
+            for str_task_id in [new_task_id, task_id(task)]:
+                response = await client.delete(f"/api/tasks/{str_task_id}")
+                assert response.status == 202
+
+            response = await client.delete("/api/tasks/unknown")
+            assert response.status == 404
+
+            # Invalid requests are client errors, everything else is a server error.
+            response = await client.post("/api/tasks", json=["invalid"])
+            assert response.status == 400
+            assert "JSON object" in (await response.json())["error"]
+
+            response = await client.post("/api/tasks", json={"target_pos": target_pos})
+            assert response.status == 400
+            assert "coroutine_id" in (await response.json())["error"]
+
+            response = await client.post("/api/tasks", json={"coroutine_id": str_coroutine_id})
+            assert response.status == 400
+            assert "target" in (await response.json())["error"]
+
+            # Required parameters are checked before the task is created (all parameters have defaults here).
+            get_start_params = dashboard_api._dashboard._get_start_params
+            def get_start_params_required(str_coroutine_id):
+                def_info, params = get_start_params(str_coroutine_id)
+                params["sleep"] = params["sleep"].replace(default=Parameter.empty)
+                return def_info, params
+
+            with patch.object(dashboard_api._dashboard, "_get_start_params", side_effect=get_start_params_required):
+                response = await client.post("/api/tasks", json={
+                    "coroutine_id": str_coroutine_id, "target_pos": target_pos, "params": {"msg": "TEST"}
+                })
+            assert response.status == 400
+            assert (await response.json())["error"] == "Missing parameters: sleep"
+
+            with patch.object(Dashboard, "_get_target_options", side_effect=ZeroDivisionError("bug")):
+                response = await client.get("/api/targets")
+            assert response.status == 500
+            assert "ETag" not in response.headers
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_history(
+        self, process: Any, current_loop: asyncio.AbstractEventLoop, task_params: dict[str, Any], tmp_path: Any
+    ) -> None:
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+        coroutine_def = CoroutineDef.get_coroutine_def_info(str_coroutine_id)
+        args = (process,) if coroutine_def.context.is_method else ()
+        target = str(task_params[coroutine_def.target_param])
+
+        history_path = str(tmp_path / "history.jsonl")
+        TaskHistory.configure(max_records=2, spill_path=history_path)
+        try:
+            since = time.time()
+            tasks = []
+            for _ in range(2):
+                task = current_loop.create_task(coroutine_def.func(*args, **task_params))
+                await asyncio.sleep(0)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError): await task
+                tasks.append(task)
+
+            task = current_loop.create_task(coroutine_def.func(*args, **{**task_params, "sleep": "invalid"}))
+            with pytest.raises(TypeError): await task
+            tasks.append(task)
+
+            # Only the most recent executions are kept in memory, most recent first.
+            records = TaskHistory.query(since=since)
+            assert [r.task_id for r in records] == [task_id(t) for t in reversed(tasks[1:])]
+            assert [r.outcome for r in records] == [TaskOutcome.EXCEPTION, TaskOutcome.CANCELLED]
+            assert records[0].detail.startswith("TypeError")
+            assert records[0].coroutine_id == str_coroutine_id
+            assert records[0].target == target
+            assert set(records[0].params) == {coroutine_def.target_param, "msg", "sleep"}
+            assert records[0].params["sleep"] == "invalid"
+            assert records[0].duration >= 0
+
+            assert TaskHistory.query(since=since, limit=1) == records[:1]
+            assert TaskHistory.query(since=time.time()) == []
+            assert TaskHistory.query(until=since - 1) == []
+            assert TaskHistory.query(since=since, targets=["unknown"]) == []
+            assert TaskHistory.query(since=since, targets=[target], coroutine_id=str_coroutine_id) == records
+
+            # The file keeps all executions.
+            records = TaskHistory.query_file(since=since)
+            assert [r.task_id for r in records] == [task_id(t) for t in reversed(tasks)]
+
+            dashboard_api = DashboardAPI(Dashboard(pwd_hash=None, process=process))
+            app = Application(middlewares=[error_handler])
+            app.router.add_get("/api/history", dashboard_api.get_history)
+
+            async with TestClient(TestServer(app)) as client:
+                response = await client.get("/api/history", params={"since": since, "target": target})
+                assert response.status == 200
+                history = (await response.json())["history"]
+                assert [h["outcome"] for h in history] == ["exception", "cancelled"]
+
+                response = await client.get("/api/history", params={"since": since, "source": "file", "limit": 3})
+                assert len((await response.json())["history"]) == 3
+
+            # A full queue is flushed soon, but not on the task's done path.
+            with patch.object(TaskHistory, "flush", wraps=TaskHistory.flush) as flush:
+                for _ in range(2):
+                    TaskHistory.add(
+                        task, str_coroutine_id, getattr(coroutine_def.func, "__wrapped__"), coroutine_def.target_param,
+                        args, task_params, since, since, TaskOutcome.RESULT, None
+                    )
+                flush.assert_not_called()
+                await asyncio.sleep(0)
+                flush.assert_called_once()
+            assert len(TaskHistory.query_file(since=since)) == 5
+        finally:
+            TaskHistory.configure()
+            TaskHistory.reset()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_history_started_task(
+        self, process: Any, task_params: dict[str, Any]
+    ) -> None:
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+        coroutine_def = CoroutineDef.get_coroutine_def_info(str_coroutine_id)
+
+        # Tasks started by the dashboard are registered before they execute, they are recorded nevertheless.
+        since = time.time()
+        task = TaskExec.start(coroutine_def, task_params, process)
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError): await task
+
+        try:
+            records = TaskHistory.query(since=since)
+            assert [r.task_id for r in records] == [task_id(task)]
+            assert records[0].outcome == TaskOutcome.CANCELLED
+            assert records[0].coroutine_id == str_coroutine_id
+            assert TaskRegistry.get(task) is None
+        finally:
+            TaskHistory.reset()
+
+    def test_latency_histogram(self) -> None:
+        histogram = LatencyHistogram()
+        for i in range(1, 1001): histogram.add(i / 1000, TaskOutcome.RESULT)
+        histogram.add(0., TaskOutcome.CANCELLED)
+        histogram.add(1e6, TaskOutcome.EXCEPTION)
+
+        assert histogram.count == 1002
+        assert (histogram.n_results, histogram.n_exceptions, histogram.n_cancelled) == (1000, 1, 1)
+        assert histogram.max == 1e6
+
+        # Quantiles are reported with a bounded relative error.
+        for q in [0.1, 0.5, 0.9, 0.99]:
+            assert q <= histogram.quantile(q) <= q * (1 + 1 / LatencyHistogram.SUB_BUCKETS) + 0.001
+
+        assert histogram.count_below(-1) == 500
+        assert histogram.count_below(LatencyHistogram.MAX_EXPONENT) == 1001
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_metrics(
+        self, process: Any, current_loop: asyncio.AbstractEventLoop, task_params: dict[str, Any]
+    ) -> None:
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+        coroutine_def = CoroutineDef.get_coroutine_def_info(str_coroutine_id)
+        args = (process,) if coroutine_def.context.is_method else ()
+        target = str(task_params[coroutine_def.target_param])
+
+        TaskMetrics.reset()
+        TaskMetrics.configure(by_target=True)
+        try:
+            task = current_loop.create_task(coroutine_def.func(*args, **task_params))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError): await task
+
+            task = current_loop.create_task(coroutine_def.func(*args, **{**task_params, "sleep": "invalid"}))
+            with pytest.raises(TypeError): await task
+
+            # The target is also found when passed as positional argument.
+            other_params = {k: v for k, v in task_params.items() if k != coroutine_def.target_param}
+            task = current_loop.create_task(coroutine_def.func(*args, task_params[coroutine_def.target_param], **other_params))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError): await task
+
+            histogram = TaskMetrics.get_histograms()[str_coroutine_id]
+            assert (histogram.count, histogram.n_exceptions, histogram.n_cancelled) == (3, 1, 2)
+            assert TaskMetrics.get_target_histograms()[(str_coroutine_id, target)].count == 3
+
+            dashboard_metrics = DashboardMetrics()
+            response = await dashboard_metrics.metrics(None)
+            assert len(response["coroutine_metrics"]) == 1
+            assert response["coroutine_metrics"][0]["coroutine_name"] == self.COROUTINE_NAME
+            assert response["coroutine_metrics"][0]["error_rate"] == pytest.approx(1 / 3)
+            assert [m["target"] for m in response["target_metrics"]] == [target]
+
+            app = Application(middlewares=[error_handler])
+            app.router.add_get("/metrics/prometheus", dashboard_metrics.prometheus_public)
+
+            async with TestClient(TestServer(app)) as client:
+                response = await client.get("/metrics/prometheus")
+                assert response.status == 200
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                lines = (await response.text()).splitlines()
+
+            labels = f'coroutine="{self.COROUTINE_NAME}",module="{self.SETUP_MODULE}"'
+            assert "# TYPE aiodashboard_task_duration_seconds histogram" in lines
+            assert f'aiodashboard_task_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+            assert f'aiodashboard_task_duration_seconds_count{{{labels}}} 3' in lines
+            assert f'aiodashboard_tasks_total{{{labels},outcome="exception"}} 1' in lines
+            assert f'aiodashboard_target_tasks_total{{{labels},target="{target}",outcome="cancelled"}} 2' in lines
+
+            # Tasks started by the dashboard are observed as well.
+            task = TaskExec.start(coroutine_def, task_params, process)
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError): await task
+
+            histogram = TaskMetrics.get_histograms()[str_coroutine_id]
+            assert (histogram.count, histogram.n_cancelled) == (4, 3)
+        finally:
+            TaskMetrics.configure()
+            TaskMetrics.reset()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_event_stream(
+        self, process: Any, current_loop: asyncio.AbstractEventLoop, task_params: dict[str, Any]
+    ) -> None:
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+        coroutine_def = CoroutineDef.get_coroutine_def_info(str_coroutine_id)
+        args = (process,) if coroutine_def.context.is_method else ()
+
+        task_event_stream = TaskEventStream(Dashboard(pwd_hash=None, process=process), batch_interval=0.01)
+
+        app = Application()
+        app.router.add_get("/events", task_event_stream.events)
+        setup_jinja2(app, "test", BLUE_THEME)
+
+        async def read_batch(response) -> list[dict[str, Any]]:
+            line = await asyncio.wait_for(response.content.readline(), timeout=1)
+            assert (await response.content.readline()) == b"\n"
+            assert line.startswith(b"data: ")
+            return json.loads(line[len(b"data: "):])
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/events")
+            assert response.headers["Content-Type"] == "text/event-stream"
+
+            # Tasks that are started and finished in between two batches are not reported at all.
+            short_task = current_loop.create_task(coroutine_def.func(*args, **{**task_params, "sleep": 0}))
+            await asyncio.sleep(0)
+            short_task.cancel()
+
+            task = current_loop.create_task(coroutine_def.func(*args, **task_params))
+
+            batch = await read_batch(response)
+            assert len(batch) == 1
+            assert batch[0]["type"] == "started"
+            assert batch[0]["task_id"] == task_id(task)
+            assert f'id="task-{task_id(task)}"' in batch[0]["html"]
+            assert batch[0]["target_pos"] == self.ALL_TARGETS.index(task_params[coroutine_def.target_param])
+
+            with pytest.raises(asyncio.CancelledError):
+                task.cancel()
+                await task
+
+            batch = await read_batch(response)
+            assert batch == [{"type": "finished", "task_id": task_id(task)}]
+
+            # Clients catch up on changes that happened before they connected.
+            generation = TaskRegistry.get_generation()
+            task = current_loop.create_task(coroutine_def.func(*args, **task_params))
+            await asyncio.sleep(0.01)
+
+            late_response = await client.get("/events", params={"since": generation})
+            batch = await read_batch(late_response)
+            assert batch == [{"type": "snapshot", "task_ids": [task_id(task)]}]
+
+            with pytest.raises(asyncio.CancelledError):
+                task.cancel()
+                await task
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_fragment_cache(
+        self, process: Any, current_loop: asyncio.AbstractEventLoop, task_params: dict[str, Any]
+    ) -> None:
+        str_coroutine_id = coroutine_id(self.COROUTINE_NAME, self.SETUP_MODULE)
+        coroutine_def = CoroutineDef.get_coroutine_def_info(str_coroutine_id)
+        args = (process,) if coroutine_def.context.is_method else ()
+
+        app = Application()
+        setup_jinja2(app, "test", BLUE_THEME)
+        env = aiohttp_jinja2.get_env(app)
+        dashboard = Dashboard(pwd_hash=None, process=process)
+        cache = dashboard._task_fragments
+
+        task = current_loop.create_task(coroutine_def.func(*args, **task_params))
+        await asyncio.sleep(0.01)
+
+        try:
+            exec_info = TaskExec.get(task)
+            target_pos = self.ALL_TARGETS.index(exec_info.target)
+            html = cache.render(env, dashboard._get_display_info(exec_info, target_pos), 1)
+            assert f'id="task-{task_id(task)}"' in html
+            assert cache.get_size() == 1
+
+            # Entries are rendered once per task and version of the list of targets.
+            assert cache.render(env, dashboard._get_display_info(exec_info, target_pos), 1) is html
+            assert cache.render(env, dashboard._get_display_info(exec_info, target_pos), 2) is not html
+
+            # The index page renders the entries of running tasks from the cache.
+            context = await dashboard.index(DummyIndexRequest())
+            rendered = env.get_template("index.html").render(context)
+            assert str(cache.render(env, dashboard._get_display_info(exec_info, target_pos), context["target_version"])) in rendered
+        finally:
+            with pytest.raises(asyncio.CancelledError):
+                task.cancel()
+                await task
+
+        # Entries of finished tasks are evicted.
+        assert cache.get_size() == 0
+
+        # Entries of tasks that finished before they have been rendered are not cached.
+        cache.render(env, dashboard._get_display_info(exec_info, target_pos), 1)
+        assert cache.get_size() == 0
+        await dashboard.close()
@@ -0,0 +1,16 @@
+import asyncio
+from aiodashboard.coroutine_def import CoroutineDef
+from aiodashboard.task_target_def import TaskTargetDef
+
+TASK_TARGET_PARAM: str = "id"
+
+@TaskTargetDef()
+async def targets() -> list:
+    await asyncio.sleep(0.01)
+    return ["ABC", "DEF"]
+
+@CoroutineDef(target_param=TASK_TARGET_PARAM)
+async def ping(id: str, msg: str = "PING", sleep: int = 10) -> None:
+    while True:
+        print(f"{id} --> {msg}")
+        await asyncio.sleep(sleep)
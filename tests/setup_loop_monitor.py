@@ -0,0 +1,13 @@
+import time
+from aiodashboard.coroutine_def import CoroutineDef
+from aiodashboard.task_target_def import TaskTargetDef
+
+TASK_TARGET_PARAM: str = "id"
+
+@TaskTargetDef()
+def targets() -> list:
+    return ["ABC", "DEF"]
+
+@CoroutineDef(target_param=TASK_TARGET_PARAM)
+async def block(id: str, duration: float = 0.1) -> None:
+    time.sleep(duration)
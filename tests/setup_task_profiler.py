@@ -0,0 +1,28 @@
+import asyncio
+import time
+from aiodashboard.coroutine_def import CoroutineDef
+from aiodashboard.task_target_def import TaskTargetDef
+
+TASK_TARGET_PARAM: str = "id"
+
+@TaskTargetDef()
+def targets() -> list:
+    return ["ABC", "DEF"]
+
+@CoroutineDef(target_param=TASK_TARGET_PARAM)
+async def spin(id: str, duration: float = 10.) -> None:
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        busy(0.05)
+        await asyncio.sleep(0)
+
+@CoroutineDef(target_param=TASK_TARGET_PARAM)
+async def wait(id: str) -> None:
+    await pause()
+
+def busy(duration: float) -> None:
+    end = time.monotonic() + duration
+    while time.monotonic() < end: pass
+
+async def pause() -> None:
+    await asyncio.sleep(10)
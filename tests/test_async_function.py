@@ -0,0 +1,111 @@
+import pytest
+import pytest_asyncio
+
+from typing import Any
+from types import ModuleType
+from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock, patch
+
+import asyncio
+import math
+
+from .base import Base, CoroutineDef, Dashboard, DummyIndexRequest, TaskTargetDef
+
+class TestAsyncFunction(Base):
+
+    SETUP_MODULE: str = "tests.setup_async_function"
+    COROUTINE_NAME: str = "ping"
+    ALL_TARGETS: list[str] = ["ABC", "DEF"]
+
+    @pytest.fixture(scope="module")
+    def process(self, setup: ModuleType) -> Any:
+        return None
+
+    @pytest.fixture
+    def task_params(self, target: Any) -> dict[str, Any]:
+        return dict(id=target, msg="PING", sleep=10)
+
+    @pytest_asyncio.fixture(loop_scope="module")
+    async def task(
+        self,
+        setup: ModuleType,
+        current_loop: asyncio.AbstractEventLoop,
+        task_params: dict[str, Any],
+    ) -> AsyncGenerator[asyncio.Task, None, None]:
+        task = current_loop.create_task(setup.ping(**task_params))
+        try:
+            yield task
+        finally:
+            if not task.cancelled(): task.cancel()
+
+    def test_get_target_context(self) -> None:
+        context = TaskTargetDef.get_context()
+        assert TaskTargetDef.is_async() == True
+        assert context.is_function == True
+        assert context.is_method == False
+        assert context.containing_class == None
+        assert len(context.parameters) == 0
+        assert context.return_annotation == list
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_targets(self, process: Any, all_targets: list[Any]) -> None:
+        targets = await TaskTargetDef.get_targets_async(process=process)
+        assert targets == all_targets
+
+        with pytest.raises(RuntimeError, match="is a coroutine"):
+            TaskTargetDef.get_targets(process=process)
+
+    def test_coroutine_def_info(self, setup: ModuleType) -> None:
+        ids = CoroutineDef.get_coroutine_ids()
+        info = CoroutineDef.get_coroutine_def_info(ids[0])
+        assert info.func == setup.ping
+        assert info.func_name == self.COROUTINE_NAME
+        assert info.module == self.SETUP_MODULE
+        assert info.target_param == "id"
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_target_index(self, process: Any, all_targets: list[Any]) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process, target_ttl=math.inf)
+
+        # The first retrieval of the list of targets is awaited.
+        response = await dashboard.index(DummyIndexRequest())
+        version = response["target_version"]
+        assert response["task_targets"] == all_targets
+
+        changed_targets = list(reversed(all_targets[1:]))
+        with patch.object(TaskTargetDef, "get_targets_async", AsyncMock(return_value=changed_targets)):
+            # Requests are served from the previous list, while the list is retrieved in the background.
+            TaskTargetDef.notify_changed()
+            response = await dashboard.index(DummyIndexRequest())
+            assert response["task_targets"] == all_targets
+            assert response["target_version"] == version
+
+            await dashboard._target_refresh
+            response = await dashboard.index(DummyIndexRequest())
+            assert response["task_targets"] == all_targets[1:]
+            assert response["target_version"] == version + 1
+
+        # Failed retrievals are reported, the previous list remains in use.
+        with patch.object(TaskTargetDef, "get_targets_async", AsyncMock(side_effect=ConnectionError("unavailable"))):
+            TaskTargetDef.notify_changed()
+            with pytest.warns(RuntimeWarning, match="unavailable"):
+                response = await dashboard.index(DummyIndexRequest())
+                await asyncio.gather(dashboard._target_refresh, return_exceptions=True)
+            assert response["task_targets"] == all_targets[1:]
+
+        await dashboard.close()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_dashboard_target_keeper(self, process: Any, all_targets: list[Any]) -> None:
+        dashboard = Dashboard(pwd_hash=None, process=process, target_ttl=0.05)
+        try:
+            await dashboard.index(DummyIndexRequest())
+
+            # The list of targets is retrieved again in the background whenever it expires.
+            with patch.object(TaskTargetDef, "get_targets_async", AsyncMock(return_value=all_targets)) as get_targets:
+                await asyncio.sleep(0.2)
+                assert get_targets.await_count >= 2
+        finally:
+            await dashboard.close()
+
+        assert dashboard._target_keeper is None
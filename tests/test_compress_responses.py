@@ -0,0 +1,87 @@
+import pytest
+
+import asyncio
+import gzip
+from unittest.mock import patch
+
+from .base import Application, TestClient, TestServer, aiohttp_jinja2
+
+from aiohttp import web
+from jinja2 import DictLoader
+
+from aiodashboard.util import compress_responses, stream_template
+from aiodashboard.util.compress_responses import COMPRESSORS
+
+BODY = b'<div class="accordion-item">task</div>\n' * 1000
+
+async def page(request: web.Request) -> web.Response:
+    return web.Response(body=BODY, content_type="text/html", headers={"ETag": '"page"'})
+
+async def small_page(request: web.Request) -> web.Response:
+    return web.Response(body=BODY[:100], content_type="text/html")
+
+async def image(request: web.Request) -> web.Response:
+    return web.Response(body=BODY, content_type="image/png")
+
+class TestCompressResponses:
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_compress_responses(self) -> None:
+        app = Application(middlewares=[compress_responses(min_size=1024, offload_size=len(BODY) + 1)])
+        app.router.add_get("/page", page)
+        app.router.add_get("/small-page", small_page)
+        app.router.add_get("/image", image)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/page", headers={"Accept-Encoding": "gzip"}, auto_decompress=False)
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert response.headers["Vary"] == "Accept-Encoding"
+            assert response.headers["ETag"] == 'W/"page"'
+            body = await response.read()
+            assert len(body) * 10 < len(BODY)
+            assert gzip.decompress(body) == BODY
+
+            # Codings are negotiated with the client.
+            response = await client.get("/page", headers={"Accept-Encoding": "identity"})
+            assert "Content-Encoding" not in response.headers
+            assert response.headers["ETag"] == '"page"'
+            assert await response.read() == BODY
+
+            response = await client.get("/page", headers={"Accept-Encoding": "gzip;q=0.5, br, zstd"})
+            assert response.headers["Content-Encoding"] == next(
+                c for c in ("br", "zstd", "gzip") if c in COMPRESSORS
+            )
+
+            # Small responses and binary formats are sent as they are.
+            for path in ("/small-page", "/image"):
+                response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+                assert "Content-Encoding" not in response.headers
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_compress_responses_offload(self) -> None:
+        app = Application(middlewares=[compress_responses(min_size=1024, offload_size=1024)])
+        app.router.add_get("/page", page)
+
+        # Large bodies are compressed in a thread.
+        loop = asyncio.get_running_loop()
+        async with TestClient(TestServer(app)) as client:
+            with patch.object(loop, "run_in_executor", wraps=loop.run_in_executor) as run_in_executor:
+                response = await client.get("/page", headers={"Accept-Encoding": "gzip"}, auto_decompress=False)
+                assert gzip.decompress(await response.read()) == BODY
+                run_in_executor.assert_called_once()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_compress_streamed_responses(self) -> None:
+        async def streamed(request: web.Request) -> web.StreamResponse:
+            return await stream_template("page.html", request, {"n": 1000}, chunk_size=1024)
+
+        app = Application(middlewares=[compress_responses()])
+        app.router.add_get("/streamed", streamed)
+        aiohttp_jinja2.setup(app, loader=DictLoader({"page.html": "{% for i in range(n) %}<li>{{ i }}</li>{% endfor %}"}))
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/streamed", headers={"Accept-Encoding": "gzip"}, auto_decompress=False)
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert response.headers["Transfer-Encoding"] == "chunked"
+            html = gzip.decompress(await response.read()).decode()
+            assert html == "".join(f"<li>{i}</li>" for i in range(1000))
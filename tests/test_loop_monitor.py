@@ -0,0 +1,86 @@
+import pytest
+
+from types import ModuleType
+from collections.abc import Generator
+
+import asyncio
+import importlib
+import time
+
+from .base import Application, CoroutineDef, Dashboard, DashboardAPI, DummyIndexRequest, TaskTargetDef, \
+    TestClient, TestServer, error_handler
+
+from aiodashboard.loop_monitor import LoopMonitor
+
+class TestLoopMonitor:
+
+    @pytest.fixture(scope="module", autouse=True)
+    def setup(self) -> Generator[ModuleType, None, None]:
+        try:
+            yield importlib.import_module("tests.setup_loop_monitor")
+        finally:
+            CoroutineDef.reset()
+            TaskTargetDef.reset()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_loop_monitor(self, setup: ModuleType) -> None:
+        handle_run = asyncio.Handle._run
+        monitor = LoopMonitor(interval=0.01, windows=(1., 10.), series_size=50, slow_callback_threshold=0.03)
+        monitor.start()
+        try:
+            with pytest.raises(RuntimeError, match="already been started"): monitor.start()
+
+            await asyncio.sleep(0.05)
+            since = time.time()
+
+            # Blocking task steps are captured together with the decorated coroutine, other callbacks by name.
+            await asyncio.create_task(setup.block(id="DEF", duration=0.06))
+            asyncio.get_running_loop().call_soon(time.sleep, 0.04)
+            await asyncio.sleep(0.05)
+
+            slow_callbacks = monitor.get_slow_callbacks()
+            assert [c.callback for c in slow_callbacks[:1]] == ["sleep"]
+            assert slow_callbacks[1].coroutine_name == "block"
+            assert slow_callbacks[1].module == "tests.setup_loop_monitor"
+            assert slow_callbacks[1].target == "DEF"
+            assert slow_callbacks[1].duration >= 0.06
+
+            # The probe oversleeps while the loop is blocked.
+            assert max(lag for _, lag in monitor.get_series(since)) >= 0.03
+            windows = monitor.get_windows()
+            assert [w["window"] for w in windows] == [1., 10.]
+            assert windows[0]["max"] >= 0.03
+            assert windows[0]["p50"] <= windows[0]["p99"] <= windows[0]["max"]
+
+            dashboard = Dashboard(pwd_hash=None, loop_monitor=monitor)
+            response = await dashboard.index(DummyIndexRequest())
+            assert response["loop_windows"][0]["n"] > 0
+            assert response["loop_slow_callbacks"][0].callback == "sleep"
+
+            app = Application(middlewares=[error_handler])
+            app.router.add_get("/api/loop", DashboardAPI(dashboard).get_loop)
+
+            async with TestClient(TestServer(app)) as client:
+                response = await client.get("/api/loop", params={"since": since})
+                assert response.status == 200
+                data = await response.json()
+                assert data["interval"] == 0.01
+                assert all(t > since for t, _ in data["series"])
+                assert data["slow_callbacks"][1]["target"] == "DEF"
+
+            # The series has a fixed size.
+            await asyncio.sleep(0.7)
+            assert len(monitor.get_series()) == 50
+        finally:
+            await monitor.close()
+
+        assert asyncio.Handle._run is handle_run
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_no_loop_monitor(self) -> None:
+        app = Application(middlewares=[error_handler])
+        app.router.add_get("/api/loop", DashboardAPI(Dashboard(pwd_hash=None)).get_loop)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/api/loop")
+            assert response.status == 404
@@ -0,0 +1,120 @@
+import pytest
+
+import bcrypt
+import time
+from pathlib import Path
+
+from .base import Application, TestClient, TestServer
+
+import aiohttp_session
+from aiohttp import web
+from cryptography import fernet
+
+from aiodashboard.login import LoginPages, SessionStorage, check_login, require_login
+from aiodashboard.util import setup_cookie_storage
+
+PASSWORD = "secret"
+
+class Pages(LoginPages):
+
+    @require_login
+    async def protected(self, request: web.Request) -> web.Response:
+        return web.Response(text="protected")
+
+def create_app(setup_sessions) -> Application:
+    pages = Pages(bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)))
+    app = Application()
+    app.router.add_post("/login", pages.login_apply)
+    app.router.add_get("/logout", pages.logout)
+    app.router.add_get("/protected", pages.protected)
+    setup_sessions(app)
+    app.middlewares.append(check_login)
+    return app
+
+# Session cookies are passed explicitly (not kept by the clients).
+async def login(client: TestClient, password: str = PASSWORD) -> str:
+    response = await client.post("/login", data={"password": password}, allow_redirects=False)
+    client.session.cookie_jar.clear()
+    assert response.status == 303
+    return response.cookies["AIOHTTP_SESSION"].value
+
+async def logout(client: TestClient, session_id: str) -> None:
+    await client.get("/logout", headers={"Cookie": f"AIOHTTP_SESSION={session_id}"}, allow_redirects=False)
+    client.session.cookie_jar.clear()
+
+async def get_protected(client: TestClient, session_id: str) -> int:
+    response = await client.get(
+        "/protected", headers={"Cookie": f"AIOHTTP_SESSION={session_id}"}, allow_redirects=False
+    )
+    client.session.cookie_jar.clear()
+    return response.status
+
+class TestSessionStorage:
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_session_storage(self) -> None:
+        storage = SessionStorage(ttl=60., max_sessions=2)
+        app = create_app(lambda app: aiohttp_session.setup(app, storage))
+
+        async with TestClient(TestServer(app)) as client:
+            assert await get_protected(client, "") == 303
+
+            # The cookie only carries an opaque session ID, which changes when logging in.
+            failed_id = await login(client, "wrong")
+            assert len(failed_id) >= 32 and "login_status" not in failed_id
+            session_id = await login(client)
+            assert session_id != failed_id
+            assert await get_protected(client, session_id) == 200
+
+            # Unknown session IDs are not adopted.
+            assert await get_protected(client, "forged") == 303
+
+            # Sessions expire.
+            expires, retrieved, data = storage._sessions[session_id]
+            storage._sessions[session_id] = (time.time() - 1., retrieved, data)
+            assert await get_protected(client, session_id) == 303
+
+            # The least recently used sessions are evicted.
+            session_ids = [await login(client) for _ in range(3)]
+            assert storage.get_size() == 2
+            assert await get_protected(client, session_ids[0]) == 303
+            assert await get_protected(client, session_ids[2]) == 200
+
+            await logout(client, session_ids[2])
+            assert await get_protected(client, session_ids[2]) == 303
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_session_storage_shared(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "sessions.db")
+        storages = [SessionStorage(path=path, sync_interval=0.) for _ in range(2)]
+        apps = [create_app(lambda app, storage=storage: aiohttp_session.setup(app, storage)) for storage in storages]
+
+        async with TestClient(TestServer(apps[0])) as client, TestClient(TestServer(apps[1])) as other_client:
+            # Sessions are shared between processes using the same database.
+            session_id = await login(client)
+            assert await get_protected(other_client, session_id) == 200
+
+            await logout(client, session_id)
+            assert await get_protected(other_client, session_id) == 303
+
+            # Sessions survive restarts.
+            session_id = await login(client)
+        for storage in storages: await storage.close()
+
+        storage = SessionStorage(path=path)
+        async with TestClient(TestServer(create_app(lambda app: aiohttp_session.setup(app, storage)))) as client:
+            assert await get_protected(client, session_id) == 200
+        await storage.close()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_cookie_storage_key(self) -> None:
+        key = fernet.Fernet.generate_key()
+        apps = [create_app(lambda app: setup_cookie_storage(app, key)) for _ in range(2)]
+
+        async with TestClient(TestServer(apps[0])) as client, TestClient(TestServer(apps[1])) as other_client:
+            # Encrypted cookies can be read by all processes using the same key.
+            session_cookie = await login(client)
+            assert await get_protected(other_client, session_cookie) == 200
+
+        with pytest.raises(RuntimeError, match="Fernet key"):
+            setup_cookie_storage(Application(), b"invalid")
@@ -0,0 +1,40 @@
+import pytest
+
+from pathlib import Path
+from unittest.mock import patch
+
+from jinja2 import Environment
+
+from .base import Application, BLUE_THEME, aiohttp_jinja2, setup_jinja2
+
+class TestSetupJinja2:
+
+    @pytest.mark.parametrize("use_plain_html", [False, True])
+    def test_precompile(self, use_plain_html: bool) -> None:
+        app = Application()
+        setup_jinja2(app, "test", BLUE_THEME, use_plain_html)
+        env = aiohttp_jinja2.get_env(app)
+
+        # All templates are compiled at startup and not checked for changes afterwards.
+        assert not env.auto_reload
+        assert env.cache is not None
+        assert {key[1] for key in env.cache.keys()} == set(env.list_templates())
+
+        app = Application()
+        setup_jinja2(app, "test", BLUE_THEME, use_plain_html, precompile=False, auto_reload=True)
+        env = aiohttp_jinja2.get_env(app)
+        assert env.auto_reload
+        assert env.cache is not None and "index.html" not in {key[1] for key in env.cache.keys()}
+
+    def test_bytecode_cache(self, tmp_path: Path) -> None:
+        app = Application()
+        setup_jinja2(app, "test", BLUE_THEME, bytecode_cache_path=str(tmp_path))
+        n_templates = len(aiohttp_jinja2.get_env(app).list_templates())
+        cached = sorted(tmp_path.iterdir())
+        assert len(cached) == n_templates
+
+        # Compiled templates are loaded from the cache after a restart (without parsing them).
+        with patch.object(Environment, "_parse", side_effect=AssertionError("template parsed")):
+            app = Application()
+            setup_jinja2(app, "test", BLUE_THEME, bytecode_cache_path=str(tmp_path))
+        assert sorted(tmp_path.iterdir()) == cached
@@ -0,0 +1,82 @@
+import pytest
+
+import gzip
+import importlib
+import warnings
+from pathlib import Path
+from unittest.mock import patch
+
+from .base import Application, BLUE_THEME, TestClient, TestServer, aiohttp_jinja2, setup_jinja2
+
+from aiodashboard.render.static_assets import StaticAssets
+
+class TestStaticAssets:
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_static_assets(self) -> None:
+        static_assets = StaticAssets()
+        body = b"body { color: red; }\n" * 100
+        url = static_assets.add("style.css", body)
+        assert url.startswith("/static/style.") and url.endswith(".css")
+        assert static_assets.url("style.css") == url
+        assert static_assets.url("unknown.css") is None
+
+        # The name changes with the content.
+        assert StaticAssets().add("style.css", body + b"\n") != url
+
+        app = Application()
+        static_assets.setup(app)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get(url, headers={"Accept-Encoding": "gzip"}, auto_decompress=False)
+            assert response.status == 200
+            assert response.headers["Content-Type"].startswith("text/css")
+            assert response.headers["Cache-Control"] == StaticAssets.CACHE_CONTROL
+            assert response.headers["Vary"] == "Accept-Encoding"
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert gzip.decompress(await response.read()) == body
+
+            response = await client.get(url, headers={"Accept-Encoding": "gzip;q=0, identity"})
+            assert "Content-Encoding" not in response.headers
+            assert await response.read() == body
+
+            # Clients having the asset are told it has not changed.
+            response = await client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+            assert response.status == 304
+
+            response = await client.get("/static/unknown.css")
+            assert response.status == 404
+
+    @pytest.mark.parametrize("use_plain_html", [False, True])
+    def test_setup_jinja2_assets(self, use_plain_html: bool, tmp_path: Path) -> None:
+        cdn_url = "cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css"
+
+        # The stylesheet of the color theme is rendered once, Bootstrap is served as asset.
+        (tmp_path / "bootstrap.min.css").write_bytes(b".container { display: block; }")
+        (tmp_path / "bootstrap.bundle.min.js").write_bytes(b"window.bootstrap = {};")
+        app = Application()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            setup_jinja2(app, "test", BLUE_THEME, use_plain_html, static_path=str(tmp_path))
+        env = aiohttp_jinja2.get_env(app)
+        assert (env.globals["static_url"]("theme.css") is None) == use_plain_html
+        url = env.globals["static_url"]("bootstrap.min.css")
+        assert url is not None
+
+        html = env.get_template("login.html").render()
+        assert (url in html) != use_plain_html
+        assert cdn_url not in html
+
+        # Loading Bootstrap from its CDN has to be requested.
+        app = Application()
+        setup_jinja2(app, "test", BLUE_THEME, use_plain_html, static_path=str(tmp_path), bootstrap_cdn=True)
+        html = aiohttp_jinja2.get_env(app).get_template("login.html").render()
+        assert (cdn_url in html) != use_plain_html
+
+        # The CDN is a fallback if the files of Bootstrap are missing.
+        if not use_plain_html:
+            with patch.object(importlib.import_module("aiodashboard.render.setup_jinja2"), "BOOTSTRAP_FILES", ("missing.css",)):
+                app = Application()
+                with pytest.warns(UserWarning, match="loading Bootstrap from its CDN"):
+                    setup_jinja2(app, "test", BLUE_THEME, use_plain_html, static_path=str(tmp_path))
+            assert cdn_url in aiohttp_jinja2.get_env(app).get_template("login.html").render()
@@ -0,0 +1,60 @@
+import pytest
+
+import asyncio
+
+from aiodashboard.task_await_chain import TaskAwaitChain
+from aiodashboard.task_await_node import TaskAwaitNode
+from aiodashboard.util import task_id
+
+async def leaf() -> None:
+    await asyncio.sleep(10)
+
+async def middle() -> None:
+    await leaf()
+
+async def gathering(n: int) -> None:
+    await asyncio.gather(*(middle() for _ in range(n)))
+
+async def awaiting(task: asyncio.Future) -> None:
+    await task
+
+class TestTaskAwaitChain:
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_await_chain(self) -> None:
+        waiting = asyncio.create_task(middle())
+        awaiting_task = asyncio.create_task(awaiting(waiting))
+        gathering_task = asyncio.create_task(gathering(TaskAwaitChain.MAX_CHILDREN + 2))
+        await asyncio.sleep(0.01)
+        try:
+            # Nested coroutines, from the outermost to the innermost one, followed by the awaited future.
+            chain = await TaskAwaitChain.get_async(waiting)
+            assert [n.name for n in chain[:2]] == ["middle", "leaf"]
+            assert [n.kind for n in chain] == ["coroutine"] * 3 + ["future"]
+            assert chain[1].file == __file__
+            assert chain[1].line == leaf.__code__.co_firstlineno + 1
+
+            # Awaited tasks are followed.
+            chain = TaskAwaitChain.get(awaiting_task)
+            assert [n.kind for n in chain] == ["coroutine", "task"]
+            assert chain[1].task_id == task_id(waiting)
+            assert chain[1].children == (TaskAwaitChain.get(waiting),)
+
+            # Gathered awaitables are followed, up to a maximum number.
+            chain = TaskAwaitChain.get(gathering_task)
+            gather = chain[1]
+            assert gather.kind == TaskAwaitNode.GATHER
+            assert len(gather.children) == TaskAwaitChain.MAX_CHILDREN + 1
+            assert gather.children[0][0].kind == TaskAwaitNode.TASK
+            assert gather.children[0][0].children[0][0].name == "middle"
+            assert gather.children[-1] == (TaskAwaitNode(TaskAwaitNode.TRUNCATED, "2 more"),)
+
+            # The number of nodes along each path is limited.
+            chain = TaskAwaitChain.get(gathering_task, max_depth=3)
+            assert chain[1].children[0][0].children == ((TaskAwaitNode(TaskAwaitNode.TRUNCATED, "..."),),)
+            assert [n.kind for n in TaskAwaitChain.get(waiting, max_depth=2)] == ["coroutine", "coroutine", "truncated"]
+        finally:
+            for task in [waiting, awaiting_task, gathering_task]: task.cancel()
+            await asyncio.gather(waiting, awaiting_task, gathering_task, return_exceptions=True)
+
+        assert TaskAwaitChain.get(waiting) == ()
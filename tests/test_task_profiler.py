@@ -0,0 +1,107 @@
+import pytest
+
+from types import ModuleType
+from collections.abc import Generator
+
+import asyncio
+import importlib
+
+from .base import Application, CoroutineDef, Dashboard, DashboardAPI, TaskTargetDef, TestClient, TestServer, \
+    error_handler, task_id
+
+from aiodashboard.task_profile import TaskProfile
+from aiodashboard.task_profiler import TaskProfiler
+
+class TestTaskProfiler:
+
+    @pytest.fixture(scope="module", autouse=True)
+    def setup(self) -> Generator[ModuleType, None, None]:
+        try:
+            yield importlib.import_module("tests.setup_task_profiler")
+        finally:
+            CoroutineDef.reset()
+            TaskTargetDef.reset()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_profiler(self, setup: ModuleType) -> None:
+        profiler = TaskProfiler(interval=0.005, max_duration=0.3)
+        spinning = asyncio.create_task(setup.spin(id="ABC"))
+        waiting = [asyncio.create_task(setup.wait(id=target)) for target in ["ABC", "DEF"]]
+        await asyncio.sleep(0.01)
+        try:
+            # Executing tasks are sampled from the loop thread's frames, down to the innermost function.
+            profile = await profiler.profile([spinning], duration=0.2)
+            assert profile.n_tasks == 1
+            assert 0.2 <= profile.duration < 0.3
+            assert profile.n_samples >= 10
+            assert any(stack[-1].startswith("busy (setup_task_profiler.py:") for stack in profile.stacks)
+            assert all(stack[0].startswith("CoroutineDef.") for stack in profile.stacks)
+
+            # Waiting tasks are sampled from the chain of awaiting coroutines.
+            profile = await profiler.profile(waiting, duration=0.1, interval=0.02)
+            assert profile.interval == 0.02
+            assert profile.n_tasks == 2
+            assert sum(profile.stacks.values()) == 2 * profile.n_samples
+            assert all(stack[-1] == TaskProfile.WAITING for stack in profile.stacks)
+            assert all(any(frame.startswith("pause (") for frame in stack) for stack in profile.stacks)
+
+            lines = profile.collapsed().splitlines()
+            assert len(lines) == len(profile.stacks)
+            assert lines[0].endswith(f" {max(profile.stacks.values())}")
+            flamegraph = profile.flamegraph()
+            assert flamegraph["value"] == 2 * profile.n_samples
+            assert flamegraph["children"][0]["value"] == 2 * profile.n_samples
+
+            # The duration is bounded, only one profile is taken at a time.
+            profile_task = asyncio.create_task(profiler.profile([spinning], duration=10.))
+            await asyncio.sleep(0.01)
+            with pytest.raises(RuntimeError, match="Another profile"):
+                await profiler.profile([spinning], duration=0.1)
+            assert (await profile_task).duration < 0.4
+
+            # Finished tasks are not sampled.
+            spinning.cancel()
+            await asyncio.gather(spinning, return_exceptions=True)
+            assert (await profiler.profile([spinning], duration=0.05)).stacks == {}
+        finally:
+            profiler.close()
+            for task in waiting: task.cancel()
+            await asyncio.gather(spinning, *waiting, return_exceptions=True)
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_profiler_api(self, setup: ModuleType) -> None:
+        waiting = [asyncio.create_task(setup.wait(id=target)) for target in ["ABC", "DEF"]]
+        await asyncio.sleep(0.01)
+
+        dashboard_api = DashboardAPI(Dashboard(pwd_hash=None), TaskProfiler(interval=0.01))
+        app = Application(middlewares=[error_handler])
+        app.router.add_get("/api/profile", dashboard_api.get_profile)
+
+        try:
+            async with TestClient(TestServer(app)) as client:
+                response = await client.get("/api/profile", params={"task_id": task_id(waiting[0]), "duration": 0.05})
+                assert response.status == 200
+                assert response.content_type == "text/plain"
+                text = await response.text()
+                assert text.splitlines()[0].split(";")[-1].startswith(TaskProfile.WAITING)
+
+                coroutine_id = next(
+                    cid for cid, def_info in CoroutineDef.get_coroutine_defs().items() if def_info.func_name == "wait"
+                )
+                response = await client.get(
+                    "/api/profile", params={"coroutine_id": coroutine_id, "duration": 0.05, "format": "json"}
+                )
+                assert response.status == 200
+                data = await response.json()
+                assert data["n_tasks"] == 2
+                assert data["flamegraph"]["value"] == 2 * data["n_samples"]
+
+                response = await client.get("/api/profile")
+                assert response.status == 400
+
+                response = await client.get("/api/profile", params={"task_id": "0"})
+                assert response.status == 404
+        finally:
+            await dashboard_api.close()
+            for task in waiting: task.cancel()
+            await asyncio.gather(*waiting, return_exceptions=True)
@@ -0,0 +1,136 @@
+import pytest
+
+from typing import Any
+from collections.abc import Callable
+
+import asyncio
+import os
+import sys
+
+from .base import Application, TestClient, TestServer, DummyIndexRequest, coroutine_id, error_handler
+
+from aiodashboard.worker_aggregator import WorkerAggregator
+from aiodashboard.worker_dashboard import WorkerDashboard
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def start_worker(path: str, name: str, n_tasks: int) -> asyncio.subprocess.Process:
+    worker = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "tests.worker_process", path, name, str(n_tasks),
+        cwd=ROOT_DIR, stdout=asyncio.subprocess.PIPE
+    )
+    assert worker.stdout is not None
+    assert (await asyncio.wait_for(worker.stdout.readline(), timeout=10)).strip() == b"ready"
+    return worker
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 5.) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition(): await asyncio.sleep(0.01)
+
+class TestWorkerAggregator:
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_worker_aggregator(self, tmp_path: Any) -> None:
+        paths = [str(tmp_path / "worker-0.sock"), str(tmp_path / "worker-1.sock")]
+        workers = [await start_worker(paths[0], "worker-0", 2), await start_worker(paths[1], "worker-1", 4)]
+        aggregator = WorkerAggregator(paths, reconnect_interval=0.05)
+
+        try:
+            await aggregator.start()
+            await wait_for(lambda: sum(info.n_tasks for info in aggregator.get_workers()) == 6)
+
+            infos = aggregator.get_workers()
+            assert [info.name for info in infos] == ["worker-0", "worker-1"]
+            assert all(info.connected for info in infos)
+            assert infos[0].pid == workers[0].pid
+
+            str_coroutine_id = coroutine_id("ping", "tests.setup_function")
+            assert list(aggregator.get_coroutines()) == [str_coroutine_id]
+
+            # Tasks of all workers are merged, ordered by target.
+            n_tasks, tasks = aggregator.select_page(0, 10)
+            assert n_tasks == 6
+            assert [task.worker for task in tasks] == [0, 0, 1, 1, 1, 1]
+            assert {task.coroutine_name for task in tasks} == {"ping"}
+
+            n_tasks, tasks = aggregator.select_page(1, 2, worker=1)
+            assert n_tasks == 4
+            assert len(tasks) == 2 and all(task.worker == 1 for task in tasks)
+
+            # Tasks are started by the worker, parameter values are converted.
+            new_task_id = await aggregator.start_task(1, str_coroutine_id, "DEF", {"msg": "TEST", "sleep": "100"})
+            await wait_for(lambda: aggregator.get_workers()[1].n_tasks == 5)
+
+            n_tasks, tasks = aggregator.select_page(0, 10, target="DEF")
+            assert n_tasks == 1
+            assert tasks[0].task_id == new_task_id
+            assert tasks[0].params == {"id": "DEF", "msg": "TEST", "sleep": 100}
+
+            with pytest.raises(RuntimeError, match="Unknown target"):
+                await aggregator.start_task(1, str_coroutine_id, "XYZ", {})
+
+            assert await aggregator.cancel_tasks(1, [new_task_id, "unknown"]) == [new_task_id]
+            await wait_for(lambda: aggregator.get_workers()[1].n_tasks == 4)
+
+            # Tasks of a lost worker are removed, they reappear once the worker is back.
+            workers[0].kill()
+            await workers[0].wait()
+            await wait_for(lambda: not aggregator.get_workers()[0].connected)
+            assert aggregator.select_page(0, 10)[0] == 4
+
+            with pytest.raises(RuntimeError, match="not connected"):
+                await aggregator.cancel_tasks(0, ["unknown"])
+
+            workers[0] = await start_worker(paths[0], "worker-0", 3)
+            await wait_for(lambda: aggregator.get_workers()[0].n_tasks == 3)
+            assert aggregator.select_page(0, 10)[0] == 7
+
+            await self._check_dashboard(aggregator, str_coroutine_id)
+
+        finally:
+            await aggregator.close()
+            for worker in workers:
+                if worker.returncode is None: worker.kill()
+                await worker.wait()
+
+    async def _check_dashboard(self, aggregator: WorkerAggregator, str_coroutine_id: str) -> None:
+        dashboard = WorkerDashboard(pwd_hash=None, aggregator=aggregator, page_size=5)
+
+        response = await dashboard.index(DummyIndexRequest({"page": 2}))
+        assert response["n_tasks"] == 7
+        assert response["n_pages"] == 2
+        assert len(response["tasks"]) == 2
+
+        response = await dashboard.index(DummyIndexRequest({"worker": 0, "coroutine-id": str_coroutine_id}))
+        assert response["n_tasks"] == 3
+
+        app = Application(middlewares=[error_handler])
+        app.router.add_get("/api/workers", dashboard.get_workers)
+        app.router.add_get("/api/workers/tasks", dashboard.get_tasks)
+        app.router.add_post("/api/workers/{worker}/tasks", dashboard.start_task)
+        app.router.add_delete("/api/workers/{worker}/tasks/{task_id}", dashboard.cancel_task)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/api/workers")
+            assert response.status == 200
+            assert [w["n_tasks"] for w in (await response.json())["workers"]] == [3, 4]
+
+            response = await client.get("/api/workers/tasks", params={"worker": "1", "limit": "3"})
+            data = await response.json()
+            assert data["n_tasks"] == 4
+            assert len(data["tasks"]) == 3
+
+            response = await client.post("/api/workers/0/tasks", json={
+                "coroutine_id": str_coroutine_id, "target": "ABC", "params": {"sleep": "100"}
+            })
+            assert response.status == 201, await response.text()
+            new_task_id = (await response.json())["task_id"]
+
+            response = await client.delete(f"/api/workers/0/tasks/{new_task_id}")
+            assert response.status == 202
+
+            response = await client.delete("/api/workers/0/tasks/unknown")
+            assert response.status == 404
+
+            response = await client.post("/api/workers/0/tasks", json=["invalid"])
+            assert response.status == 400
@@ -0,0 +1,18 @@
+import asyncio
+import sys
+
+from aiodashboard.worker_export import WorkerExport
+
+from . import setup_function
+
+async def main(path: str, name: str, n_tasks: int) -> None:
+    worker_export = WorkerExport(path, name=name, batch_interval=0.01)
+    await worker_export.start()
+
+    tasks = [asyncio.create_task(setup_function.ping(id="ABC", msg=f"{name}-{i}", sleep=100)) for i in range(n_tasks)]
+
+    print("ready", flush=True)
+    await asyncio.gather(*tasks)
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1], sys.argv[2], int(sys.argv[3])))